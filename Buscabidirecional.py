@@ -1,7 +1,16 @@
 import math
 import heapq 
-import json
 import time 
+from functools import partial
+
+from indice_espacial import construir_grafo_espacial
+from carregador_cidades import TabelaCidades
+from componentes import IndiceComponentes, UniaoBusca
+from preparacao_busca import novas_estatisticas, iniciar_busca, criar_heuristica_euclidiana, AUSENTE_GRAFO
+from ganchos_busca import resolver_ganchos, SILENCIOSO, RESUMO
+from construtor_numpy import construir_grafo_numpy
+from execucao_paralela import executar_em_paralelo
+from espaco_busca import espaco_da_thread
 
 # --- Funções Auxiliares (Sem alterações) ---
 
@@ -9,17 +18,9 @@ def calcular_distancia_euclidiana(coords_cidade1, coords_cidade2):
     return math.dist(coords_cidade1, coords_cidade2)
 
 def carregar_dados_cidades(caminho_arquivo_json):
+    # Leitura em fluxo (JSON, NDJSON ou CSV) com população int e homônimos desambiguados
     try:
-        with open(caminho_arquivo_json, 'r', encoding='utf-8') as f:
-            dados = json.load(f)
-        cidades = {
-            item['city']: {
-                'coords': (item['latitude'], item['longitude']),
-                'population': item['population']
-            }
-            for item in dados
-        }
-        return cidades
+        return TabelaCidades.carregar(caminho_arquivo_json).para_dados_cidades()
     except FileNotFoundError:
         print(f"Erro: Arquivo JSON não encontrado em {caminho_arquivo_json}")
         return None
@@ -27,20 +28,10 @@ def carregar_dados_cidades(caminho_arquivo_json):
         print(f"Erro ao carregar ou processar o JSON: {e}")
         return None
 
-def construir_grafo(dados_cidades, r):
-    grafo = {cidade: [] for cidade in dados_cidades}
-    nomes_cidades = list(dados_cidades.keys())
-    for i in range(len(nomes_cidades)):
-        for j in range(i + 1, len(nomes_cidades)):
-            nome_cidade1 = nomes_cidades[i]
-            nome_cidade2 = nomes_cidades[j]
-            dados_cidade1 = dados_cidades[nome_cidade1]
-            dados_cidade2 = dados_cidades[nome_cidade2]
-            distancia = calcular_distancia_euclidiana(dados_cidade1['coords'], dados_cidade2['coords'])
-            if distancia <= r:
-                grafo[nome_cidade1].append((nome_cidade2, distancia))
-                grafo[nome_cidade2].append((nome_cidade1, distancia))
-    return grafo
+def construir_grafo(dados_cidades, r, uniao=None):
+    # Usa a grade espacial: só compara cidades em células vizinhas (mesmas arestas do laço par-a-par).
+    # Com `uniao` (UniaoBusca), as componentes conexas são montadas junto com as arestas
+    return construir_grafo_espacial(dados_cidades, r, uniao)
 
 def reconstruir_caminho(no_inicial, no_final, no_encontro, pais_avanco, pais_retrocesso):
     # (Função sem alterações)
@@ -62,33 +53,80 @@ def reconstruir_caminho(no_inicial, no_final, no_encontro, pais_avanco, pais_ret
         return None 
     return caminho
 
+def formatar_caminho_detalhado(grafo, caminho):
+    # Gera "A -> B (Dist: x.xx) -> C (Dist: y.yy)" usando os pesos das arestas do grafo
+    partes_caminho_str = [caminho[0]] # Começa com a primeira cidade
+    for i in range(len(caminho) - 1):
+        cidade_atual = caminho[i]
+        proxima_cidade = caminho[i+1]
+        # Busca a distância no grafo
+        distancia_segmento = None
+        if cidade_atual in grafo:
+             adj_list = grafo[cidade_atual]
+             dist_tuple = next((item for item in adj_list if item[0] == proxima_cidade), None)
+             if dist_tuple:
+                  distancia_segmento = dist_tuple[1]
+        if distancia_segmento is not None:
+             # Adiciona seta -> próxima cidade (Dist: valor km)
+             partes_caminho_str.append(f"-> {proxima_cidade} (Dist: {distancia_segmento:.2f})") 
+        else:
+             partes_caminho_str.append(f"-> {proxima_cidade} (Dist: ??)") # Se falhar em achar
+    return " ".join(partes_caminho_str)
+
+def imprimir_resumo_bidirecional(estatisticas, no_inicial, no_final):
+    # Resumo final no console: estatísticas gerais, encontro/reconstrução e bloco "Resultado Final"
+    print("\n--- Busca Finalizada ---")
+    print(f"Total de Expansões de Nós: {estatisticas['total_expansoes']}") 
+    print(f"Expansões (Avanço): {estatisticas['expansoes_avanco']}") 
+    print(f"Expansões (Retrocesso): {estatisticas['expansoes_retrocesso']}") 
+    print(f"Tempo de Execução: {estatisticas['tempo_execucao']:.4f} segundos") 
+
+    if estatisticas["no_encontro"] is not None:
+        print(f"Melhor caminho encontrado com encontro no nó: {estatisticas['no_encontro']}") 
+        print(f"Custo final calculado: {estatisticas['custo_final']:.2f}")
+        print("Reconstruindo caminho...")
+        if estatisticas["caminho"]:
+            print("Reconstrução do caminho bem-sucedida.") 
+            print(f"\n--- Resultado Final ---")
+            print(f"  Status: {estatisticas['status']}")
+            print(f"  Nó Final de Encontro: {estatisticas['no_encontro']}")
+            print(f"  Caminho Encontrado ({len(estatisticas['caminho'])} cidades):")
+            print(f"    {estatisticas['caminho_detalhado']}") 
+            print(f"  Distância Total: {estatisticas['custo_final']:.2f}")
+            print(f"  Total de Expansões de Nós: {estatisticas['total_expansoes']}")
+            print(f"  Tempo de Execução: {estatisticas['tempo_execucao']:.4f} segundos")
+        else: # Falha na reconstrução
+            print("Erro durante a reconstrução do caminho!")
+            print(f"\n--- Resultado Final ---")
+            print(f"  Status: {estatisticas['status']}")
+            print(f"  Nó de Encontro foi: {estatisticas['no_encontro']}")
+            print(f"  Custo encontrado foi: {estatisticas['custo_final']:.2f}")
+    else: # Nenhum caminho encontrado
+        print(f"Nenhum caminho encontrado entre {no_inicial} e {no_final}.")
+        print(f"\n--- Resultado Final ---")
+        print(f"  Status: {estatisticas['status']}")
+
 # --- Busca Bidirecional (Com caminho detalhado) ---
 
-def busca_bidirecional_final_verbose(grafo, dados_cidades, no_inicial, no_final):
+def busca_bidirecional_final_verbose(grafo, dados_cidades, no_inicial, no_final, componentes=None, verbosidade=SILENCIOSO, ganchos=None):
     """
     Executa a Busca Bidirecional, imprime resumo final detalhado no console
     (incluindo distâncias dos segmentos do caminho) e retorna estatísticas.
+
+    Com `componentes` (IndiceComponentes), pares em componentes conexas
+    diferentes retornam imediatamente, sem esgotar uma das filas.
+
+    `verbosidade` (SILENCIOSO por padrão, RESUMO ou RASTREAMENTO) e `ganchos`
+    (on_expand, on_push, on_meet, on_finish) seguem ganchos_busca.py.
     """
-    print(f"\n--- Iniciando Busca Bidirecional: {no_inicial} -> {no_final} ---")
+    if verbosidade: print(f"\n--- Iniciando Busca Bidirecional: {no_inicial} -> {no_final} ---")
+    ao_expandir, ao_inserir, ao_encontrar, ao_finalizar, ao_parar = resolver_ganchos(ganchos, verbosidade, imprimir_resumo_bidirecional)
     inicio_tempo = time.time()
 
-    estatisticas = {
-        "total_expansoes": 0, "expansoes_avanco": 0, "expansoes_retrocesso": 0,
-        "no_encontro": None, "custo_final": float('inf'), 
-        "caminho": None, 
-        "caminho_detalhado": "", # Nova chave para a string do caminho com distâncias
-        "tempo_execucao": 0, "status": "Não Iniciado"
-    }
-
-    # (Tratamento inicial de erros e caso base - sem alterações)
-    if no_inicial == no_final:
-        print("Nó inicial é o mesmo que o nó final.")
-        estatisticas.update({"status": "Inicial igual ao Final", "caminho": [no_inicial], "custo_final": 0, "tempo_execucao": time.time() - inicio_tempo, "caminho_detalhado": no_inicial})
-        return [no_inicial], 0, estatisticas
-    if no_inicial not in grafo or no_final not in grafo:
-        print(f"Erro: Nó inicial '{no_inicial}' ou Nó final '{no_final}' não está na conectividade do grafo.")
-        estatisticas.update({"status": "Nó Inicial ou Final fora do grafo", "tempo_execucao": time.time() - inicio_tempo})
-        return None, float('inf'), estatisticas
+    estatisticas = novas_estatisticas(bidirecional=True)
+    resultado = iniciar_busca(no_inicial, no_final, grafo, estatisticas, inicio_tempo, componentes, verbosidade, ao_finalizar, ausente=AUSENTE_GRAFO)
+    if resultado is not None:
+        return resultado
         
     # (Inicialização das filas, visitados, pais - sem alterações)
     fila_prio_avanco = [(0, dados_cidades[no_inicial]['population'], no_inicial)]
@@ -98,144 +136,331 @@ def busca_bidirecional_final_verbose(grafo, dados_cidades, no_inicial, no_final)
     custo_total_minimo = float('inf'); no_encontro = None
 
     # --- Loop Principal da Busca (Impressões moderadas no console - sem alterações) ---
+    insercoes = descartes = 0 # Contadores locais da fila, gravados nas estatísticas ao retornar
     while fila_prio_avanco and fila_prio_retrocesso:
         custo_min_avanco = fila_prio_avanco[0][0]; custo_min_retrocesso = fila_prio_retrocesso[0][0]
         if custo_min_avanco + custo_min_retrocesso >= custo_total_minimo:
-            print(f"\nCondição de término atingida: min_avanco ({custo_min_avanco:.2f}) + min_retrocesso ({custo_min_retrocesso:.2f}) >= melhor_custo ({custo_total_minimo:.2f})")
+            if ao_parar is not None: ao_parar(custo_min_avanco, custo_min_retrocesso, custo_total_minimo)
             estatisticas["status"] = "Caminho ótimo encontrado"
             break 
         
         if len(fila_prio_avanco) <= len(fila_prio_retrocesso): # Expande Avanço
             if not fila_prio_avanco: continue
             custo_f, _, atual_f = heapq.heappop(fila_prio_avanco)
-            if custo_f > visitados_avanco[atual_f]: continue 
+            if custo_f > visitados_avanco[atual_f]: descartes += 1; continue 
             estatisticas["total_expansoes"] += 1; estatisticas["expansoes_avanco"] += 1
-            print(f"  [{estatisticas['total_expansoes']:<4} AVN] Expandir: {atual_f:<15} (Custo: {custo_f:.2f})")
+            if ao_expandir is not None: ao_expandir(atual_f, custo_f, custo_f, "avanco", estatisticas['total_expansoes'])
             if atual_f in visitados_retrocesso:
                 custo_total = custo_f + visitados_retrocesso[atual_f]
                 if custo_total < custo_total_minimo:
-                    print(f"    **** Novo MELHOR caminho! Encontro: {atual_f}, Custo: {custo_total:.2f} (Ant: {custo_total_minimo:.2f}) ****")
+                    if ao_encontrar is not None: ao_encontrar(atual_f, custo_total, custo_total_minimo)
                     custo_total_minimo = custo_total; no_encontro = atual_f
             for vizinho, distancia in grafo.get(atual_f, []):
                 novo_custo_f = custo_f + distancia
                 if vizinho not in visitados_avanco or novo_custo_f < visitados_avanco[vizinho]:
                     visitados_avanco[vizinho] = novo_custo_f; pais_avanco[vizinho] = atual_f
                     heapq.heappush(fila_prio_avanco, (novo_custo_f, dados_cidades[vizinho]['population'], vizinho))
+                    insercoes += 1
+                    if ao_inserir is not None: ao_inserir(vizinho, novo_custo_f, novo_custo_f, "avanco")
         else: # Expande Retrocesso
             if not fila_prio_retrocesso: continue
             custo_b, _, atual_b = heapq.heappop(fila_prio_retrocesso)
-            if custo_b > visitados_retrocesso[atual_b]: continue 
+            if custo_b > visitados_retrocesso[atual_b]: descartes += 1; continue 
             estatisticas["total_expansoes"] += 1; estatisticas["expansoes_retrocesso"] += 1
-            print(f"  [{estatisticas['total_expansoes']:<4} RET] Expandir: {atual_b:<15} (Custo: {custo_b:.2f})")
+            if ao_expandir is not None: ao_expandir(atual_b, custo_b, custo_b, "retrocesso", estatisticas['total_expansoes'])
             if atual_b in visitados_avanco:
                 custo_total = custo_b + visitados_avanco[atual_b]
                 if custo_total < custo_total_minimo:
-                     print(f"    **** Novo MELHOR caminho! Encontro: {atual_b}, Custo: {custo_total:.2f} (Ant: {custo_total_minimo:.2f}) ****")
+                     if ao_encontrar is not None: ao_encontrar(atual_b, custo_total, custo_total_minimo)
                      custo_total_minimo = custo_total; no_encontro = atual_b
             for vizinho, distancia in grafo.get(atual_b, []):
                 novo_custo_b = custo_b + distancia
                 if vizinho not in visitados_retrocesso or novo_custo_b < visitados_retrocesso[vizinho]:
                     visitados_retrocesso[vizinho] = novo_custo_b; pais_retrocesso[vizinho] = atual_b 
                     heapq.heappush(fila_prio_retrocesso, (novo_custo_b, dados_cidades[vizinho]['population'], vizinho))
+                    insercoes += 1
+                    if ao_inserir is not None: ao_inserir(vizinho, novo_custo_b, novo_custo_b, "retrocesso")
 
     # --- Fim do Loop da Busca ---
     fim_tempo = time.time()
     estatisticas["tempo_execucao"] = fim_tempo - inicio_tempo
-
-    # --- Prepara Resumo Final (Impressão no Console) ---
-    print("\n--- Busca Finalizada ---")
-    # (Impressão das estatísticas gerais - sem alterações)
-    print(f"Total de Expansões de Nós: {estatisticas['total_expansoes']}") 
-    print(f"Expansões (Avanço): {estatisticas['expansoes_avanco']}") 
-    print(f"Expansões (Retrocesso): {estatisticas['expansoes_retrocesso']}") 
-    print(f"Tempo de Execução: {estatisticas['tempo_execucao']:.4f} segundos") 
+    estatisticas.update({"insercoes_fila": insercoes, "descartes_fila": descartes})
 
     if no_encontro:
-        print(f"Melhor caminho encontrado com encontro no nó: {no_encontro}") 
-        print(f"Custo final calculado: {custo_total_minimo:.2f}")
-        print("Reconstruindo caminho...")
         caminho = reconstruir_caminho(no_inicial, no_final, no_encontro, pais_avanco, pais_retrocesso)
-        
         if caminho: 
-            print("Reconstrução do caminho bem-sucedida.") 
             estatisticas.update({"caminho": caminho, "custo_final": custo_total_minimo, "no_encontro": no_encontro})
             if estatisticas["status"] == "Não Iniciado": estatisticas["status"] = "Caminho encontrado (Terminou por fila vazia)"
-
-            # --- NOVO: Formata Caminho com Distâncias ---
-            partes_caminho_str = [caminho[0]] # Começa com a primeira cidade
-            for i in range(len(caminho) - 1):
-                cidade_atual = caminho[i]
-                proxima_cidade = caminho[i+1]
-                # Busca a distância no grafo
-                distancia_segmento = None
-                if cidade_atual in grafo:
-                     adj_list = grafo[cidade_atual]
-                     dist_tuple = next((item for item in adj_list if item[0] == proxima_cidade), None)
-                     if dist_tuple:
-                          distancia_segmento = dist_tuple[1]
-                
-                if distancia_segmento is not None:
-                     # Adiciona seta -> próxima cidade (Dist: valor km)
-                     partes_caminho_str.append(f"-> {proxima_cidade} (Dist: {distancia_segmento:.2f})") 
-                else:
-                     partes_caminho_str.append(f"-> {proxima_cidade} (Dist: ??)") # Se falhar em achar
-            
-            estatisticas["caminho_detalhado"] = " ".join(partes_caminho_str)
-            # --- FIM: Formata Caminho com Distâncias ---
-
-            # --- Imprime Bloco de Resultado Final no Console (USA CAMINHO DETALHADO) ---
-            print(f"\n--- Resultado Final ---")
-            print(f"  Status: {estatisticas['status']}")
-            print(f"  Nó Final de Encontro: {estatisticas['no_encontro']}")
-            # Usa a string formatada aqui
-            print(f"  Caminho Encontrado ({len(caminho)} cidades):")
-            # Adiciona lógica de truncamento se desejar, aplicada à string detalhada
-            print(f"    {estatisticas['caminho_detalhado']}") 
-            print(f"  Distância Total: {estatisticas['custo_final']:.2f}")
-            print(f"  Total de Expansões de Nós: {estatisticas['total_expansoes']}")
-            print(f"  Tempo de Execução: {estatisticas['tempo_execucao']:.4f} segundos")
-            # --- Fim do Bloco de Resultado Final ---
-            
+            estatisticas["caminho_detalhado"] = formatar_caminho_detalhado(grafo, caminho)
+            if ao_finalizar is not None: ao_finalizar(estatisticas, no_inicial, no_final)
             return caminho, custo_total_minimo, estatisticas
         else: # Falha na reconstrução
-            print("Erro durante a reconstrução do caminho!")
             estatisticas.update({"status": "Erro na Reconstrução", "custo_final": custo_total_minimo, "no_encontro": no_encontro})
-            # (Impressão do bloco de erro - sem alterações, não tem caminho para detalhar)
-            print(f"\n--- Resultado Final ---")
-            print(f"  Status: {estatisticas['status']}")
-            print(f"  Nó de Encontro foi: {estatisticas['no_encontro']}")
-            print(f"  Custo encontrado foi: {estatisticas['custo_final']:.2f}")
-            # ... resto das stats
+            if ao_finalizar is not None: ao_finalizar(estatisticas, no_inicial, no_final)
             return None, custo_total_minimo, estatisticas 
     else: # Nenhum caminho encontrado
-        # (Atualização de status e impressão do bloco "sem caminho" - sem alterações)
         if not fila_prio_avanco or not fila_prio_retrocesso and estatisticas["status"] == "Não Iniciado": estatisticas["status"] = "Nenhum caminho encontrado (Espaço de busca esgotado)"
         elif estatisticas["status"] == "Não Iniciado": estatisticas["status"] = "Nenhum caminho encontrado (Término desconhecido)"
-        print(f"Nenhum caminho encontrado entre {no_inicial} e {no_final}.")
-        print(f"\n--- Resultado Final ---")
-        print(f"  Status: {estatisticas['status']}")
-        # ... resto das stats
+        if ao_finalizar is not None: ao_finalizar(estatisticas, no_inicial, no_final)
         return None, float('inf'), estatisticas
 
 
+# --- Busca Bidirecional A* (Potenciais Médios) ---
+
+def busca_bidirecional_a_estrela(grafo, dados_cidades, no_inicial, no_final, heuristica=None, componentes=None, verbosidade=SILENCIOSO, ganchos=None):
+    """
+    Executa a Busca Bidirecional A* com potenciais médios (consistentes).
+
+    O avanço usa p(v) = (h(v, final) - h(v, inicial)) / 2 e o retrocesso usa -p(v).
+    Com esses potenciais os custos reduzidos são não negativos nos dois sentidos,
+    então vale o mesmo critério de parada da busca bidirecional comum:
+    topo_avanco + topo_retrocesso >= melhor_custo.
+
+    Args:
+        heuristica (callable, opcional): h(no, alvo) consistente e simétrica.
+            Padrão: distância euclidiana entre as coordenadas.
+        componentes, verbosidade, ganchos: Ver busca_bidirecional_final_verbose.
+
+    Returns:
+        tuple: (caminho, custo, estatisticas), no mesmo formato de busca_bidirecional_final_verbose.
+    """
+    if verbosidade: print(f"\n--- Iniciando Busca Bidirecional A*: {no_inicial} -> {no_final} ---")
+    ao_expandir, ao_inserir, ao_encontrar, ao_finalizar, ao_parar = resolver_ganchos(ganchos, verbosidade, imprimir_resumo_bidirecional)
+    inicio_tempo = time.time()
+
+    estatisticas = novas_estatisticas(bidirecional=True)
+    resultado = iniciar_busca(no_inicial, no_final, grafo, estatisticas, inicio_tempo, componentes, verbosidade, ao_finalizar, ausente=AUSENTE_GRAFO)
+    if resultado is not None:
+        return resultado
+
+    if heuristica is None:
+        heuristica = criar_heuristica_euclidiana(dados_cidades)
+    potenciais = {}
+    def potencial(no):
+        # p(v) do avanço; o retrocesso usa -p(v). Calculado uma vez por nó.
+        valor = potenciais.get(no)
+        if valor is None:
+            valor = potenciais[no] = (heuristica(no, no_final) - heuristica(no, no_inicial)) / 2
+        return valor
+
+    # Filas: (chave, populacao, no), com chave = g + p(v) no avanço e g - p(v) no retrocesso
+    fila_prio_avanco = [(potencial(no_inicial), dados_cidades[no_inicial]['population'], no_inicial)]
+    visitados_avanco = {no_inicial: 0}; pais_avanco = {no_inicial: None}
+    fila_prio_retrocesso = [(-potencial(no_final), dados_cidades[no_final]['population'], no_final)]
+    visitados_retrocesso = {no_final: 0}; pais_retrocesso = {no_final: None}
+    fechados_avanco = set(); fechados_retrocesso = set()
+    custo_total_minimo = float('inf'); no_encontro = None
+
+    insercoes = descartes = 0 # Contadores locais da fila, gravados nas estatísticas ao retornar
+    while fila_prio_avanco and fila_prio_retrocesso:
+        chave_min_avanco = fila_prio_avanco[0][0]; chave_min_retrocesso = fila_prio_retrocesso[0][0]
+        if chave_min_avanco + chave_min_retrocesso >= custo_total_minimo:
+            if ao_parar is not None: ao_parar(chave_min_avanco, chave_min_retrocesso, custo_total_minimo)
+            estatisticas["status"] = "Caminho ótimo encontrado"
+            break 
+
+        if len(fila_prio_avanco) <= len(fila_prio_retrocesso):
+            fila, visitados, pais, fechados, outros_visitados, sinal, chave, sentido = fila_prio_avanco, visitados_avanco, pais_avanco, fechados_avanco, visitados_retrocesso, 1, "expansoes_avanco", "avanco"
+        else:
+            fila, visitados, pais, fechados, outros_visitados, sinal, chave, sentido = fila_prio_retrocesso, visitados_retrocesso, pais_retrocesso, fechados_retrocesso, visitados_avanco, -1, "expansoes_retrocesso", "retrocesso"
+
+        chave_atual, _, atual = heapq.heappop(fila)
+        if atual in fechados: descartes += 1; continue
+        fechados.add(atual)
+        custo = visitados[atual]
+        estatisticas["total_expansoes"] += 1; estatisticas[chave] += 1
+        if ao_expandir is not None: ao_expandir(atual, custo, chave_atual, sentido, estatisticas['total_expansoes'])
+        for vizinho, distancia in grafo.get(atual, []):
+            novo_custo = custo + distancia
+            if novo_custo < visitados.get(vizinho, float('inf')):
+                visitados[vizinho] = novo_custo; pais[vizinho] = atual
+                chave_vizinho = novo_custo + sinal * potencial(vizinho)
+                heapq.heappush(fila, (chave_vizinho, dados_cidades[vizinho]['population'], vizinho))
+                insercoes += 1
+                if ao_inserir is not None: ao_inserir(vizinho, novo_custo, chave_vizinho, sentido)
+                # O encontro é verificado ao relaxar a aresta: o critério de parada depende disso
+                if vizinho in outros_visitados:
+                    custo_total = novo_custo + outros_visitados[vizinho]
+                    if custo_total < custo_total_minimo:
+                        if ao_encontrar is not None: ao_encontrar(vizinho, custo_total, custo_total_minimo)
+                        custo_total_minimo = custo_total; no_encontro = vizinho
+
+    estatisticas["tempo_execucao"] = time.time() - inicio_tempo
+    estatisticas.update({"insercoes_fila": insercoes, "descartes_fila": descartes})
+
+    if no_encontro is not None:
+        caminho = reconstruir_caminho(no_inicial, no_final, no_encontro, pais_avanco, pais_retrocesso)
+        estatisticas.update({"custo_final": custo_total_minimo, "no_encontro": no_encontro})
+        if caminho:
+            estatisticas.update({"caminho": caminho, "caminho_detalhado": formatar_caminho_detalhado(grafo, caminho)})
+            if estatisticas["status"] == "Não Iniciado": estatisticas["status"] = "Caminho encontrado (Terminou por fila vazia)"
+            if ao_finalizar is not None: ao_finalizar(estatisticas, no_inicial, no_final)
+            return caminho, custo_total_minimo, estatisticas
+        estatisticas["status"] = "Erro na Reconstrução"
+        if ao_finalizar is not None: ao_finalizar(estatisticas, no_inicial, no_final)
+        return None, custo_total_minimo, estatisticas
+    if estatisticas["status"] == "Não Iniciado": estatisticas["status"] = "Nenhum caminho encontrado (Espaço de busca esgotado)"
+    if ao_finalizar is not None: ao_finalizar(estatisticas, no_inicial, no_final)
+    return None, float('inf'), estatisticas
+
+
+# --- Busca Bidirecional sobre o Grafo Compacto (CSR) ---
+
+def busca_bidirecional_csr(grafo_csr, no_inicial, no_final, componentes=None, verbosidade=SILENCIOSO, ganchos=None, espaco=None):
+    """
+    Executa a Busca Bidirecional diretamente sobre um GrafoCSR (ids inteiros,
+    adjacência em arrays e população já convertida para int).
+
+    Args:
+        componentes, verbosidade, ganchos: Ver busca_bidirecional_final_verbose.
+        espaco (EspacoBusca, opcional): Listas reutilizadas entre buscas (padrão:
+            o espaço da thread atual, ver espaco_busca.py).
+
+    Returns:
+        tuple: (caminho, custo, estatisticas), no mesmo formato de
+        busca_bidirecional_final_verbose (caminho e nó de encontro por nome).
+    """
+    if verbosidade: print(f"\n--- Iniciando Busca Bidirecional (CSR): {no_inicial} -> {no_final} ---")
+    ao_expandir, ao_inserir, ao_encontrar, ao_finalizar, ao_parar = resolver_ganchos(ganchos, verbosidade, imprimir_resumo_bidirecional)
+    inicio_tempo = time.time()
+
+    estatisticas = novas_estatisticas(bidirecional=True)
+    resultado = iniciar_busca(no_inicial, no_final, grafo_csr, estatisticas, inicio_tempo, componentes, verbosidade, ao_finalizar, ausente=AUSENTE_GRAFO)
+    if resultado is not None:
+        return resultado
+
+    nomes = grafo_csr.nomes; offsets = grafo_csr.offsets; alvos = grafo_csr.alvos
+    pesos = grafo_csr.pesos; populacao = grafo_csr.populacao
+    id_inicial = grafo_csr.ids[no_inicial]; id_final = grafo_csr.ids[no_final]
+
+    # Custo e pai por id nas listas do espaço de busca, uma de cada por sentido
+    # (só valem as posições marcadas com a geração atual)
+    if espaco is None:
+        espaco = espaco_da_thread(len(nomes))
+    geracao = espaco.nova_busca()
+    infinito = float('inf')
+    fila_prio_avanco = [(0, populacao[id_inicial], id_inicial)]
+    visitados_avanco = espaco.custos; pais_avanco = espaco.pais; marcas_avanco = espaco.marcas
+    fila_prio_retrocesso = [(0, populacao[id_final], id_final)]
+    visitados_retrocesso, pais_retrocesso, marcas_retrocesso = espaco.retrocesso()
+    visitados_avanco[id_inicial] = 0; pais_avanco[id_inicial] = -1; marcas_avanco[id_inicial] = geracao
+    visitados_retrocesso[id_final] = 0; pais_retrocesso[id_final] = -1; marcas_retrocesso[id_final] = geracao
+    custo_total_minimo = infinito; no_encontro = None
+
+    insercoes = descartes = 0 # Contadores locais da fila, gravados nas estatísticas ao retornar
+    while fila_prio_avanco and fila_prio_retrocesso:
+        custo_min_avanco = fila_prio_avanco[0][0]; custo_min_retrocesso = fila_prio_retrocesso[0][0]
+        if custo_min_avanco + custo_min_retrocesso >= custo_total_minimo:
+            if ao_parar is not None: ao_parar(custo_min_avanco, custo_min_retrocesso, custo_total_minimo)
+            estatisticas["status"] = "Caminho ótimo encontrado"
+            break 
+
+        # Mesma alternância da versão por nomes: expande o lado com a menor fila
+        if len(fila_prio_avanco) <= len(fila_prio_retrocesso):
+            fila, visitados, pais, marcas, outros_visitados, outras_marcas, chave, sentido = fila_prio_avanco, visitados_avanco, pais_avanco, marcas_avanco, visitados_retrocesso, marcas_retrocesso, "expansoes_avanco", "avanco"
+        else:
+            fila, visitados, pais, marcas, outros_visitados, outras_marcas, chave, sentido = fila_prio_retrocesso, visitados_retrocesso, pais_retrocesso, marcas_retrocesso, visitados_avanco, marcas_avanco, "expansoes_retrocesso", "retrocesso"
+
+        custo, _, atual = heapq.heappop(fila)
+        if custo > visitados[atual]: descartes += 1; continue # Nó na fila: marcado nesta geração
+        estatisticas["total_expansoes"] += 1; estatisticas[chave] += 1
+        if ao_expandir is not None: ao_expandir(nomes[atual], custo, custo, sentido, estatisticas['total_expansoes'])
+        if outras_marcas[atual] == geracao: # O outro sentido já alcançou o nó
+            custo_total = custo + outros_visitados[atual]
+            if custo_total < custo_total_minimo:
+                if ao_encontrar is not None: ao_encontrar(nomes[atual], custo_total, custo_total_minimo)
+                custo_total_minimo = custo_total; no_encontro = atual
+        inicio, fim = offsets[atual], offsets[atual + 1]
+        for vizinho, peso in zip(alvos[inicio:fim], pesos[inicio:fim]):
+            novo_custo = custo + peso
+            if marcas[vizinho] != geracao or novo_custo < visitados[vizinho]:
+                visitados[vizinho] = novo_custo; pais[vizinho] = atual; marcas[vizinho] = geracao
+                heapq.heappush(fila, (novo_custo, populacao[vizinho], vizinho))
+                insercoes += 1
+                if ao_inserir is not None: ao_inserir(nomes[vizinho], novo_custo, novo_custo, sentido)
+
+    estatisticas["tempo_execucao"] = time.time() - inicio_tempo
+    estatisticas.update({"insercoes_fila": insercoes, "descartes_fila": descartes})
+
+    if no_encontro is not None:
+        # Pais em listas: segue cada lado a partir do encontro (nó da origem de cada sentido tem pai -1)
+        caminho_ids = []
+        atual = no_encontro
+        while atual != -1:
+            caminho_ids.append(atual); atual = pais_avanco[atual]
+        caminho_ids.reverse()
+        atual = pais_retrocesso[no_encontro]
+        while atual != -1:
+            caminho_ids.append(atual); atual = pais_retrocesso[atual]
+        if caminho_ids[0] != id_inicial or caminho_ids[-1] != id_final: caminho_ids = None
+        estatisticas.update({"custo_final": custo_total_minimo, "no_encontro": nomes[no_encontro]})
+        if caminho_ids:
+            caminho = [nomes[i] for i in caminho_ids]
+            estatisticas.update({"caminho": caminho, "caminho_detalhado": grafo_csr.formatar_caminho(caminho_ids)})
+            if estatisticas["status"] == "Não Iniciado": estatisticas["status"] = "Caminho encontrado (Terminou por fila vazia)"
+            if ao_finalizar is not None: ao_finalizar(estatisticas, no_inicial, no_final)
+            return caminho, custo_total_minimo, estatisticas
+        estatisticas["status"] = "Erro na Reconstrução"
+        if ao_finalizar is not None: ao_finalizar(estatisticas, no_inicial, no_final)
+        return None, custo_total_minimo, estatisticas
+    if estatisticas["status"] == "Não Iniciado": estatisticas["status"] = "Nenhum caminho encontrado (Espaço de busca esgotado)"
+    if ao_finalizar is not None: ao_finalizar(estatisticas, no_inicial, no_final)
+    return None, float('inf'), estatisticas
+
+
 # --- Bloco Principal de Execução ---
 if __name__ == "__main__":
     ARQUIVO_JSON = 'cities.json'
     RAIO_DISTANCIA = 3.5 # Exemplo de raio 'r' 
+    BACKEND_GRAFO = "grade" # "grade" (índice espacial), "numpy" (blocos vetorizados, requer NumPy), "preguicoso" (vizinhos calculados sob demanda, sem índice de componentes) ou "snapshot" (GrafoCSR mapeado de disco; usa busca_bidirecional_csr e ignora MODO_BUSCA)
+    MODO_BUSCA = "bidirecional" # "bidirecional" (Dijkstra nos dois sentidos) ou "a_estrela" (A* bidirecional)
+    EXECUCAO_PARALELA = False # True: executa os cenários em paralelo (ProcessPoolExecutor)
+    VERBOSIDADE = RESUMO # SILENCIOSO, RESUMO ou RASTREAMENTO (imprime cada expansão; o tempo medido passa a incluir o console)
     ARQUIVO_SAIDA = "resultadobi.txt" 
 
-    print("Carregando dados das cidades...")
-    dados_cidades = carregar_dados_cidades(ARQUIVO_JSON)
+    if BACKEND_GRAFO == "snapshot":
+        # Sem ler o JSON nem construir o grafo: o snapshot só é (re)compilado na primeira
+        # execução ou quando o JSON, o raio ou o formato mudam
+        from snapshot_grafo import carregar_ou_compilar # Import local: snapshot_grafo importa este módulo
+        print(f"Carregando snapshot do grafo (r = {RAIO_DISTANCIA})...")
+        grafo, compilado = carregar_ou_compilar(ARQUIVO_JSON, RAIO_DISTANCIA)
+        dados_cidades = None
+        cidades = grafo # GrafoCSR responde `in` pelo nome da cidade
+    else:
+        print("Carregando dados das cidades...")
+        dados_cidades = carregar_dados_cidades(ARQUIVO_JSON)
+        cidades = dados_cidades
 
-    if dados_cidades:
-        print(f"Dados carregados para {len(dados_cidades)} cidades.")
-        print(f"\nConstruindo grafo com raio de distância r = {RAIO_DISTANCIA}...")
-        grafo = construir_grafo(dados_cidades, RAIO_DISTANCIA)
-        print(f"Grafo construído.")
-        num_arestas = sum(len(adj) for adj in grafo.values()) // 2
-        nos_conectados = sum(1 for cidade in grafo if grafo[cidade]) 
-        print(f"Número de nós com conexões: {nos_conectados} / {len(grafo)}")
-        print(f"Número de arestas: {num_arestas}")
+    if cidades:
+        if dados_cidades is None:
+            print(f"Snapshot {'compilado' if compilado else 'reutilizado'}: {len(grafo)} cidades.")
+            componentes = IndiceComponentes.a_partir_do_csr(grafo)
+            num_arestas = grafo.num_arestas
+            nos_conectados = sum(1 for i in range(len(grafo)) if grafo.grau(i))
+        else:
+            print(f"Dados carregados para {len(dados_cidades)} cidades.")
+            print(f"\nConstruindo grafo com raio de distância r = {RAIO_DISTANCIA}...")
+            if BACKEND_GRAFO == "preguicoso":
+                from grafo_preguicoso import GrafoPreguicoso # Import local: grafo_preguicoso importa este módulo
+                grafo = GrafoPreguicoso(dados_cidades, RAIO_DISTANCIA)
+                componentes = None # Rotular as componentes calcularia todas as vizinhanças
+            elif BACKEND_GRAFO == "numpy":
+                grafo = construir_grafo_numpy(dados_cidades, RAIO_DISTANCIA)
+                componentes = IndiceComponentes.a_partir_do_grafo(grafo)
+            else:
+                uniao = UniaoBusca()
+                grafo = construir_grafo(dados_cidades, RAIO_DISTANCIA, uniao)
+                componentes = IndiceComponentes.a_partir_da_uniao(uniao)
+            print(f"Grafo construído.")
+            if componentes is not None:
+                num_arestas = sum(len(adj) for adj in grafo.values()) // 2
+                nos_conectados = sum(1 for cidade in grafo if grafo[cidade]) 
+        if componentes is None:
+            print(f"Grafo preguiçoso: {len(grafo)} cidades, vizinhos calculados sob demanda.")
+        else:
+            print(f"Número de nós com conexões: {nos_conectados} / {len(grafo)}")
+            print(f"Número de arestas: {num_arestas}")
+            print(componentes.resumo())
 
         # --- Defina os Cenários (SUBSTITUA PELAS SUAS CIDADES) ---
         cidade_inicial_1 = "New York"  
@@ -250,6 +475,23 @@ if __name__ == "__main__":
             (cidade_inicial_3, cidade_final_3)
         ]
 
+        if dados_cidades is None:
+            funcao_busca = busca_bidirecional_csr
+        elif MODO_BUSCA == "a_estrela":
+            funcao_busca = busca_bidirecional_a_estrela
+        else:
+            funcao_busca = busca_bidirecional_final_verbose
+        # Pares em componentes diferentes retornam sem busca
+        funcao_busca = partial(funcao_busca, componentes=componentes)
+        argumentos_grafo = (grafo,) if dados_cidades is None else (grafo, dados_cidades) # Buscas CSR não recebem dados_cidades
+
+        # Com EXECUCAO_PARALELA os cenários válidos rodam antes, em um pool de processos;
+        # o arquivo de saída continua sendo escrito na ordem dos cenários
+        if EXECUCAO_PARALELA:
+            validos = [(i, c) for i, c in enumerate(cenarios, 1) if c[0] in cidades and c[1] in cidades]
+            resultados_paralelos = dict(zip((i for i, _ in validos),
+                                            executar_em_paralelo(funcao_busca, grafo, dados_cidades, [c for _, c in validos])))
+
         # --- Abre o Arquivo de Saída ---
         try:
             with open(ARQUIVO_SAIDA, 'w', encoding='utf-8') as outfile:
@@ -270,14 +512,17 @@ if __name__ == "__main__":
                     outfile.write(f"=============================================\n\n")
 
                     # (Verificação de existência das cidades - sem alterações)
-                    if inicio not in dados_cidades or fim not in dados_cidades:
+                    if inicio not in cidades or fim not in cidades:
                          print(f"\nErro: Cenário {i} pulado. Cidade inicial '{inicio}' ou Cidade final '{fim}' não encontrada.")
                          outfile.write(f"Erro: Cidade inicial '{inicio}' ou Cidade final '{fim}' não encontrada nos dados JSON.\n\n")
-                         resultados_finais[f"Cenário {i}"] = {"status": "Erro de Entrada", "message": f"Cidade '{inicio if inicio not in dados_cidades else fim}' não encontrada no JSON."}
+                         resultados_finais[f"Cenário {i}"] = {"status": "Erro de Entrada", "message": f"Cidade '{inicio if inicio not in cidades else fim}' não encontrada no JSON."}
                          continue
 
                     # Chama a função de busca (que imprime no console)
-                    caminho, custo, estatisticas = busca_bidirecional_final_verbose(grafo, dados_cidades, inicio, fim) 
+                    if EXECUCAO_PARALELA:
+                        caminho, custo, estatisticas = resultados_paralelos[i]
+                    else:
+                        caminho, custo, estatisticas = funcao_busca(*argumentos_grafo, inicio, fim, verbosidade=VERBOSIDADE) 
                     resultados_finais[f"Cenário {i}"] = estatisticas 
 
                     # --- Escreve o Bloco de Resumo Final no Arquivo (USA CAMINHO DETALHADO) ---
@@ -1,7 +1,16 @@
 import math
 import heapq 
-import json
 import time 
+from functools import partial
+
+from indice_espacial import construir_grafo_espacial
+from carregador_cidades import TabelaCidades
+from componentes import IndiceComponentes, UniaoBusca
+from preparacao_busca import novas_estatisticas, iniciar_busca, criar_heuristica_euclidiana
+from ganchos_busca import resolver_ganchos, SILENCIOSO, RESUMO
+from construtor_numpy import construir_grafo_numpy
+from execucao_paralela import executar_em_paralelo
+from espaco_busca import espaco_da_thread
 
 # --- Funções Auxiliares (Sem alterações) ---
 
@@ -9,17 +18,9 @@ def calcular_distancia_euclidiana(coords_cidade1, coords_cidade2):
     return math.dist(coords_cidade1, coords_cidade2)
 
 def carregar_dados_cidades(caminho_arquivo_json):
+    # Leitura em fluxo (JSON, NDJSON ou CSV) com população int e homônimos desambiguados
     try:
-        with open(caminho_arquivo_json, 'r', encoding='utf-8') as f:
-            dados = json.load(f)
-        cidades = {
-            item['city']: {
-                'coords': (item['latitude'], item['longitude']),
-                'population': item['population']
-            }
-            for item in dados
-        }
-        return cidades
+        return TabelaCidades.carregar(caminho_arquivo_json).para_dados_cidades()
     except FileNotFoundError:
         print(f"Erro: Arquivo JSON não encontrado em {caminho_arquivo_json}")
         return None
@@ -27,24 +28,49 @@ def carregar_dados_cidades(caminho_arquivo_json):
         print(f"Erro ao carregar ou processar o JSON: {e}")
         return None
 
-def construir_grafo(dados_cidades, r):
-    grafo = {cidade: [] for cidade in dados_cidades}
-    nomes_cidades = list(dados_cidades.keys())
-    for i in range(len(nomes_cidades)):
-        for j in range(i + 1, len(nomes_cidades)):
-            nome_cidade1 = nomes_cidades[i]
-            nome_cidade2 = nomes_cidades[j]
-            dados_cidade1 = dados_cidades[nome_cidade1]
-            dados_cidade2 = dados_cidades[nome_cidade2]
-            distancia = calcular_distancia_euclidiana(dados_cidade1['coords'], dados_cidade2['coords'])
-            if distancia <= r:
-                grafo[nome_cidade1].append((nome_cidade2, distancia))
-                grafo[nome_cidade2].append((nome_cidade1, distancia))
-    return grafo
+def construir_grafo(dados_cidades, r, uniao=None):
+    # Usa a grade espacial: só compara cidades em células vizinhas (mesmas arestas do laço par-a-par).
+    # Com `uniao` (UniaoBusca), as componentes conexas são montadas junto com as arestas
+    return construir_grafo_espacial(dados_cidades, r, uniao)
+
+def formatar_caminho_detalhado(grafo, caminho):
+    # Gera "A -> B (Dist: x.xx) -> C (Dist: y.yy)" usando os pesos das arestas do grafo
+    partes_caminho_str = [caminho[0]]
+    for i in range(len(caminho) - 1):
+        cid_atual = caminho[i]
+        prox_cid = caminho[i+1]
+        dist_seg = None
+        if cid_atual in grafo:
+             adj = grafo[cid_atual]
+             dist_tup = next((item for item in adj if item[0] == prox_cid), None)
+             if dist_tup: dist_seg = dist_tup[1]
+        if dist_seg is not None:
+             partes_caminho_str.append(f"-> {prox_cid} (Dist: {dist_seg:.2f})")
+        else:
+             partes_caminho_str.append(f"-> {prox_cid} (Dist: ??)")
+    return " ".join(partes_caminho_str)
+
+def imprimir_resumo_ucs(estatisticas, no_inicial, no_final):
+    # Resumo final da busca no console (com ou sem caminho encontrado)
+    print("\n--- Busca Finalizada ---")
+    print(f"Total de Expansões de Nós: {estatisticas['total_expansoes']}") 
+    print(f"Tempo de Execução: {estatisticas['tempo_execucao']:.4f} segundos") 
+    if estatisticas["caminho"]:
+        print(f"Custo final calculado: {estatisticas['custo_final']:.2f}")
+    else:
+        print(f"Nenhum caminho encontrado entre {no_inicial} e {no_final}.")
+    print(f"\n--- Resultado Final ---")
+    print(f"  Status: {estatisticas['status']}")
+    if estatisticas["caminho"]:
+        print(f"  Caminho Encontrado ({len(estatisticas['caminho'])} cidades):")
+        print(f"    {estatisticas['caminho_detalhado']}") 
+        print(f"  Distância Total: {estatisticas['custo_final']:.2f}")
+    print(f"  Total de Expansões de Nós: {estatisticas['total_expansoes']}")
+    print(f"  Tempo de Execução: {estatisticas['tempo_execucao']:.4f} segundos")
 
 # --- Busca de Custo Uniforme (UCS) ---
 
-def busca_custo_uniforme(grafo, dados_cidades, no_inicial, no_final):
+def busca_custo_uniforme(grafo, dados_cidades, no_inicial, no_final, componentes=None, verbosidade=SILENCIOSO, ganchos=None):
     """
     Executa a Busca de Custo Uniforme (UCS)
     e imprime um resumo final detalhado no console.
@@ -54,36 +80,23 @@ def busca_custo_uniforme(grafo, dados_cidades, no_inicial, no_final):
         dados_cidades (dict): Dados das cidades incluindo população.
         no_inicial (str): Nome da cidade inicial.
         no_final (str): Nome da cidade de destino.
+        componentes (IndiceComponentes, opcional): Se as cidades estiverem em
+            componentes diferentes, retorna sem buscar.
+        verbosidade (int, opcional): SILENCIOSO (padrão), RESUMO ou RASTREAMENTO
+            (cada expansão no console). Ver ganchos_busca.py.
+        ganchos (GanchosBusca, opcional): Callbacks on_expand, on_push e on_finish.
 
     Returns:
         tuple: (caminho, custo, estatisticas)
     """
-    print(f"\n--- Iniciando Busca de Custo Uniforme (UCS): {no_inicial} -> {no_final} ---")
+    if verbosidade: print(f"\n--- Iniciando Busca de Custo Uniforme (UCS): {no_inicial} -> {no_final} ---")
+    ao_expandir, ao_inserir, _, ao_finalizar, _ = resolver_ganchos(ganchos, verbosidade, imprimir_resumo_ucs)
     inicio_tempo = time.time()
 
-    # Dicionário para guardar estatísticas da busca
-    estatisticas = {
-        "total_expansoes": 0, 
-        "custo_final": float('inf'),
-        "caminho": None, 
-        "caminho_detalhado": "", # String do caminho com distâncias
-        "tempo_execucao": 0,
-        "status": "Não Iniciado" 
-    }
-
-    # Caso base: nó inicial é o mesmo que o final
-    if no_inicial == no_final:
-        print("Nó inicial é o mesmo que o nó final.")
-        estatisticas.update({"status": "Inicial igual ao Final", "caminho": [no_inicial], "custo_final": 0, "tempo_execucao": time.time() - inicio_tempo, "caminho_detalhado": no_inicial})
-        return [no_inicial], 0, estatisticas
-        
-    # Verifica se os nós existem no grafo
-    # (Nota: UCS pode encontrar um caminho mesmo que o nó final não tenha saídas, 
-    # mas ambos devem existir como possíveis estados/chaves no dicionário de dados)
-    if no_inicial not in dados_cidades or no_final not in dados_cidades:
-         print(f"Erro: Nó inicial '{no_inicial}' ou Nó final '{no_final}' não encontrado nos dados das cidades.")
-         estatisticas.update({"status": "Nó Inicial ou Final não existe", "tempo_execucao": time.time() - inicio_tempo})
-         return None, float('inf'), estatisticas
+    estatisticas = novas_estatisticas()
+    resultado = iniciar_busca(no_inicial, no_final, dados_cidades, estatisticas, inicio_tempo, componentes, verbosidade, ao_finalizar)
+    if resultado is not None:
+        return resultado
         
     # --- Inicialização UCS ---
     # Fila de prioridade: armazena (custo_acumulado, populacao_atual, no_atual, caminho_ate_aqui)
@@ -95,60 +108,33 @@ def busca_custo_uniforme(grafo, dados_cidades, no_inicial, no_final):
     visitados = set() 
 
     # --- Loop Principal da Busca UCS ---
+    insercoes = descartes = 0 # Contadores locais da fila, gravados nas estatísticas ao retornar
     while fila_prio:
         # Retira o nó com o MENOR custo acumulado da fila
         custo_atual, _, no_atual, caminho_atual = heapq.heappop(fila_prio)
 
         # Se já visitamos (processamos) este nó, pulamos (já encontramos o caminho ótimo para ele)
         if no_atual in visitados:
+            descartes += 1
             continue
 
         # Marca o nó atual como visitado (seu caminho ótimo foi encontrado agora)
         visitados.add(no_atual)
         estatisticas["total_expansoes"] += 1 # Conta como uma expansão válida
         
-        # Imprime a expansão (moderado)
-        print(f"  [{estatisticas['total_expansoes']:<4} UCS] Expandir: {no_atual:<15} (Custo Acum.: {custo_atual:.2f})")
+        if ao_expandir is not None: ao_expandir(no_atual, custo_atual, custo_atual, None, estatisticas['total_expansoes'])
 
         # --- Teste de Objetivo ---
         if no_atual == no_final:
             fim_tempo = time.time()
             estatisticas["tempo_execucao"] = fim_tempo - inicio_tempo
+            estatisticas.update({"insercoes_fila": insercoes, "descartes_fila": descartes})
             estatisticas["custo_final"] = custo_atual
             estatisticas["caminho"] = caminho_atual
             estatisticas["status"] = "Caminho ótimo encontrado"
 
-            # --- Formata Caminho com Distâncias ---
-            partes_caminho_str = [caminho_atual[0]]
-            for i in range(len(caminho_atual) - 1):
-                cid_atual = caminho_atual[i]
-                prox_cid = caminho_atual[i+1]
-                dist_seg = None
-                if cid_atual in grafo:
-                     adj = grafo[cid_atual]
-                     dist_tup = next((item for item in adj if item[0] == prox_cid), None)
-                     if dist_tup: dist_seg = dist_tup[1]
-                if dist_seg is not None:
-                     partes_caminho_str.append(f"-> {prox_cid} (Dist: {dist_seg:.2f})")
-                else:
-                     partes_caminho_str.append(f"-> {prox_cid} (Dist: ??)")
-            estatisticas["caminho_detalhado"] = " ".join(partes_caminho_str)
-            # --- Fim Formatação ---
-
-            # --- Imprime Resumo Final no Console ---
-            print("\n--- Busca Finalizada ---")
-            print(f"Total de Expansões de Nós: {estatisticas['total_expansoes']}") 
-            print(f"Tempo de Execução: {estatisticas['tempo_execucao']:.4f} segundos") 
-            print(f"Custo final calculado: {estatisticas['custo_final']:.2f}")
-            
-            print(f"\n--- Resultado Final ---")
-            print(f"  Status: {estatisticas['status']}")
-            print(f"  Caminho Encontrado ({len(caminho_atual)} cidades):")
-            print(f"    {estatisticas['caminho_detalhado']}") 
-            print(f"  Distância Total: {estatisticas['custo_final']:.2f}")
-            print(f"  Total de Expansões de Nós: {estatisticas['total_expansoes']}")
-            print(f"  Tempo de Execução: {estatisticas['tempo_execucao']:.4f} segundos")
-            # --- Fim Impressão Console ---
+            estatisticas["caminho_detalhado"] = formatar_caminho_detalhado(grafo, caminho_atual)
+            if ao_finalizar is not None: ao_finalizar(estatisticas, no_inicial, no_final)
 
             return caminho_atual, custo_atual, estatisticas
 
@@ -162,24 +148,316 @@ def busca_custo_uniforme(grafo, dados_cidades, no_inicial, no_final):
                 novo_caminho.append(vizinho)
                 # Adiciona o vizinho na fila com seu novo custo e caminho
                 heapq.heappush(fila_prio, (novo_custo, dados_cidades[vizinho]['population'], vizinho, novo_caminho))
+                insercoes += 1
+                if ao_inserir is not None: ao_inserir(vizinho, novo_custo, novo_custo, None)
 
     # --- Fim do Loop: Fila Vazia ---
     # Se a fila esvaziar antes de encontrar o objetivo, não há caminho
     fim_tempo = time.time()
     estatisticas["tempo_execucao"] = fim_tempo - inicio_tempo
+    estatisticas.update({"insercoes_fila": insercoes, "descartes_fila": descartes})
     estatisticas["status"] = "Nenhum caminho encontrado (Espaço de busca esgotado)"
-    
-    # --- Imprime Resumo Final (Sem Caminho) ---
-    print("\n--- Busca Finalizada ---")
-    print(f"Total de Expansões de Nós: {estatisticas['total_expansoes']}") 
-    print(f"Tempo de Execução: {estatisticas['tempo_execucao']:.4f} segundos") 
-    print(f"Nenhum caminho encontrado entre {no_inicial} e {no_final}.")
-    print(f"\n--- Resultado Final ---")
-    print(f"  Status: {estatisticas['status']}")
-    print(f"  Total de Expansões de Nós: {estatisticas['total_expansoes']}")
-    print(f"  Tempo de Execução: {estatisticas['tempo_execucao']:.4f} segundos")
-    # --- Fim Impressão Console ---
+    if ao_finalizar is not None: ao_finalizar(estatisticas, no_inicial, no_final)
+
+    return None, float('inf'), estatisticas
+
+
+# --- UCS com Ponteiros de Pai ---
+
+def busca_custo_uniforme_pais(grafo, dados_cidades, no_inicial, no_final, componentes=None, verbosidade=SILENCIOSO, ganchos=None):
+    """
+    Variante da UCS que guarda o melhor custo conhecido e o pai de cada nó
+    (como `pais_avanco` na busca bidirecional) em vez de copiar o caminho em
+    cada entrada da fila. Inserções que não melhoram o melhor custo conhecido
+    são descartadas e o caminho é reconstruído uma única vez no final.
+
+    Args:
+        grafo (dict): Representação da lista de adjacências.
+        dados_cidades (dict): Dados das cidades incluindo população.
+        no_inicial (str): Nome da cidade inicial.
+        no_final (str): Nome da cidade de destino.
+        componentes, verbosidade, ganchos: Ver busca_custo_uniforme.
+
+    Returns:
+        tuple: (caminho, custo, estatisticas), iguais aos de busca_custo_uniforme.
+    """
+    if verbosidade: print(f"\n--- Iniciando Busca de Custo Uniforme (UCS): {no_inicial} -> {no_final} ---")
+    ao_expandir, ao_inserir, _, ao_finalizar, _ = resolver_ganchos(ganchos, verbosidade, imprimir_resumo_ucs)
+    inicio_tempo = time.time()
+
+    estatisticas = novas_estatisticas()
+    resultado = iniciar_busca(no_inicial, no_final, dados_cidades, estatisticas, inicio_tempo, componentes, verbosidade, ao_finalizar)
+    if resultado is not None:
+        return resultado
+
+    # Fila de prioridade: (custo_acumulado, populacao, no) — o caminho fica em `pais`
+    fila_prio = [(0, dados_cidades[no_inicial]['population'], no_inicial)]
+    melhor_custo = {no_inicial: 0} # Melhor custo conhecido até cada nó
+    pais = {no_inicial: None}
+    visitados = set()
+
+    insercoes = descartes = 0 # Contadores locais da fila, gravados nas estatísticas ao retornar
+    while fila_prio:
+        custo_atual, _, no_atual = heapq.heappop(fila_prio)
+        if no_atual in visitados:
+            descartes += 1
+            continue
+        visitados.add(no_atual)
+        estatisticas["total_expansoes"] += 1
+        if ao_expandir is not None: ao_expandir(no_atual, custo_atual, custo_atual, None, estatisticas['total_expansoes'])
+
+        if no_atual == no_final:
+            # Reconstrói o caminho seguindo os pais a partir do destino
+            caminho = []
+            atual = no_atual
+            while atual is not None:
+                caminho.append(atual)
+                atual = pais[atual]
+            caminho.reverse()
+            estatisticas["tempo_execucao"] = time.time() - inicio_tempo
+            estatisticas.update({"insercoes_fila": insercoes, "descartes_fila": descartes})
+            estatisticas.update({"custo_final": custo_atual, "caminho": caminho, "status": "Caminho ótimo encontrado",
+                                 "caminho_detalhado": formatar_caminho_detalhado(grafo, caminho)})
+            if ao_finalizar is not None: ao_finalizar(estatisticas, no_inicial, no_final)
+            return caminho, custo_atual, estatisticas
+
+        for vizinho, distancia in grafo.get(no_atual, []):
+            if vizinho in visitados:
+                continue
+            novo_custo = custo_atual + distancia
+            # Só insere se melhorar o melhor custo conhecido (fila com O(V) entradas úteis)
+            if novo_custo < melhor_custo.get(vizinho, float('inf')):
+                melhor_custo[vizinho] = novo_custo
+                pais[vizinho] = no_atual
+                heapq.heappush(fila_prio, (novo_custo, dados_cidades[vizinho]['population'], vizinho))
+                insercoes += 1
+                if ao_inserir is not None: ao_inserir(vizinho, novo_custo, novo_custo, None)
+
+    estatisticas["tempo_execucao"] = time.time() - inicio_tempo
+    estatisticas.update({"insercoes_fila": insercoes, "descartes_fila": descartes})
+    estatisticas["status"] = "Nenhum caminho encontrado (Espaço de busca esgotado)"
+    if ao_finalizar is not None: ao_finalizar(estatisticas, no_inicial, no_final)
+    return None, float('inf'), estatisticas
+
+
+# --- Alcance Limitado por Custo (Isócrona) ---
+
+def alcancaveis(grafo, dados_cidades, origens, orcamento):
+    """
+    Gera, em ordem de custo, as cidades alcançáveis a partir de `origens` com
+    custo até `orcamento` (inclusive): a mesma fila e o mesmo conjunto de
+    visitados da UCS, sem destino. Como é um gerador, quem chama pode parar a
+    qualquer momento (ex.: nas primeiras N cidades).
+
+    Nós acima do orçamento nunca entram na fila, e o pai vai na própria entrada
+    da fila: a memória fica restrita à região fixada e à sua fronteira.
+
+    Args:
+        grafo (dict): Representação da lista de adjacências.
+        dados_cidades (dict): Dados das cidades incluindo população (desempate na fila).
+        origens (str ou iterável de str): Uma ou mais cidades de partida, todas com custo 0.
+        orcamento (float): Custo máximo.
+
+    Yields:
+        tuple: (cidade, custo, pai) — pai é None nas origens.
+    """
+    if isinstance(origens, str):
+        origens = [origens]
+    fila_prio = []
+    melhor_custo = {} # Melhor custo conhecido dos nós ainda na fila
+    for origem in origens:
+        if origem not in dados_cidades:
+            raise KeyError(f"Cidade de origem '{origem}' não encontrada nos dados das cidades")
+        if origem not in melhor_custo:
+            melhor_custo[origem] = 0
+            fila_prio.append((0, dados_cidades[origem]['population'], origem, None))
+    heapq.heapify(fila_prio)
+    visitados = set()
+
+    while fila_prio:
+        custo_atual, _, no_atual, pai = heapq.heappop(fila_prio)
+        if no_atual in visitados:
+            continue
+        visitados.add(no_atual)
+        del melhor_custo[no_atual]
+        yield no_atual, custo_atual, pai
+
+        for vizinho, distancia in grafo.get(no_atual, []):
+            if vizinho in visitados:
+                continue
+            novo_custo = custo_atual + distancia
+            if novo_custo <= orcamento and novo_custo < melhor_custo.get(vizinho, float('inf')):
+                melhor_custo[vizinho] = novo_custo
+                heapq.heappush(fila_prio, (novo_custo, dados_cidades[vizinho]['population'], vizinho, no_atual))
+
+
+# --- Busca A* (Heurística de Distância em Linha Reta) ---
+
+def busca_a_estrela(grafo, dados_cidades, no_inicial, no_final, heuristica=None, componentes=None, verbosidade=SILENCIOSO, ganchos=None):
+    """
+    Executa a busca A*: como a UCS com ponteiros de pai, mas a fila é ordenada
+    por f = custo_acumulado + h(no, destino).
 
+    Args:
+        grafo (dict): Representação da lista de adjacências.
+        dados_cidades (dict): Dados das cidades incluindo população e coordenadas.
+        no_inicial (str): Nome da cidade inicial.
+        no_final (str): Nome da cidade de destino.
+        heuristica (callable, opcional): h(no, alvo) consistente. Padrão: distância
+            euclidiana entre as coordenadas.
+        componentes, verbosidade, ganchos: Ver busca_custo_uniforme.
+
+    Returns:
+        tuple: (caminho, custo, estatisticas), no mesmo formato de busca_custo_uniforme.
+    """
+    if verbosidade: print(f"\n--- Iniciando Busca A*: {no_inicial} -> {no_final} ---")
+    ao_expandir, ao_inserir, _, ao_finalizar, _ = resolver_ganchos(ganchos, verbosidade, imprimir_resumo_ucs, rotulo="A* ", mostrar_prioridade=True)
+    inicio_tempo = time.time()
+
+    estatisticas = novas_estatisticas()
+    resultado = iniciar_busca(no_inicial, no_final, dados_cidades, estatisticas, inicio_tempo, componentes, verbosidade, ao_finalizar)
+    if resultado is not None:
+        return resultado
+
+    if heuristica is None:
+        heuristica = criar_heuristica_euclidiana(dados_cidades)
+
+    # Fila de prioridade: (f, populacao, no); o custo g fica em `melhor_custo`
+    fila_prio = [(heuristica(no_inicial, no_final), dados_cidades[no_inicial]['population'], no_inicial)]
+    melhor_custo = {no_inicial: 0}
+    pais = {no_inicial: None}
+    visitados = set()
+
+    insercoes = descartes = 0 # Contadores locais da fila, gravados nas estatísticas ao retornar
+    while fila_prio:
+        f_atual, _, no_atual = heapq.heappop(fila_prio)
+        if no_atual in visitados:
+            descartes += 1
+            continue
+        visitados.add(no_atual)
+        custo_atual = melhor_custo[no_atual]
+        estatisticas["total_expansoes"] += 1
+        if ao_expandir is not None: ao_expandir(no_atual, custo_atual, f_atual, None, estatisticas['total_expansoes'])
+
+        if no_atual == no_final:
+            caminho = []
+            atual = no_atual
+            while atual is not None:
+                caminho.append(atual)
+                atual = pais[atual]
+            caminho.reverse()
+            estatisticas["tempo_execucao"] = time.time() - inicio_tempo
+            estatisticas.update({"insercoes_fila": insercoes, "descartes_fila": descartes})
+            estatisticas.update({"custo_final": custo_atual, "caminho": caminho, "status": "Caminho ótimo encontrado",
+                                 "caminho_detalhado": formatar_caminho_detalhado(grafo, caminho)})
+            if ao_finalizar is not None: ao_finalizar(estatisticas, no_inicial, no_final)
+            return caminho, custo_atual, estatisticas
+
+        for vizinho, distancia in grafo.get(no_atual, []):
+            if vizinho in visitados:
+                continue
+            novo_custo = custo_atual + distancia
+            if novo_custo < melhor_custo.get(vizinho, float('inf')):
+                melhor_custo[vizinho] = novo_custo
+                pais[vizinho] = no_atual
+                f_vizinho = novo_custo + heuristica(vizinho, no_final)
+                heapq.heappush(fila_prio, (f_vizinho, dados_cidades[vizinho]['population'], vizinho))
+                insercoes += 1
+                if ao_inserir is not None: ao_inserir(vizinho, novo_custo, f_vizinho, None)
+
+    estatisticas["tempo_execucao"] = time.time() - inicio_tempo
+    estatisticas.update({"insercoes_fila": insercoes, "descartes_fila": descartes})
+    estatisticas["status"] = "Nenhum caminho encontrado (Espaço de busca esgotado)"
+    if ao_finalizar is not None: ao_finalizar(estatisticas, no_inicial, no_final)
+    return None, float('inf'), estatisticas
+
+
+# --- UCS sobre o Grafo Compacto (CSR) ---
+
+def busca_custo_uniforme_csr(grafo_csr, no_inicial, no_final, componentes=None, verbosidade=SILENCIOSO, ganchos=None, espaco=None):
+    """
+    Executa a UCS diretamente sobre um GrafoCSR (ids inteiros, adjacência em
+    arrays e população já convertida para int). Guarda apenas custo e pai de
+    cada nó, reconstruindo o caminho no final.
+
+    Args:
+        grafo_csr (GrafoCSR): Grafo compacto (ver grafo_csr.py).
+        no_inicial (str): Nome da cidade inicial.
+        no_final (str): Nome da cidade de destino.
+        componentes, verbosidade, ganchos: Ver busca_custo_uniforme.
+        espaco (EspacoBusca, opcional): Listas reutilizadas entre buscas (padrão:
+            o espaço da thread atual, ver espaco_busca.py).
+
+    Returns:
+        tuple: (caminho, custo, estatisticas), no mesmo formato de busca_custo_uniforme.
+    """
+    if verbosidade: print(f"\n--- Iniciando Busca de Custo Uniforme (UCS/CSR): {no_inicial} -> {no_final} ---")
+    ao_expandir, ao_inserir, _, ao_finalizar, _ = resolver_ganchos(ganchos, verbosidade, imprimir_resumo_ucs)
+    inicio_tempo = time.time()
+
+    estatisticas = novas_estatisticas()
+    resultado = iniciar_busca(no_inicial, no_final, grafo_csr, estatisticas, inicio_tempo, componentes, verbosidade, ao_finalizar)
+    if resultado is not None:
+        return resultado
+
+    # Referências locais aos arrays (evita acessos a atributos no laço)
+    nomes = grafo_csr.nomes; offsets = grafo_csr.offsets; alvos = grafo_csr.alvos
+    pesos = grafo_csr.pesos; populacao = grafo_csr.populacao
+    id_inicial = grafo_csr.ids[no_inicial]; id_final = grafo_csr.ids[no_final]
+
+    # Estado por id nas listas do espaço de busca: sem hashing no laço e sem
+    # alocação por consulta (só valem as posições marcadas com a geração atual)
+    if espaco is None:
+        espaco = espaco_da_thread(len(nomes))
+    geracao = espaco.nova_busca()
+    melhor_custo = espaco.custos; pais = espaco.pais
+    marcas = espaco.marcas; fixados = espaco.fixados
+    melhor_custo[id_inicial] = 0; pais[id_inicial] = -1; marcas[id_inicial] = geracao
+
+    # Fila de prioridade: (custo_acumulado, populacao, id) — sem cópia de caminho por entrada
+    fila_prio = [(0, populacao[id_inicial], id_inicial)]
+
+    insercoes = descartes = 0 # Contadores locais da fila, gravados nas estatísticas ao retornar
+    while fila_prio:
+        custo_atual, _, no_atual = heapq.heappop(fila_prio)
+        if fixados[no_atual] == geracao:
+            descartes += 1
+            continue
+        fixados[no_atual] = geracao
+        estatisticas["total_expansoes"] += 1
+        if ao_expandir is not None: ao_expandir(nomes[no_atual], custo_atual, custo_atual, None, estatisticas['total_expansoes'])
+
+        if no_atual == id_final:
+            caminho_ids = []
+            atual = no_atual
+            while atual != -1:
+                caminho_ids.append(atual)
+                atual = pais[atual]
+            caminho_ids.reverse()
+            caminho = [nomes[i] for i in caminho_ids]
+            estatisticas["tempo_execucao"] = time.time() - inicio_tempo
+            estatisticas.update({"insercoes_fila": insercoes, "descartes_fila": descartes})
+            estatisticas.update({"custo_final": custo_atual, "caminho": caminho, "status": "Caminho ótimo encontrado",
+                                 "caminho_detalhado": grafo_csr.formatar_caminho(caminho_ids)})
+            if ao_finalizar is not None: ao_finalizar(estatisticas, no_inicial, no_final)
+            return caminho, custo_atual, estatisticas
+
+        inicio, fim = offsets[no_atual], offsets[no_atual + 1]
+        for vizinho, peso in zip(alvos[inicio:fim], pesos[inicio:fim]):
+            if fixados[vizinho] == geracao:
+                continue
+            novo_custo = custo_atual + peso
+            if marcas[vizinho] != geracao or novo_custo < melhor_custo[vizinho]:
+                melhor_custo[vizinho] = novo_custo; marcas[vizinho] = geracao
+                pais[vizinho] = no_atual
+                heapq.heappush(fila_prio, (novo_custo, populacao[vizinho], vizinho))
+                insercoes += 1
+                if ao_inserir is not None: ao_inserir(nomes[vizinho], novo_custo, novo_custo, None)
+
+    estatisticas["tempo_execucao"] = time.time() - inicio_tempo
+    estatisticas.update({"insercoes_fila": insercoes, "descartes_fila": descartes})
+    estatisticas["status"] = "Nenhum caminho encontrado (Espaço de busca esgotado)"
+    if ao_finalizar is not None: ao_finalizar(estatisticas, no_inicial, no_final)
     return None, float('inf'), estatisticas
 
 
@@ -187,20 +465,55 @@ def busca_custo_uniforme(grafo, dados_cidades, no_inicial, no_final):
 if __name__ == "__main__":
     ARQUIVO_JSON = 'cities.json'
     RAIO_DISTANCIA = 3.5 # Exemplo de raio 'r' 
+    BACKEND_GRAFO = "grade" # "grade" (índice espacial), "numpy" (blocos vetorizados, requer NumPy), "preguicoso" (vizinhos calculados sob demanda, sem índice de componentes) ou "snapshot" (GrafoCSR mapeado de disco; usa busca_custo_uniforme_csr e ignora MODO_UCS)
+    MODO_UCS = "pais" # "pais" (ponteiros de pai), "caminhos" (cópia do caminho em cada entrada da fila) ou "a_estrela" (A*)
+    EXECUCAO_PARALELA = False # True: executa os cenários em paralelo (ProcessPoolExecutor)
+    VERBOSIDADE = RESUMO # SILENCIOSO, RESUMO ou RASTREAMENTO (imprime cada expansão; o tempo medido passa a incluir o console)
     ARQUIVO_SAIDA = "resultado_ucs.txt" # NOVO NOME para o arquivo de saída UCS
 
-    print("Carregando dados das cidades...")
-    dados_cidades = carregar_dados_cidades(ARQUIVO_JSON)
-
-    if dados_cidades:
-        print(f"Dados carregados para {len(dados_cidades)} cidades.")
-        print(f"\nConstruindo grafo com raio de distância r = {RAIO_DISTANCIA}...")
-        grafo = construir_grafo(dados_cidades, RAIO_DISTANCIA)
-        print(f"Grafo construído.")
-        num_arestas = sum(len(adj) for adj in grafo.values()) // 2
-        nos_conectados = sum(1 for cidade in grafo if grafo[cidade]) 
-        print(f"Número de nós com conexões: {nos_conectados} / {len(grafo)}")
-        print(f"Número de arestas: {num_arestas}")
+    if BACKEND_GRAFO == "snapshot":
+        # Sem ler o JSON nem construir o grafo: o snapshot só é (re)compilado na primeira
+        # execução ou quando o JSON, o raio ou o formato mudam
+        from snapshot_grafo import carregar_ou_compilar # Import local: snapshot_grafo importa este módulo
+        print(f"Carregando snapshot do grafo (r = {RAIO_DISTANCIA})...")
+        grafo, compilado = carregar_ou_compilar(ARQUIVO_JSON, RAIO_DISTANCIA)
+        dados_cidades = None
+        cidades = grafo # GrafoCSR responde `in` pelo nome da cidade
+    else:
+        print("Carregando dados das cidades...")
+        dados_cidades = carregar_dados_cidades(ARQUIVO_JSON)
+        cidades = dados_cidades
+
+    if cidades:
+        if dados_cidades is None:
+            print(f"Snapshot {'compilado' if compilado else 'reutilizado'}: {len(grafo)} cidades.")
+            componentes = IndiceComponentes.a_partir_do_csr(grafo)
+            num_arestas = grafo.num_arestas
+            nos_conectados = sum(1 for i in range(len(grafo)) if grafo.grau(i))
+        else:
+            print(f"Dados carregados para {len(dados_cidades)} cidades.")
+            print(f"\nConstruindo grafo com raio de distância r = {RAIO_DISTANCIA}...")
+            if BACKEND_GRAFO == "preguicoso":
+                from grafo_preguicoso import GrafoPreguicoso # Import local: grafo_preguicoso importa este módulo
+                grafo = GrafoPreguicoso(dados_cidades, RAIO_DISTANCIA)
+                componentes = None # Rotular as componentes calcularia todas as vizinhanças
+            elif BACKEND_GRAFO == "numpy":
+                grafo = construir_grafo_numpy(dados_cidades, RAIO_DISTANCIA)
+                componentes = IndiceComponentes.a_partir_do_grafo(grafo)
+            else:
+                uniao = UniaoBusca()
+                grafo = construir_grafo(dados_cidades, RAIO_DISTANCIA, uniao)
+                componentes = IndiceComponentes.a_partir_da_uniao(uniao)
+            print(f"Grafo construído.")
+            if componentes is not None:
+                num_arestas = sum(len(adj) for adj in grafo.values()) // 2
+                nos_conectados = sum(1 for cidade in grafo if grafo[cidade]) 
+        if componentes is None:
+            print(f"Grafo preguiçoso: {len(grafo)} cidades, vizinhos calculados sob demanda.")
+        else:
+            print(f"Número de nós com conexões: {nos_conectados} / {len(grafo)}")
+            print(f"Número de arestas: {num_arestas}")
+            print(componentes.resumo())
 
         # --- Defina os Cenários (Mesmos do exemplo anterior) ---
         cidade_inicial_1 = "New York"  
@@ -215,6 +528,25 @@ if __name__ == "__main__":
             (cidade_inicial_3, cidade_final_3)
         ]
 
+        if dados_cidades is None:
+            funcao_busca = busca_custo_uniforme_csr
+        elif MODO_UCS == "a_estrela":
+            funcao_busca = busca_a_estrela
+        elif MODO_UCS == "pais":
+            funcao_busca = busca_custo_uniforme_pais
+        else:
+            funcao_busca = busca_custo_uniforme
+        # Pares em componentes diferentes retornam sem busca
+        funcao_busca = partial(funcao_busca, componentes=componentes)
+        argumentos_grafo = (grafo,) if dados_cidades is None else (grafo, dados_cidades) # Buscas CSR não recebem dados_cidades
+
+        # Com EXECUCAO_PARALELA os cenários válidos rodam antes, em um pool de processos;
+        # o arquivo de saída continua sendo escrito na ordem dos cenários
+        if EXECUCAO_PARALELA:
+            validos = [(i, c) for i, c in enumerate(cenarios, 1) if c[0] in cidades and c[1] in cidades]
+            resultados_paralelos = dict(zip((i for i, _ in validos),
+                                            executar_em_paralelo(funcao_busca, grafo, dados_cidades, [c for _, c in validos])))
+
         # --- Abre o Arquivo de Saída ---
         try:
             with open(ARQUIVO_SAIDA, 'w', encoding='utf-8') as outfile:
@@ -236,14 +568,17 @@ if __name__ == "__main__":
                     outfile.write(f"=============================================\n\n")
 
                     # (Verificação de existência das cidades - sem alterações)
-                    if inicio not in dados_cidades or fim not in dados_cidades:
+                    if inicio not in cidades or fim not in cidades:
                          print(f"\nErro: Cenário {i} pulado. Cidade inicial '{inicio}' ou Cidade final '{fim}' não encontrada.")
                          outfile.write(f"Erro: Cidade inicial '{inicio}' ou Cidade final '{fim}' não encontrada nos dados JSON.\n\n")
-                         resultados_finais[f"Cenário {i}"] = {"status": "Erro de Entrada", "message": f"Cidade '{inicio if inicio not in dados_cidades else fim}' não encontrada no JSON."}
+                         resultados_finais[f"Cenário {i}"] = {"status": "Erro de Entrada", "message": f"Cidade '{inicio if inicio not in cidades else fim}' não encontrada no JSON."}
                          continue
 
                     # Chama a função de busca UCS
-                    caminho, custo, estatisticas = busca_custo_uniforme(grafo, dados_cidades, inicio, fim) 
+                    if EXECUCAO_PARALELA:
+                        caminho, custo, estatisticas = resultados_paralelos[i]
+                    else:
+                        caminho, custo, estatisticas = funcao_busca(*argumentos_grafo, inicio, fim, verbosidade=VERBOSIDADE) 
                     resultados_finais[f"Cenário {i}"] = estatisticas 
 
                     # --- Escreve o Bloco de Resumo Final no Arquivo ---
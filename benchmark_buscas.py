@@ -0,0 +1,248 @@
+import argparse
+import csv
+import math
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+from Buscauniforme import (carregar_dados_cidades, construir_grafo, busca_custo_uniforme,
+                           busca_custo_uniforme_pais, busca_a_estrela, busca_custo_uniforme_csr)
+from Buscabidirecional import busca_bidirecional_final_verbose, busca_bidirecional_a_estrela, busca_bidirecional_csr
+from componentes import IndiceComponentes
+from construtor_numpy import construir_grafo_numpy
+from grafo_csr import GrafoCSR
+
+# --- Benchmark das Buscas ---
+#
+# Para cada conjunto de cidades (cities.json e/ou cidades sintéticas), cada raio
+# e cada algoritmo, executa o MESMO conjunto de consultas aleatórias (semente
+# fixa) e mede: tempo de parede (perf_counter em volta da chamada), expansões,
+# inserções na fila, retiradas obsoletas e pico de memória (tracemalloc, em uma
+# passada separada para não distorcer os tempos). O resultado sai como tabela
+# no console e, opcionalmente, em CSV (com --anexar, linhas de várias versões
+# ficam no mesmo arquivo para comparação).
+
+# nome -> (função de busca, tipo de grafo que ela recebe)
+ALGORITMOS = {
+    "ucs": (busca_custo_uniforme, "dict"),
+    "ucs_pais": (busca_custo_uniforme_pais, "dict"),
+    "a_estrela": (busca_a_estrela, "dict"),
+    "bidirecional": (busca_bidirecional_final_verbose, "dict"),
+    "bidirecional_a_estrela": (busca_bidirecional_a_estrela, "dict"),
+    "ucs_csr": (busca_custo_uniforme_csr, "csr"),
+    "bidirecional_csr": (busca_bidirecional_csr, "csr"),
+}
+# "ucs" copia o caminho em cada entrada da fila: só entra quando pedido explicitamente
+ALGORITMOS_PADRAO = [nome for nome in ALGORITMOS if nome != "ucs"]
+
+COLUNAS = ["rotulo", "conjunto", "cidades", "raio", "arestas", "tempo_grafo_s", "algoritmo", "consultas",
+           "sem_caminho", "tempo_total_s", "tempo_medio_ms", "tempo_p50_ms", "tempo_p95_ms",
+           "expansoes_media", "insercoes_media", "descartes_media", "pico_memoria_kb"]
+
+# Caixa aproximada das cidades de cities.json (EUA continental) e o seu número de cidades:
+# as cidades sintéticas mantêm essa densidade, então um mesmo raio dá graus parecidos
+LATITUDES_REFERENCIA = (25.0, 49.0)
+LONGITUDES_REFERENCIA = (-125.0, -67.0)
+CIDADES_REFERENCIA = 1000
+
+
+def gerar_cidades_sinteticas(quantidade, semente=0, fracao_aglomerada=0.7):
+    """
+    Gera `quantidade` cidades no formato de `carregar_dados_cidades`.
+
+    A caixa de referência é ampliada por sqrt(quantidade / 1000) em cada eixo
+    (densidade constante). Uma fração das cidades fica em aglomerados
+    (gaussianas em torno de centros aleatórios), como regiões metropolitanas;
+    o resto é uniforme.
+    """
+    rng = random.Random(semente)
+    escala = math.sqrt(quantidade / CIDADES_REFERENCIA)
+    lat_min = LATITUDES_REFERENCIA[0]
+    lat_max = lat_min + (LATITUDES_REFERENCIA[1] - LATITUDES_REFERENCIA[0]) * escala
+    lon_min = LONGITUDES_REFERENCIA[0]
+    lon_max = lon_min + (LONGITUDES_REFERENCIA[1] - LONGITUDES_REFERENCIA[0]) * escala
+    centros = [(rng.uniform(lat_min, lat_max), rng.uniform(lon_min, lon_max))
+               for _ in range(max(1, quantidade // 50))]
+
+    cidades = {}
+    largura = len(str(quantidade))
+    for i in range(quantidade):
+        if rng.random() < fracao_aglomerada:
+            lat_c, lon_c = rng.choice(centros)
+            lat = min(max(rng.gauss(lat_c, 1.0), lat_min), lat_max)
+            lon = min(max(rng.gauss(lon_c, 1.5), lon_min), lon_max)
+        else:
+            lat = rng.uniform(lat_min, lat_max)
+            lon = rng.uniform(lon_min, lon_max)
+        cidades[f"Cidade {i:0{largura}d}"] = {
+            'coords': (lat, lon),
+            'population': int(rng.lognormvariate(10.5, 1.0))
+        }
+    return cidades
+
+
+def gerar_consultas(nomes, quantidade, semente=0):
+    """Pares (inicio, fim) distintos, sorteados com semente fixa."""
+    rng = random.Random(semente)
+    nomes = list(nomes)
+    consultas = []
+    while len(consultas) < quantidade:
+        inicio, fim = rng.choice(nomes), rng.choice(nomes)
+        if inicio != fim:
+            consultas.append((inicio, fim))
+    return consultas
+
+
+def _percentil(valores_ordenados, p):
+    indice = min(len(valores_ordenados) - 1, max(0, math.ceil(p / 100 * len(valores_ordenados)) - 1))
+    return valores_ordenados[indice]
+
+
+def _executar(funcao, tipo, grafo, grafo_csr, dados_cidades, inicio, fim, componentes):
+    if tipo == "csr":
+        return funcao(grafo_csr, inicio, fim, componentes=componentes)
+    return funcao(grafo, dados_cidades, inicio, fim, componentes=componentes)
+
+
+def medir_algoritmo(nome, grafo, grafo_csr, dados_cidades, consultas, componentes=None, medir_memoria=True):
+    """
+    Executa as consultas com um algoritmo e agrega as métricas.
+
+    Returns:
+        dict: Colunas de algoritmo, consultas, sem_caminho, tempos, médias e pico de memória.
+    """
+    funcao, tipo = ALGORITMOS[nome]
+    tempos = []
+    expansoes = insercoes = descartes = sem_caminho = 0
+    for inicio, fim in consultas:
+        inicio_tempo = time.perf_counter()
+        caminho, _, estatisticas = _executar(funcao, tipo, grafo, grafo_csr, dados_cidades, inicio, fim, componentes)
+        tempos.append(time.perf_counter() - inicio_tempo)
+        expansoes += estatisticas["total_expansoes"]
+        insercoes += estatisticas["insercoes_fila"]
+        descartes += estatisticas["descartes_fila"]
+        if not caminho:
+            sem_caminho += 1
+
+    pico = 0
+    if medir_memoria:
+        # Passada separada: o tracemalloc deixa as alocações bem mais lentas
+        tracemalloc.start()
+        try:
+            for inicio, fim in consultas:
+                tracemalloc.reset_peak()
+                base, _ = tracemalloc.get_traced_memory()
+                _executar(funcao, tipo, grafo, grafo_csr, dados_cidades, inicio, fim, componentes)
+                pico = max(pico, tracemalloc.get_traced_memory()[1] - base)
+        finally:
+            tracemalloc.stop()
+
+    n = len(consultas)
+    ordenados = sorted(tempos)
+    return {
+        "algoritmo": nome, "consultas": n, "sem_caminho": sem_caminho,
+        "tempo_total_s": round(sum(tempos), 6),
+        "tempo_medio_ms": round(statistics.fmean(tempos) * 1000, 4),
+        "tempo_p50_ms": round(_percentil(ordenados, 50) * 1000, 4),
+        "tempo_p95_ms": round(_percentil(ordenados, 95) * 1000, 4),
+        "expansoes_media": round(expansoes / n, 1),
+        "insercoes_media": round(insercoes / n, 1),
+        "descartes_media": round(descartes / n, 1),
+        "pico_memoria_kb": round(pico / 1024, 1) if medir_memoria else "",
+    }
+
+
+def executar_benchmark(conjuntos, raios, algoritmos, num_consultas=200, semente=0, backend="grade",
+                       usar_componentes=False, medir_memoria=True, rotulo=""):
+    """
+    Gera uma linha de resultados por (conjunto, raio, algoritmo).
+
+    Args:
+        conjuntos (list): Pares (nome_conjunto, dados_cidades).
+        raios (list): Raios de conexão.
+        algoritmos (list): Chaves de ALGORITMOS.
+        usar_componentes (bool): Passa IndiceComponentes às buscas (pares sem caminho retornam na hora).
+        rotulo (str): Identifica a versão/execução nas linhas do CSV.
+    """
+    for nome_conjunto, dados_cidades in conjuntos:
+        consultas = gerar_consultas(dados_cidades.keys(), num_consultas, semente)
+        for raio in raios:
+            inicio_tempo = time.perf_counter()
+            if backend == "numpy":
+                grafo = construir_grafo_numpy(dados_cidades, raio)
+            else:
+                grafo = construir_grafo(dados_cidades, raio)
+            tempo_grafo = time.perf_counter() - inicio_tempo
+            grafo_csr = None
+            if any(ALGORITMOS[nome][1] == "csr" for nome in algoritmos):
+                grafo_csr = GrafoCSR.a_partir_do_grafo(grafo, dados_cidades)
+            componentes = IndiceComponentes.a_partir_do_grafo(grafo) if usar_componentes else None
+            base = {"rotulo": rotulo, "conjunto": nome_conjunto, "cidades": len(dados_cidades), "raio": raio,
+                    "arestas": sum(len(adj) for adj in grafo.values()) // 2,
+                    "tempo_grafo_s": round(tempo_grafo, 4)}
+            for nome in algoritmos:
+                linha = dict(base)
+                linha.update(medir_algoritmo(nome, grafo, grafo_csr, dados_cidades, consultas,
+                                             componentes, medir_memoria))
+                yield linha
+
+
+def imprimir_tabela(linhas, arquivo=sys.stdout):
+    colunas = [c for c in COLUNAS if c != "rotulo"]
+    larguras = {c: max(len(c), *(len(str(l[c])) for l in linhas)) for c in colunas}
+    print("  ".join(c.rjust(larguras[c]) for c in colunas), file=arquivo)
+    for linha in linhas:
+        print("  ".join(str(linha[c]).rjust(larguras[c]) for c in colunas), file=arquivo)
+
+
+def escrever_csv(linhas, caminho_csv, anexar=False):
+    novo = not (anexar and os.path.exists(caminho_csv))
+    with open(caminho_csv, 'a' if anexar else 'w', encoding='utf-8', newline='') as f:
+        escritor = csv.DictWriter(f, fieldnames=COLUNAS)
+        if novo:
+            escritor.writeheader()
+        escritor.writerows(linhas)
+
+
+# --- Bloco Principal de Execução ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark das buscas por raio, algoritmo e tamanho do conjunto de cidades.")
+    parser.add_argument("--cidades", default="cities.json", help="Arquivo JSON de cidades ('' para não usar)")
+    parser.add_argument("--sinteticas", type=int, nargs="*", default=[],
+                        help="Tamanhos de conjuntos sintéticos (ex.: 10000 100000 1000000; use raios menores nos maiores)")
+    parser.add_argument("--raios", type=float, nargs="+", default=[2.5, 3.5])
+    parser.add_argument("--algoritmos", nargs="+", default=ALGORITMOS_PADRAO, choices=list(ALGORITMOS))
+    parser.add_argument("--consultas", type=int, default=200, help="Consultas aleatórias por conjunto")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--backend", choices=["grade", "numpy"], default="grade", help="Construção do grafo")
+    parser.add_argument("--componentes", action="store_true", help="Descarta pares de componentes diferentes antes da busca")
+    parser.add_argument("--sem-memoria", action="store_true", help="Não mede o pico de memória (mais rápido)")
+    parser.add_argument("--csv", help="Arquivo CSV de saída")
+    parser.add_argument("--anexar", action="store_true", help="Acrescenta ao CSV existente em vez de sobrescrever")
+    parser.add_argument("--rotulo", default="", help="Identificação da versão nas linhas do CSV")
+    args = parser.parse_args()
+
+    conjuntos = []
+    if args.cidades:
+        dados_cidades = carregar_dados_cidades(args.cidades)
+        if not dados_cidades:
+            print("Não foi possível carregar os dados das cidades. Abortando.", file=sys.stderr)
+            sys.exit(1)
+        conjuntos.append((os.path.basename(args.cidades), dados_cidades))
+    for quantidade in args.sinteticas:
+        conjuntos.append((f"sintetico_{quantidade}", gerar_cidades_sinteticas(quantidade, args.semente)))
+
+    linhas = []
+    for linha in executar_benchmark(conjuntos, args.raios, args.algoritmos, args.consultas, args.semente,
+                                    args.backend, args.componentes, not args.sem_memoria, args.rotulo):
+        print(f"{linha['conjunto']} r={linha['raio']} {linha['algoritmo']}: {linha['tempo_medio_ms']} ms/consulta", file=sys.stderr)
+        linhas.append(linha)
+
+    if linhas:
+        imprimir_tabela(linhas)
+        if args.csv:
+            escrever_csv(linhas, args.csv, args.anexar)
+            print(f"\nResultados escritos em '{args.csv}'")
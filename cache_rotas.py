@@ -0,0 +1,199 @@
+import sys
+from collections import OrderedDict
+
+from grafo_csr import GrafoCSR
+
+# --- Cache LRU de Resultados de Rotas ---
+
+def _pesos_segmentos(grafo, caminho):
+    # Distância de cada segmento do caminho (None se a aresta não for encontrada)
+    if isinstance(grafo, GrafoCSR):
+        ids = [grafo.ids[nome] for nome in caminho]
+        return [grafo.peso(a, b) for a, b in zip(ids, ids[1:])]
+    pesos = []
+    for atual, proximo in zip(caminho, caminho[1:]):
+        dist_tup = next((item for item in grafo.get(atual, []) if item[0] == proximo), None)
+        pesos.append(dist_tup[1] if dist_tup else None)
+    return pesos
+
+
+def _formatar_caminho(caminho, pesos):
+    partes_caminho_str = [caminho[0]]
+    for proxima_cidade, distancia in zip(caminho[1:], pesos):
+        if distancia is not None:
+            partes_caminho_str.append(f"-> {proxima_cidade} (Dist: {distancia:.2f})")
+        else:
+            partes_caminho_str.append(f"-> {proxima_cidade} (Dist: ??)")
+    return " ".join(partes_caminho_str)
+
+
+# Argumentos das buscas que não mudam o resultado (console e listas de trabalho): não entram na chave
+_ARGUMENTOS_NEUTROS = frozenset({"verbosidade", "ganchos", "espaco"})
+
+
+def _nome_funcao(funcao):
+    # functools.partial não tem __name__: usa o nome da função embrulhada
+    while getattr(funcao, "__name__", None) is None and hasattr(funcao, "func"):
+        funcao = funcao.func
+    return getattr(funcao, "__name__", None) or type(funcao).__qualname__
+
+
+def _discriminar(valor):
+    # Valor hashable entra como está; funções (ex.: heuristica) entram pelo nome
+    # qualificado, que sobrevive a fábricas chamadas de novo a cada consulta
+    if callable(valor):
+        return getattr(valor, "__qualname__", None) or _nome_funcao(valor)
+    try:
+        hash(valor)
+        return valor
+    except TypeError:
+        return id(valor)
+
+
+def _argumentos_chave(funcao_busca, kwargs):
+    # Argumentos nomeados que mudam o resultado, incluindo os fixados por partial
+    argumentos = dict(getattr(funcao_busca, "keywords", None) or {})
+    argumentos.update(kwargs)
+    return tuple(sorted((nome, _discriminar(valor)) for nome, valor in argumentos.items()
+                        if nome not in _ARGUMENTOS_NEUTROS))
+
+
+def _tamanho_estimado(entrada):
+    caminho, custo, estatisticas, pesos = entrada
+    tamanho = sys.getsizeof(estatisticas) + sys.getsizeof(estatisticas.get("caminho_detalhado", ""))
+    if caminho:
+        tamanho += sys.getsizeof(caminho) + sum(sys.getsizeof(nome) for nome in caminho)
+        tamanho += sys.getsizeof(pesos) + 24 * len(pesos)
+    return tamanho
+
+
+class CacheRotas:
+    """
+    Cache LRU na frente das funções de busca, com chave
+    (origem, destino, raio, algoritmo, argumentos). `argumentos` são os
+    argumentos nomeados da busca (e os fixados por functools.partial), exceto
+    verbosidade e ganchos; funções como `heuristica` entram pelo nome
+    qualificado, então heurísticas diferentes da mesma fábrica (ex.: tabelas
+    ALT com outros landmarks) devem ser distinguidas por `algoritmo`.
+
+    O grafo é não direcionado, então A -> B e B -> A usam a mesma entrada: um
+    acerto no sentido inverso devolve o caminho invertido (com as distâncias
+    dos segmentos e as expansões de avanço/retrocesso trocadas).
+
+    Args:
+        max_entradas (int): Número máximo de entradas (None = sem limite).
+        max_bytes (int, opcional): Limite aproximado de memória das entradas.
+    """
+
+    def __init__(self, max_entradas=1024, max_bytes=None):
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self.entradas = OrderedDict() # chave canônica -> (caminho, custo, estatisticas, pesos)
+        self.tamanhos = {}
+        self.bytes_usados = 0
+        self.acertos = 0
+        self.falhas = 0
+        self.remocoes = 0
+
+    @staticmethod
+    def _chave(no_inicial, no_final, raio, algoritmo, argumentos=()):
+        # Chave canônica: o par ordenado, mais o indicador de sentido invertido
+        if no_final < no_inicial:
+            return (no_final, no_inicial, raio, algoritmo, argumentos), True
+        return (no_inicial, no_final, raio, algoritmo, argumentos), False
+
+    def __len__(self):
+        return len(self.entradas)
+
+    def buscar(self, funcao_busca, grafo, dados_cidades, no_inicial, no_final, raio, algoritmo=None, **kwargs):
+        """
+        Retorna (caminho, custo, estatisticas) do cache ou chama
+        `funcao_busca(grafo, dados_cidades, no_inicial, no_final, **kwargs)`.
+        Para as buscas sobre GrafoCSR, passe `dados_cidades=None`: a chamada
+        vira `funcao_busca(grafo, no_inicial, no_final, **kwargs)`.
+        As estatísticas ganham a chave "cache_hit" (True em acertos).
+        """
+        if algoritmo is None:
+            algoritmo = _nome_funcao(funcao_busca)
+        chave, invertida = self._chave(no_inicial, no_final, raio, algoritmo, _argumentos_chave(funcao_busca, kwargs))
+        entrada = self.entradas.get(chave)
+        if entrada is not None:
+            self.entradas.move_to_end(chave)
+            self.acertos += 1
+            caminho, custo, estatisticas, pesos = entrada
+            estatisticas = dict(estatisticas)
+            if invertida != estatisticas.pop("_invertida"):
+                caminho, estatisticas = self._inverter(caminho, estatisticas, pesos)
+            if caminho:
+                caminho = estatisticas["caminho"] = list(caminho) # Cópia: o chamador pode alterar a lista
+            estatisticas["cache_hit"] = True
+            return caminho, custo, estatisticas
+
+        self.falhas += 1
+        if dados_cidades is None:
+            caminho, custo, estatisticas = funcao_busca(grafo, no_inicial, no_final, **kwargs)
+        else:
+            caminho, custo, estatisticas = funcao_busca(grafo, dados_cidades, no_inicial, no_final, **kwargs)
+        estatisticas["cache_hit"] = False
+        armazenadas = dict(estatisticas)
+        armazenadas["_invertida"] = invertida # Sentido em que o resultado foi calculado
+        pesos = []
+        if caminho:
+            armazenadas["caminho"] = list(caminho)
+            pesos = _pesos_segmentos(grafo, caminho)
+        self._inserir(chave, (armazenadas["caminho"], custo, armazenadas, pesos))
+        return caminho, custo, estatisticas
+
+    @staticmethod
+    def _inverter(caminho, estatisticas, pesos):
+        if caminho:
+            caminho = caminho[::-1]
+            estatisticas["caminho"] = caminho
+            estatisticas["caminho_detalhado"] = _formatar_caminho(caminho, pesos[::-1])
+        if "expansoes_avanco" in estatisticas:
+            estatisticas["expansoes_avanco"], estatisticas["expansoes_retrocesso"] = (
+                estatisticas["expansoes_retrocesso"], estatisticas["expansoes_avanco"])
+        return caminho, estatisticas
+
+    def _inserir(self, chave, entrada):
+        if chave in self.entradas:
+            self.bytes_usados -= self.tamanhos.pop(chave)
+            del self.entradas[chave]
+        tamanho = _tamanho_estimado(entrada)
+        self.entradas[chave] = entrada
+        self.tamanhos[chave] = tamanho
+        self.bytes_usados += tamanho
+        while self.entradas and (
+                (self.max_entradas is not None and len(self.entradas) > self.max_entradas)
+                or (self.max_bytes is not None and self.bytes_usados > self.max_bytes)):
+            chave_antiga, _ = self.entradas.popitem(last=False)
+            self.bytes_usados -= self.tamanhos.pop(chave_antiga)
+            self.remocoes += 1
+
+    def descartar_se(self, condicao):
+        """
+        Descarta as entradas para as quais `condicao(origem, destino, caminho)`
+        é verdadeira (o caminho pode ser None; origem e destino na ordem da
+        chave canônica). Ex.: ao fechar uma aresta, só as rotas que passam por
+        ela deixam de valer. Retorna quantas foram descartadas.
+        """
+        descartadas = [chave for chave, (caminho, _, _, _) in self.entradas.items()
+                       if condicao(chave[0], chave[1], caminho)]
+        for chave in descartadas:
+            del self.entradas[chave]
+            self.bytes_usados -= self.tamanhos.pop(chave)
+        return len(descartadas)
+
+    def limpar(self):
+        """Descarta todas as entradas (ex.: quando o grafo muda). Os contadores são mantidos."""
+        self.entradas.clear()
+        self.tamanhos.clear()
+        self.bytes_usados = 0
+
+    def estatisticas_cache(self):
+        total = self.acertos + self.falhas
+        return {
+            "entradas": len(self.entradas), "bytes": self.bytes_usados,
+            "acertos": self.acertos, "falhas": self.falhas, "remocoes": self.remocoes,
+            "taxa_acerto": self.acertos / total if total else 0.0,
+        }
@@ -0,0 +1,228 @@
+import csv
+import json
+import os
+import re
+import sys
+import time
+import tracemalloc
+from array import array
+
+from grafo_csr import GrafoCSR, converter_populacao
+from indice_espacial import IndiceEspacial
+
+# --- Carregador de Cidades em Fluxo (Colunas Tipadas) ---
+#
+# `carregar_dados_cidades` lê o arquivo inteiro com json.load, cria um
+# dicionário por cidade e mantém a população como string. Aqui os registros
+# são lidos um a um (array JSON em blocos, NDJSON ou CSV) e só os campos usados
+# pelas buscas vão para colunas: nomes, estados, latitudes e longitudes
+# (array 'd') e população já convertida para int (array 'q'). A memória de
+# pico fica proporcional às colunas, não ao texto do arquivo.
+#
+# Nomes repetidos (mesmo nome em estados diferentes: 137 registros de
+# cities.json em 62 nomes) não se sobrescrevem. O último registro de cada nome
+# continua com o nome simples, como no dicionário antigo, e os demais recebem o
+# estado ("Springfield, Missouri"); antes, 75 cidades eram descartadas.
+
+TAMANHO_BLOCO_LEITURA = 1 << 16 # Caracteres lidos por vez do array JSON
+_SEPARADORES_JSON = re.compile(r'[\s,]*')
+
+
+def detectar_formato(caminho_arquivo):
+    """'csv', 'ndjson' ou 'json' (array), pela extensão ou pelo primeiro caractere."""
+    extensao = os.path.splitext(caminho_arquivo)[1].lower()
+    if extensao == ".csv":
+        return "csv"
+    if extensao in (".ndjson", ".jsonl"):
+        return "ndjson"
+    with open(caminho_arquivo, 'r', encoding='utf-8') as f:
+        while True:
+            caractere = f.read(1)
+            if not caractere or not caractere.isspace():
+                break
+    return "json" if caractere == "[" else "ndjson"
+
+
+def _ler_array_json(arquivo, tamanho_bloco=TAMANHO_BLOCO_LEITURA):
+    # Decodifica um objeto por vez com raw_decode; o buffer só guarda o bloco atual
+    decodificador = json.JSONDecoder()
+    buffer = arquivo.read(tamanho_bloco).lstrip()
+    if not buffer.startswith("["):
+        raise ValueError("O arquivo não começa com um array JSON")
+    pos = 1
+    while True:
+        pos = _SEPARADORES_JSON.match(buffer, pos).end()
+        if pos >= len(buffer):
+            bloco = arquivo.read(tamanho_bloco)
+            if not bloco:
+                raise ValueError("Array JSON incompleto")
+            buffer, pos = bloco, 0
+            continue
+        if buffer[pos] == "]":
+            return
+        try:
+            registro, fim = decodificador.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            # Registro cortado no fim do bloco: junta com o próximo e tenta de novo
+            bloco = arquivo.read(tamanho_bloco)
+            if not bloco:
+                raise
+            buffer, pos = buffer[pos:] + bloco, 0
+            continue
+        yield registro
+        pos = fim
+
+
+def ler_registros(caminho_arquivo, formato=None):
+    """
+    Itera os registros do arquivo (dicts com 'city', 'state', 'latitude',
+    'longitude' e 'population'), sem carregar o arquivo inteiro.
+
+    Args:
+        formato (str, opcional): 'json', 'ndjson' ou 'csv' (padrão: detectado).
+    """
+    formato = formato or detectar_formato(caminho_arquivo)
+    with open(caminho_arquivo, 'r', encoding='utf-8', newline='' if formato == "csv" else None) as f:
+        if formato == "csv":
+            yield from csv.DictReader(f)
+        elif formato == "ndjson":
+            for linha in f:
+                linha = linha.strip()
+                if linha:
+                    yield json.loads(linha)
+        else:
+            yield from _ler_array_json(f)
+
+
+class TabelaCidades:
+    """
+    Cidades em colunas: o id de uma cidade é a sua posição nas colunas.
+
+    Atributos:
+        nomes (list): Nome único de cada cidade (com o estado nos homônimos).
+        estados (list): Estado de cada cidade (strings compartilhadas).
+        latitudes, longitudes (array 'd'), populacao (array 'q').
+        ids (dict): Nome único -> id.
+        homonimos (dict): Nome repetido -> todos os nomes únicos das suas cidades
+            (o próprio nome simples por último).
+    """
+
+    def __init__(self, nomes, estados, latitudes, longitudes, populacao):
+        self.estados = estados
+        self.latitudes = latitudes
+        self.longitudes = longitudes
+        self.populacao = populacao
+        self.nomes, self.homonimos = self._desambiguar(nomes, estados)
+        self.ids = {nome: i for i, nome in enumerate(self.nomes)}
+
+    @classmethod
+    def a_partir_dos_registros(cls, registros):
+        nomes = []
+        estados = []
+        latitudes = array('d'); longitudes = array('d'); populacao = array('q')
+        estados_unicos = {} # Uma única string por estado
+        for registro in registros:
+            nomes.append(registro['city'])
+            estado = registro.get('state') or ""
+            estados.append(estados_unicos.setdefault(estado, estado))
+            latitudes.append(float(registro['latitude']))
+            longitudes.append(float(registro['longitude']))
+            populacao.append(converter_populacao(registro.get('population')))
+        return cls(nomes, estados, latitudes, longitudes, populacao)
+
+    @classmethod
+    def carregar(cls, caminho_arquivo, formato=None):
+        """Lê um array JSON, NDJSON ou CSV em fluxo (ver `ler_registros`)."""
+        return cls.a_partir_dos_registros(ler_registros(caminho_arquivo, formato))
+
+    @staticmethod
+    def _desambiguar(nomes, estados):
+        # O último registro de cada nome repetido mantém o nome simples (é a cidade que
+        # o dicionário de `carregar_dados_cidades` guardava); os anteriores recebem o estado
+        ultimo = {}
+        for i, nome in enumerate(nomes):
+            ultimo[nome] = i
+        usados = set(nomes)
+        proximo_sufixo = {}
+        homonimos = {}
+        unicos = list(nomes)
+        for i, nome in enumerate(nomes):
+            if ultimo[nome] == i:
+                continue
+            qualificado = f"{nome}, {estados[i]}" if estados[i] else nome
+            candidato = qualificado
+            if candidato in usados: # Mesmo nome no mesmo estado (ou sem estado): numera
+                sufixo = proximo_sufixo.get(qualificado, 2)
+                while f"{qualificado} ({sufixo})" in usados:
+                    sufixo += 1
+                candidato = f"{qualificado} ({sufixo})"
+                proximo_sufixo[qualificado] = sufixo + 1
+            usados.add(candidato)
+            unicos[i] = candidato
+            homonimos.setdefault(nome, []).append(candidato)
+        for nome, outros in homonimos.items():
+            outros.append(nome)
+        return unicos, homonimos
+
+    def __len__(self):
+        return len(self.nomes)
+
+    def __contains__(self, nome):
+        return nome in self.ids
+
+    def coords(self, i):
+        return (self.latitudes[i], self.longitudes[i])
+
+    def para_dados_cidades(self):
+        """
+        Dicionário no formato de `carregar_dados_cidades`, para as buscas por
+        nome, com a população já como int (desempate numérico na fila).
+        """
+        return {nome: {'coords': (self.latitudes[i], self.longitudes[i]), 'population': self.populacao[i]}
+                for i, nome in enumerate(self.nomes)}
+
+    def construir_grafo_csr(self, r):
+        """
+        GrafoCSR de raio r direto das colunas (índice espacial por id), sem
+        montar o dicionário de cidades nem a lista de adjacências por nome.
+        """
+        indice = IndiceEspacial(r)
+        latitudes = self.latitudes; longitudes = self.longitudes
+        for i in range(len(self.nomes)):
+            indice.inserir(i, (latitudes[i], longitudes[i]))
+        origens = array('i'); destinos = array('i'); pesos = array('d')
+        for i in range(len(self.nomes)):
+            # cities_within devolve os ids em ordem de inserção: arestas saem ordenadas por (i, j)
+            for j, distancia in indice.cities_within((latitudes[i], longitudes[i]), r):
+                if j > i:
+                    origens.append(i); destinos.append(j); pesos.append(distancia)
+        return GrafoCSR.a_partir_das_arestas(self.nomes, origens, destinos, pesos, None,
+                                             colunas=(self.populacao, latitudes, longitudes))
+
+
+# --- Bloco Principal de Execução (Comparação com a leitura por json.load) ---
+if __name__ == "__main__":
+    ARQUIVO_JSON = sys.argv[1] if len(sys.argv) > 1 else 'cities.json'
+
+    # Leitura antiga: arquivo inteiro em memória, um dicionário por cidade, nomes sobrescritos
+    tracemalloc.start()
+    inicio_tempo = time.perf_counter()
+    with open(ARQUIVO_JSON, 'r', encoding='utf-8') as f:
+        dados_antigos = {item['city']: {'coords': (item['latitude'], item['longitude']), 'population': item['population']}
+                         for item in json.load(f)}
+    duracao = time.perf_counter() - inicio_tempo
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"json.load + dicionário: {len(dados_antigos)} cidades em {duracao:.4f} s, pico {pico / 1024:.1f} KB")
+    del dados_antigos
+
+    tracemalloc.start()
+    inicio_tempo = time.perf_counter()
+    tabela = TabelaCidades.carregar(ARQUIVO_JSON)
+    duracao = time.perf_counter() - inicio_tempo
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"TabelaCidades.carregar: {len(tabela)} cidades em {duracao:.4f} s, pico {pico / 1024:.1f} KB")
+    print(f"Nomes repetidos: {sum(len(v) for v in tabela.homonimos.values())} cidades em {len(tabela.homonimos)} nomes")
+    for nome in list(tabela.homonimos)[:5]:
+        print(f"  {nome}: {' | '.join(tabela.homonimos[nome])}")
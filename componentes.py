@@ -0,0 +1,145 @@
+# --- Componentes Conexas (União-Busca) ---
+
+class UniaoBusca:
+    """
+    Estrutura união-busca (disjoint set) sobre chaves arbitrárias, com união
+    por tamanho e compressão de caminho. Usada durante `construir_grafo`: cada
+    aresta criada une as duas cidades.
+    """
+
+    def __init__(self, chaves=()):
+        self.pai = {}
+        self.tamanho = {}
+        for chave in chaves:
+            self.adicionar(chave)
+
+    def adicionar(self, chave):
+        if chave not in self.pai:
+            self.pai[chave] = chave
+            self.tamanho[chave] = 1
+
+    def encontrar(self, chave):
+        pai = self.pai
+        raiz = chave
+        while pai[raiz] != raiz:
+            raiz = pai[raiz]
+        while pai[chave] != raiz: # Compressão de caminho
+            pai[chave], chave = raiz, pai[chave]
+        return raiz
+
+    def unir(self, a, b):
+        raiz_a = self.encontrar(a)
+        raiz_b = self.encontrar(b)
+        if raiz_a == raiz_b:
+            return raiz_a
+        if self.tamanho[raiz_a] < self.tamanho[raiz_b]:
+            raiz_a, raiz_b = raiz_b, raiz_a
+        self.pai[raiz_b] = raiz_a
+        self.tamanho[raiz_a] += self.tamanho.pop(raiz_b)
+        return raiz_a
+
+
+class IndiceComponentes:
+    """
+    Rótulo de componente por cidade: `conectados(a, b)` responde em O(1) se
+    existe algum caminho entre as duas cidades no grafo.
+
+    Os rótulos são numerados da maior componente (0) para a menor. Depois de
+    atualizações incrementais (`adicionar`, `remover`, `mover`, usadas por
+    grafo_dinamico.py) essa ordem não é mais garantida: componentes novas
+    recebem rótulos livres ou novos.
+    """
+
+    def __init__(self, rotulos, tamanhos):
+        self.rotulos = rotulos   # cidade -> id da componente
+        self.tamanhos = tamanhos # id da componente -> número de cidades (0 = rótulo livre)
+        self._livres = []        # Rótulos de componentes que ficaram vazias
+
+    @classmethod
+    def a_partir_da_uniao(cls, uniao):
+        raizes = {}
+        for chave in uniao.pai:
+            raiz = uniao.encontrar(chave)
+            raizes.setdefault(raiz, uniao.tamanho[raiz])
+        ordem = sorted(raizes, key=lambda raiz: -raizes[raiz])
+        ids = {raiz: i for i, raiz in enumerate(ordem)}
+        rotulos = {chave: ids[uniao.encontrar(chave)] for chave in uniao.pai}
+        return cls(rotulos, [raizes[raiz] for raiz in ordem])
+
+    @classmethod
+    def a_partir_do_grafo(cls, grafo):
+        """Para grafos já construídos (ex.: backend NumPy): une as pontas de cada aresta."""
+        uniao = UniaoBusca(grafo)
+        for cidade, adj in grafo.items():
+            for vizinho, _ in adj:
+                uniao.unir(cidade, vizinho)
+        return cls.a_partir_da_uniao(uniao)
+
+    @classmethod
+    def a_partir_do_csr(cls, grafo_csr):
+        """Para um GrafoCSR (ex.: carregado de um snapshot): rótulos pelo nome da cidade."""
+        nomes = grafo_csr.nomes
+        uniao = UniaoBusca(nomes)
+        for i, nome in enumerate(nomes):
+            for j, _ in grafo_csr.vizinhos(i):
+                if j > i:
+                    uniao.unir(nome, nomes[j])
+        return cls.a_partir_da_uniao(uniao)
+
+    def conectados(self, a, b):
+        rotulo_a = self.rotulos.get(a)
+        return rotulo_a is not None and rotulo_a == self.rotulos.get(b)
+
+    def tamanho_componente(self, cidade):
+        return self.tamanhos[self.rotulos[cidade]]
+
+    @property
+    def num_componentes(self):
+        return len(self.tamanhos) - len(self._livres)
+
+    # --- Atualizações incrementais ---
+
+    def _novo_rotulo(self):
+        if self._livres:
+            return self._livres.pop()
+        self.tamanhos.append(0)
+        return len(self.tamanhos) - 1
+
+    def _diminuir(self, rotulo, quantidade):
+        self.tamanhos[rotulo] -= quantidade
+        if self.tamanhos[rotulo] == 0:
+            self._livres.append(rotulo)
+
+    def adicionar(self, cidade):
+        """Cidade nova, ainda isolada (componente própria). Retorna o rótulo."""
+        rotulo = self._novo_rotulo()
+        self.rotulos[cidade] = rotulo
+        self.tamanhos[rotulo] = 1
+        return rotulo
+
+    def remover(self, cidade):
+        """Retira a cidade (suas arestas já devem ter sido tratadas)."""
+        self._diminuir(self.rotulos.pop(cidade), 1)
+
+    def mover(self, cidades, rotulo=None):
+        """
+        Passa `cidades` para o componente `rotulo` (um rótulo novo se None):
+        junção de componentes ou separação de um pedaço. Custa O(len(cidades)).
+        Retorna o rótulo de destino.
+        """
+        if rotulo is None:
+            rotulo = self._novo_rotulo()
+        rotulos = self.rotulos
+        for cidade in cidades:
+            anterior = rotulos[cidade]
+            if anterior != rotulo:
+                rotulos[cidade] = rotulo
+                self.tamanhos[rotulo] += 1
+                self._diminuir(anterior, 1)
+        return rotulo
+
+    def resumo(self, maiores=5):
+        """Texto curto: número de componentes, tamanhos das maiores e cidades isoladas."""
+        isoladas = sum(1 for tamanho in self.tamanhos if tamanho == 1)
+        tamanhos = ", ".join(str(t) for t in sorted((t for t in self.tamanhos if t), reverse=True)[:maiores])
+        return f"Componentes conexas: {self.num_componentes} (maiores: {tamanhos}; isoladas: {isoladas})"
@@ -0,0 +1,103 @@
+import math
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional: sem ele, use o construtor da grade espacial
+    np = None
+
+# --- Construção Vetorizada do Grafo (NumPy) ---
+
+TAMANHO_BLOCO_PADRAO = 1024 # Blocos de 1024 x 1024 pares (~8 MB por matriz float64)
+
+
+def _exigir_numpy():
+    if np is None:
+        raise ImportError("NumPy não está instalado. Instale-o ou use o backend 'grade' (construir_grafo).")
+
+
+def carregar_arrays_coordenadas(dados_cidades):
+    """
+    Copia as coordenadas das cidades para arrays contíguos.
+
+    Returns:
+        tuple: (nomes, latitudes, longitudes), com nomes na ordem de `dados_cidades`.
+    """
+    _exigir_numpy()
+    nomes = list(dados_cidades.keys())
+    coords = np.array([dados_cidades[nome]['coords'] for nome in nomes], dtype=np.float64).reshape(-1, 2)
+    return nomes, np.ascontiguousarray(coords[:, 0]), np.ascontiguousarray(coords[:, 1])
+
+
+def construir_arestas_numpy(dados_cidades, r, tamanho_bloco=TAMANHO_BLOCO_PADRAO):
+    """
+    Calcula as arestas do grafo de raio r em blocos vetorizados.
+
+    A matriz de distâncias é percorrida em blocos de `tamanho_bloco` x
+    `tamanho_bloco` (apenas o triângulo superior), então a memória por bloco
+    é limitada independentemente do número de cidades. Os candidatos do
+    filtro vetorizado são confirmados com `math.dist`, para que os pesos sejam
+    exatamente os do construtor original.
+
+    Args:
+        dados_cidades (dict): Dados das cidades (nome -> {'coords', 'population'}).
+        r (float): Raio máximo de conexão.
+        tamanho_bloco (int): Número de linhas/colunas por bloco.
+
+    Returns:
+        tuple: (nomes, origens, destinos, pesos). Cada aresta aparece uma vez,
+        com origem < destino, ordenada por (origem, destino).
+    """
+    _exigir_numpy()
+    nomes, lat, lon = carregar_arrays_coordenadas(dados_cidades)
+    n = len(nomes)
+    # Margem relativa no filtro vetorizado; a decisão final é feita por math.dist
+    limite_quadrado = (r * (1 + 1e-9)) ** 2 if r > 0 else 0.0
+
+    partes_origens, partes_destinos = [], []
+    for i0 in range(0, n, tamanho_bloco):
+        i1 = min(i0 + tamanho_bloco, n)
+        lat_i = lat[i0:i1, None]
+        lon_i = lon[i0:i1, None]
+        for j0 in range(i0, n, tamanho_bloco):
+            j1 = min(j0 + tamanho_bloco, n)
+            dif_lat = lat_i - lat[None, j0:j1]
+            dif_lon = lon_i - lon[None, j0:j1]
+            mascara = (dif_lat * dif_lat + dif_lon * dif_lon) <= limite_quadrado
+            if i0 == j0:
+                mascara = np.triu(mascara, k=1) # Bloco diagonal: só pares i < j
+            ii, jj = np.nonzero(mascara)
+            if ii.size:
+                partes_origens.append(ii + i0)
+                partes_destinos.append(jj + j0)
+
+    if not partes_origens:
+        vazio_int = np.empty(0, dtype=np.int64)
+        return nomes, vazio_int, vazio_int.copy(), np.empty(0, dtype=np.float64)
+
+    origens = np.concatenate(partes_origens)
+    destinos = np.concatenate(partes_destinos)
+
+    # Confirmação exata dos candidatos (são poucos comparados aos n² pares)
+    lista_lat = lat.tolist(); lista_lon = lon.tolist()
+    pesos = np.fromiter(
+        (math.dist((lista_lat[i], lista_lon[i]), (lista_lat[j], lista_lon[j]))
+         for i, j in zip(origens.tolist(), destinos.tolist())),
+        dtype=np.float64, count=origens.size)
+    validas = pesos <= r
+    origens, destinos, pesos = origens[validas], destinos[validas], pesos[validas]
+
+    ordem = np.lexsort((destinos, origens))
+    return nomes, origens[ordem], destinos[ordem], pesos[ordem]
+
+
+def construir_grafo_numpy(dados_cidades, r, tamanho_bloco=TAMANHO_BLOCO_PADRAO):
+    """
+    Backend NumPy de `construir_grafo`: mesma lista de adjacências (mesmas
+    arestas, pesos e ordem), construída a partir de `construir_arestas_numpy`.
+    """
+    nomes, origens, destinos, pesos = construir_arestas_numpy(dados_cidades, r, tamanho_bloco)
+    grafo = {cidade: [] for cidade in nomes}
+    for i, j, distancia in zip(origens.tolist(), destinos.tolist(), pesos.tolist()):
+        grafo[nomes[i]].append((nomes[j], distancia))
+        grafo[nomes[j]].append((nomes[i], distancia))
+    return grafo
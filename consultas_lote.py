@@ -0,0 +1,204 @@
+import argparse
+import json
+import sys
+import time
+from itertools import islice
+
+from Buscauniforme import carregar_dados_cidades, construir_grafo
+from execucao_paralela import criar_executor, obter_compartilhado
+from grafo_csr import GrafoCSR
+from instalacoes_proximas import dijkstra_multiplas_origens
+from matriz_distancias import MatrizDistancias
+from snapshot_grafo import carregar_ou_compilar
+
+# --- Consultas em Lote (JSONL) ---
+#
+# Cada linha de entrada é um objeto JSON {"id": ..., "origem": "...", "destino": "..."}.
+# Cada linha de saída é o resultado da consulta correspondente, na mesma ordem.
+# As consultas são lidas em janelas de tamanho fixo; dentro de cada janela são
+# agrupadas por origem e uma única árvore de caminhos mínimos (Dijkstra) atende
+# todos os destinos daquela origem.
+
+JANELA_PADRAO = 10000
+
+
+def arvore_caminhos_minimos(grafo_csr, id_origem, ids_alvos, espaco=None):
+    """
+    Dijkstra a partir de `id_origem` sobre o GrafoCSR, parando assim que todos
+    os `ids_alvos` forem fixados (ou a componente da origem se esgotar). É a
+    busca de instalacoes_proximas.py com uma única origem.
+
+    Args:
+        espaco (EspacoBusca, opcional): Listas reutilizadas entre árvores (padrão:
+            o espaço da thread atual, ver espaco_busca.py).
+
+    Returns:
+        tuple: (custos, pais, expansoes) — vistas por id (VistaGeracao), válidas
+        até a próxima busca no mesmo espaço. O pai da origem é -1. `expansoes[v]`
+        é o número de nós expandidos até v ser fixado, o mesmo `total_expansoes`
+        que a UCS reportaria para a consulta origem -> v.
+    """
+    custos, pais, _, expansoes = dijkstra_multiplas_origens(grafo_csr, [id_origem], ids_alvos, espaco)
+    return custos, pais, expansoes
+
+
+def _resultado_da_arvore(grafo_csr, consulta, id_destino, custos, pais, expansoes):
+    resultado = {"id": consulta.get("id"), "origem": consulta["origem"], "destino": consulta["destino"]}
+    if id_destino not in expansoes:
+        resultado.update({"status": "Nenhum caminho encontrado (Espaço de busca esgotado)", "custo_final": None,
+                          "caminho": None, "caminho_detalhado": "", "total_expansoes": len(expansoes)})
+        return resultado
+    caminho_ids = []
+    atual = id_destino
+    while atual != -1:
+        caminho_ids.append(atual)
+        atual = pais[atual]
+    caminho_ids.reverse()
+    resultado.update({"status": "Caminho ótimo encontrado", "custo_final": custos[id_destino],
+                      "caminho": [grafo_csr.nomes[i] for i in caminho_ids],
+                      "caminho_detalhado": grafo_csr.formatar_caminho(caminho_ids),
+                      "total_expansoes": expansoes[id_destino]})
+    return resultado
+
+
+def processar_janela(grafo_csr, consultas, executor=None, matriz=None):
+    """
+    Resolve uma janela de consultas, agrupando por origem. Retorna os
+    resultados na mesma ordem das consultas. Com `executor` (ver
+    execucao_paralela.criar_executor) cada origem vira uma tarefa do pool.
+    Com `matriz` (MatrizDistancias) cada consulta é só uma leitura da matriz.
+    """
+    resultados = [None] * len(consultas)
+    por_origem = {}
+    for posicao, consulta in enumerate(consultas):
+        if "erro" in consulta:
+            resultados[posicao] = {"id": consulta.get("id"), "linha": consulta["linha"],
+                                   "status": "Erro de Entrada", "mensagem": consulta["erro"]}
+            continue
+        origem, destino = consulta["origem"], consulta["destino"]
+        if origem not in grafo_csr or destino not in grafo_csr:
+            resultados[posicao] = {"id": consulta.get("id"), "origem": origem, "destino": destino,
+                                   "status": "Nó Inicial ou Final não existe", "custo_final": None,
+                                   "caminho": None, "caminho_detalhado": "", "total_expansoes": 0}
+        elif origem == destino:
+            resultados[posicao] = {"id": consulta.get("id"), "origem": origem, "destino": destino,
+                                   "status": "Inicial igual ao Final", "custo_final": 0,
+                                   "caminho": [origem], "caminho_detalhado": origem, "total_expansoes": 0}
+        elif matriz is not None:
+            caminho, custo, estatisticas = matriz.consultar(origem, destino)
+            resultados[posicao] = {"id": consulta.get("id"), "origem": origem, "destino": destino,
+                                   "status": estatisticas["status"], "custo_final": custo if caminho else None,
+                                   "caminho": caminho, "caminho_detalhado": estatisticas["caminho_detalhado"],
+                                   "total_expansoes": 0}
+        else:
+            por_origem.setdefault(grafo_csr.ids[origem], []).append(posicao)
+
+    grupos = [(id_origem, [(p, consultas[p]) for p in posicoes]) for id_origem, posicoes in por_origem.items()]
+    if executor is None:
+        resolvidos = (_resolver_grupo(grupo, grafo_csr) for grupo in grupos)
+    else:
+        resolvidos = executor.map(_resolver_grupo, grupos)
+    for resultados_grupo in resolvidos:
+        for posicao, resultado in resultados_grupo:
+            resultados[posicao] = resultado
+    return resultados
+
+
+def _resolver_grupo(grupo, grafo_csr=None):
+    # Uma árvore de caminhos mínimos para todas as consultas de uma origem.
+    # Nos workers o grafo vem do estado herdado do processo pai (execucao_paralela).
+    if grafo_csr is None:
+        grafo_csr = obter_compartilhado("grafo_csr")
+    id_origem, itens = grupo
+    ids_destinos = [grafo_csr.ids[consulta["destino"]] for _, consulta in itens]
+    custos, pais, expansoes = arvore_caminhos_minimos(grafo_csr, id_origem, ids_destinos)
+    return [(posicao, _resultado_da_arvore(grafo_csr, consulta, id_destino, custos, pais, expansoes))
+            for (posicao, consulta), id_destino in zip(itens, ids_destinos)]
+
+
+def ler_consultas(linhas):
+    """Converte linhas JSONL em consultas; linhas inválidas viram consultas com a chave 'erro'."""
+    for numero, linha in enumerate(linhas, 1):
+        linha = linha.strip()
+        if not linha:
+            continue
+        try:
+            consulta = json.loads(linha)
+            consulta["linha"] = numero
+            if "origem" not in consulta or "destino" not in consulta:
+                consulta["erro"] = "Consulta sem 'origem' ou 'destino'"
+            elif not isinstance(consulta["origem"], str) or not isinstance(consulta["destino"], str):
+                consulta["erro"] = "'origem' e 'destino' devem ser nomes de cidade (texto)"
+        except (json.JSONDecodeError, TypeError) as e:
+            consulta = {"linha": numero, "erro": f"JSON inválido: {e}"}
+        yield consulta
+
+
+def executar_lote(grafo_csr, linhas, saida, janela=JANELA_PADRAO, processos=1, matriz=None):
+    """
+    Lê consultas de `linhas` (iterável de strings JSONL) e escreve um resultado
+    JSONL por consulta em `saida`, mantendo só uma janela em memória. Com
+    `processos` > 1 as origens de cada janela são resolvidas em paralelo; com
+    `matriz` (MatrizDistancias) as consultas são leituras da matriz.
+
+    Returns:
+        tuple: (total_consultas, tempo_segundos)
+    """
+    inicio_tempo = time.perf_counter()
+    total = 0
+    consultas = ler_consultas(linhas)
+    executor = criar_executor(processos, grafo_csr=grafo_csr) if processos > 1 and matriz is None else None
+    try:
+        while True:
+            bloco = list(islice(consultas, janela))
+            if not bloco:
+                break
+            for resultado in processar_janela(grafo_csr, bloco, executor, matriz):
+                saida.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+            total += len(bloco)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return total, time.perf_counter() - inicio_tempo
+
+
+# --- Bloco Principal de Execução ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resolve consultas de rota em lote (JSONL).")
+    parser.add_argument("entrada", nargs="?", default="-", help="Arquivo JSONL de consultas ('-' para stdin)")
+    parser.add_argument("--saida", default="-", help="Arquivo JSONL de resultados ('-' para stdout)")
+    parser.add_argument("--cidades", default="cities.json", help="Arquivo JSON das cidades")
+    parser.add_argument("--raio", type=float, default=3.5, help="Raio de conexão r")
+    parser.add_argument("--janela", type=int, default=JANELA_PADRAO, help="Consultas mantidas em memória por vez")
+    parser.add_argument("--processos", type=int, default=1, help="Processos para resolver as origens em paralelo")
+    parser.add_argument("--snapshot", action="store_true", help="Usa (e compila se preciso) o snapshot binário do grafo")
+    parser.add_argument("--matriz", default=None, help="Arquivo da matriz de todos os pares (matriz_distancias.py); construído se preciso")
+    args = parser.parse_args()
+
+    if args.snapshot:
+        grafo_csr, _ = carregar_ou_compilar(args.cidades, args.raio)
+    else:
+        dados_cidades = carregar_dados_cidades(args.cidades)
+        if not dados_cidades:
+            print("Não foi possível carregar os dados das cidades. Abortando.", file=sys.stderr)
+            sys.exit(1)
+        grafo_csr = GrafoCSR.a_partir_do_grafo(construir_grafo(dados_cidades, args.raio), dados_cidades)
+    print(f"Grafo construído: {len(grafo_csr)} cidades, {grafo_csr.num_arestas} arestas (r = {args.raio}).", file=sys.stderr)
+
+    matriz = None
+    if args.matriz:
+        try:
+            matriz, _ = MatrizDistancias.abrir_ou_construir(grafo_csr, args.matriz, args.processos)
+        except ValueError as e:
+            print(f"Erro: {e}", file=sys.stderr)
+            sys.exit(1)
+
+    entrada = sys.stdin if args.entrada == "-" else open(args.entrada, 'r', encoding='utf-8')
+    saida = sys.stdout if args.saida == "-" else open(args.saida, 'w', encoding='utf-8')
+    try:
+        total, duracao = executar_lote(grafo_csr, entrada, saida, args.janela, args.processos, matriz)
+    finally:
+        if entrada is not sys.stdin: entrada.close()
+        if saida is not sys.stdout: saida.close()
+    vazao = total / duracao if duracao > 0 else float('inf')
+    print(f"{total} consultas em {duracao:.4f} segundos ({vazao:.1f} consultas/s)", file=sys.stderr)
@@ -0,0 +1,95 @@
+import threading
+
+# --- Espaço de Busca Reutilizável (Arrays com Marca de Geração) ---
+#
+# As buscas sobre o GrafoCSR guardam custo e pai por id em listas de n
+# posições. Alocar essas listas a cada consulta custa O(n) mesmo quando a busca
+# só toca uma vizinhança pequena. Aqui as listas são alocadas uma vez e cada
+# posição tem uma marca: o valor só vale se a marca for igual à geração da
+# busca atual. Começar uma nova busca é só incrementar a geração (O(1)).
+#
+# Um espaço não pode ser usado por duas buscas ao mesmo tempo: cada thread usa
+# o seu (`espaco_da_thread`), e ganchos não devem iniciar outra busca na mesma
+# thread com o espaço padrão.
+
+_locais = threading.local()
+
+
+class EspacoBusca:
+    """
+    Listas por id reutilizadas entre buscas.
+
+    Atributos:
+        n (int): Número de posições (serve para qualquer grafo com até n nós).
+        geracao (int): Geração da busca atual (ver `nova_busca`).
+        custos, pais, marcas (list): Custo e pai de cada id alcançado; valem só
+            onde `marcas[i] == geracao`. O pai da origem é -1.
+        fixados, ordem (list): Ids já expandidos (`fixados[i] == geracao`) e a
+            ordem em que foram expandidos (1, 2, ...).
+    """
+
+    def __init__(self, n):
+        self.n = n
+        self.geracao = 0
+        self.custos = [float('inf')] * n
+        self.pais = [-1] * n
+        self.marcas = [0] * n
+        self.fixados = [0] * n
+        self.ordem = [0] * n
+        self._retrocesso = None
+        self._origens = None
+
+    def nova_busca(self):
+        """Invalida todos os valores da busca anterior e devolve a nova geração."""
+        self.geracao += 1
+        return self.geracao
+
+    def retrocesso(self):
+        """(custos, pais, marcas) do sentido de retrocesso das buscas bidirecionais (alocados no primeiro uso)."""
+        if self._retrocesso is None:
+            self._retrocesso = ([float('inf')] * self.n, [-1] * self.n, [0] * self.n)
+        return self._retrocesso
+
+    def origens(self):
+        """Origem mais próxima de cada id nas buscas com várias origens (alocada no primeiro uso; vale onde `custos` vale)."""
+        if self._origens is None:
+            self._origens = [-1] * self.n
+        return self._origens
+
+
+class VistaGeracao:
+    """
+    Leitura por id (como um dicionário) de uma lista do espaço, restrita aos
+    ids marcados na geração em que a vista foi criada. Só é válida até a
+    próxima busca no mesmo espaço.
+    """
+
+    __slots__ = ("valores", "marcas", "geracao", "tamanho")
+
+    def __init__(self, valores, marcas, geracao, tamanho):
+        self.valores = valores
+        self.marcas = marcas
+        self.geracao = geracao
+        self.tamanho = tamanho
+
+    def __contains__(self, i):
+        return self.marcas[i] == self.geracao
+
+    def __getitem__(self, i):
+        if self.marcas[i] != self.geracao:
+            raise KeyError(i)
+        return self.valores[i]
+
+    def get(self, i, padrao=None):
+        return self.valores[i] if self.marcas[i] == self.geracao else padrao
+
+    def __len__(self):
+        return self.tamanho
+
+
+def espaco_da_thread(n):
+    """Espaço de busca da thread atual, criado (ou ampliado) para n nós."""
+    espaco = getattr(_locais, "espaco", None)
+    if espaco is None or espaco.n < n:
+        espaco = _locais.espaco = EspacoBusca(n)
+    return espaco
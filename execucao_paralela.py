@@ -0,0 +1,70 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# --- Execução Paralela de Consultas (ProcessPoolExecutor) ---
+#
+# O grafo não é enviado aos workers a cada tarefa: ele é colocado em
+# `_compartilhado` ANTES de o pool ser criado e, com o método 'fork', cada
+# processo filho herda a memória do pai (somente leitura, copy-on-write).
+# Assim só os argumentos de cada consulta e os resultados passam por pickle.
+# Em plataformas sem 'fork' o estado é enviado uma única vez por worker, pelo
+# initializer.
+
+_compartilhado = {}
+
+
+def _inicializar_worker(estado):
+    _compartilhado.clear()
+    _compartilhado.update(estado)
+
+
+def obter_compartilhado(nome):
+    """Lê, dentro de um worker, um objeto registrado em `criar_executor`."""
+    return _compartilhado[nome]
+
+
+def criar_executor(max_workers=None, **estado):
+    """
+    Cria um ProcessPoolExecutor cujos workers enxergam `estado` (ex.: grafo,
+    dados_cidades) sem recebê-lo por tarefa.
+    """
+    _compartilhado.clear()
+    _compartilhado.update(estado)
+    if "fork" in multiprocessing.get_all_start_methods():
+        return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("fork"))
+    return ProcessPoolExecutor(max_workers=max_workers, initializer=_inicializar_worker, initargs=(estado,))
+
+
+def _executar_consulta(consulta):
+    inicio, fim = consulta
+    funcao_busca = _compartilhado["funcao_busca"]
+    grafo = _compartilhado["grafo"]
+    dados_cidades = _compartilhado["dados_cidades"]
+    # As buscas são silenciosas por padrão: a saída de processos paralelos se misturaria
+    if dados_cidades is None:
+        return funcao_busca(grafo, inicio, fim)
+    return funcao_busca(grafo, dados_cidades, inicio, fim)
+
+
+def executar_em_paralelo(funcao_busca, grafo, dados_cidades, consultas, max_workers=None, chunksize=None):
+    """
+    Executa `funcao_busca` para cada (inicio, fim) de `consultas` em um pool de
+    processos e devolve os resultados (caminho, custo, estatisticas) na MESMA
+    ordem das consultas.
+
+    Args:
+        funcao_busca (callable): Ex.: busca_custo_uniforme ou busca_bidirecional_final_verbose.
+            Para as buscas sobre GrafoCSR, passe `dados_cidades=None`.
+        consultas (list): Pares (inicio, fim).
+        max_workers (int, opcional): Número de processos (padrão: número de CPUs).
+        chunksize (int, opcional): Consultas por tarefa enviada a cada worker.
+    """
+    consultas = list(consultas)
+    if not consultas:
+        return []
+    max_workers = max_workers or os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = max(1, len(consultas) // (max_workers * 4))
+    with criar_executor(max_workers, funcao_busca=funcao_busca, grafo=grafo, dados_cidades=dados_cidades) as executor:
+        return list(executor.map(_executar_consulta, consultas, chunksize=chunksize))
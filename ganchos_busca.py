@@ -0,0 +1,140 @@
+# --- Verbosidade e Ganchos de Rastreamento das Buscas ---
+#
+# As buscas aceitam `verbosidade` e `ganchos`. Por padrão são silenciosas: o
+# laço principal só testa se cada gancho resolvido é None, sem formatar nem
+# imprimir nada, e `tempo_execucao` mede a busca e não o terminal.
+#
+# O rastreamento que as buscas sempre imprimiram ("[n UCS] Expandir: ...",
+# "[n AVN]/[n RET]", "Novo MELHOR caminho!") virou o gancho embutido
+# GanchosRastreamento, ligado com verbosidade=RASTREAMENTO (assim como a
+# mensagem "Condição de término atingida" das buscas bidirecionais).
+
+SILENCIOSO = 0   # Nenhuma saída no console (padrão)
+RESUMO = 1       # Cabeçalho da busca, erros de entrada e resumo final
+RASTREAMENTO = 2 # Também cada expansão e cada novo melhor encontro
+
+EVENTOS = ("on_expand", "on_push", "on_meet", "on_finish", "on_stop")
+
+
+class GanchosBusca:
+    """
+    Base dos ganchos: basta sobrescrever os eventos de interesse. Eventos não
+    sobrescritos nem chegam a ser chamados pelas buscas (ver `resolver_ganchos`).
+
+    Eventos:
+        on_expand(no, custo, prioridade, sentido, expansoes): nó retirado da fila
+            e expandido. `prioridade` é a chave da fila (f na A*); `sentido` é None
+            nas buscas unidirecionais e "avanco"/"retrocesso" nas bidirecionais;
+            `expansoes` é o total de expansões até aqui.
+        on_push(no, custo, prioridade, sentido): nó inserido na fila.
+        on_meet(no, custo_total, custo_anterior): novo melhor encontro das duas
+            fronteiras (buscas bidirecionais).
+        on_finish(estatisticas, no_inicial, no_final): fim da busca, com as
+            estatísticas finais (não é chamado nos erros de entrada).
+        on_stop(min_avanco, min_retrocesso, melhor_custo): critério de parada das
+            buscas bidirecionais atingido (topo das duas filas >= melhor custo).
+    """
+
+    def on_expand(self, no, custo, prioridade, sentido, expansoes):
+        pass
+
+    def on_push(self, no, custo, prioridade, sentido):
+        pass
+
+    def on_meet(self, no, custo_total, custo_anterior):
+        pass
+
+    def on_finish(self, estatisticas, no_inicial, no_final):
+        pass
+
+    def on_stop(self, min_avanco, min_retrocesso, melhor_custo):
+        pass
+
+
+class GanchosResumo(GanchosBusca):
+    """Gancho embutido da verbosidade RESUMO: imprime o resumo final da busca."""
+
+    def __init__(self, imprimir_resumo):
+        self.imprimir_resumo = imprimir_resumo # imprimir_resumo_ucs ou imprimir_resumo_bidirecional
+
+    def on_finish(self, estatisticas, no_inicial, no_final):
+        self.imprimir_resumo(estatisticas, no_inicial, no_final)
+
+
+class GanchosRastreamento(GanchosResumo):
+    """
+    Gancho embutido da verbosidade RASTREAMENTO: a saída por expansão que as
+    buscas imprimiam diretamente no laço.
+
+    Args:
+        imprimir_resumo (callable): Função de resumo final do módulo da busca.
+        rotulo (str): Rótulo das buscas unidirecionais ("UCS" ou "A* ").
+        mostrar_prioridade (bool): Mostra também f (chave da fila) em cada expansão.
+    """
+
+    ROTULOS_SENTIDO = {"avanco": "AVN", "retrocesso": "RET"}
+
+    def __init__(self, imprimir_resumo, rotulo="UCS", mostrar_prioridade=False):
+        super().__init__(imprimir_resumo)
+        self.rotulo = rotulo
+        self.mostrar_prioridade = mostrar_prioridade
+
+    def on_expand(self, no, custo, prioridade, sentido, expansoes):
+        if sentido is not None:
+            print(f"  [{expansoes:<4} {self.ROTULOS_SENTIDO[sentido]}] Expandir: {no:<15} (Custo: {custo:.2f})")
+        elif self.mostrar_prioridade:
+            print(f"  [{expansoes:<4} {self.rotulo}] Expandir: {no:<15} (Custo Acum.: {custo:.2f}, f: {prioridade:.2f})")
+        else:
+            print(f"  [{expansoes:<4} {self.rotulo}] Expandir: {no:<15} (Custo Acum.: {custo:.2f})")
+
+    def on_meet(self, no, custo_total, custo_anterior):
+        print(f"    **** Novo MELHOR caminho! Encontro: {no}, Custo: {custo_total:.2f} (Ant: {custo_anterior:.2f}) ****")
+
+    def on_stop(self, min_avanco, min_retrocesso, melhor_custo):
+        print(f"\nCondição de término atingida: min_avanco ({min_avanco:.2f}) + min_retrocesso ({min_retrocesso:.2f}) >= melhor_custo ({melhor_custo:.2f})")
+
+
+def _sobrescrito(ganchos, evento):
+    # Métodos herdados sem alteração de GanchosBusca são no-ops: não precisam ser chamados
+    return getattr(ganchos, evento, None) is not None and getattr(type(ganchos), evento, None) is not getattr(GanchosBusca, evento)
+
+
+def _encadear(funcoes):
+    def chamar_todos(*args):
+        for funcao in funcoes:
+            funcao(*args)
+    return chamar_todos
+
+
+def resolver_ganchos(ganchos, verbosidade, imprimir_resumo, rotulo="UCS", mostrar_prioridade=False):
+    """
+    Resolve os callbacks de uma busca, uma única vez antes do laço principal.
+
+    Args:
+        ganchos: Objeto com algum dos eventos (ex.: subclasse de GanchosBusca) ou None.
+        verbosidade (int): SILENCIOSO, RESUMO ou RASTREAMENTO (gancho embutido).
+        imprimir_resumo (callable): Resumo final usado pelos ganchos embutidos.
+        rotulo, mostrar_prioridade: Ver GanchosRastreamento.
+
+    Returns:
+        tuple: (on_expand, on_push, on_meet, on_finish, on_stop), cada um None
+        quando ninguém observa o evento.
+    """
+    lista = []
+    if verbosidade >= RASTREAMENTO:
+        lista.append(GanchosRastreamento(imprimir_resumo, rotulo, mostrar_prioridade))
+    elif verbosidade >= RESUMO:
+        lista.append(GanchosResumo(imprimir_resumo))
+    if ganchos is not None:
+        lista.append(ganchos)
+
+    resolvidos = []
+    for evento in EVENTOS:
+        funcoes = [getattr(g, evento) for g in lista if _sobrescrito(g, evento)]
+        if not funcoes:
+            resolvidos.append(None)
+        elif len(funcoes) == 1:
+            resolvidos.append(funcoes[0])
+        else:
+            resolvidos.append(_encadear(funcoes))
+    return tuple(resolvidos)
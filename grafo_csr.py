@@ -0,0 +1,133 @@
+from array import array
+
+# --- Grafo Compacto (CSR) ---
+
+def converter_populacao(valor):
+    """Converte a população do JSON (string, ex.: "8405837") para int; valores inválidos viram 0."""
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        try:
+            return int(float(valor))
+        except (TypeError, ValueError):
+            return 0
+
+
+class GrafoCSR:
+    """
+    Grafo de cidades em formato CSR (Compressed Sparse Row) indexado por inteiros.
+
+    Os nomes das cidades são internados em ids 0..n-1. Os vizinhos do nó i
+    ficam em alvos[offsets[i]:offsets[i+1]], com os pesos correspondentes em
+    pesos[...]. A população já vem convertida para int, então as buscas não
+    fazem nenhuma consulta a dicionários dentro do laço principal.
+
+    Os campos numéricos podem ser `array.array`, arrays NumPy ou memoryviews
+    (ex.: um snapshot mapeado em memória); só indexação e fatiamento são usados.
+    """
+
+    def __init__(self, nomes, offsets, alvos, pesos, populacao, latitudes, longitudes):
+        self.nomes = nomes
+        self.ids = {nome: i for i, nome in enumerate(nomes)}
+        self.offsets = offsets
+        self.alvos = alvos
+        self.pesos = pesos
+        self.populacao = populacao
+        self.latitudes = latitudes
+        self.longitudes = longitudes
+
+    @classmethod
+    def a_partir_do_grafo(cls, grafo, dados_cidades):
+        """Converte a lista de adjacências de `construir_grafo` (mesma ordem de vizinhos)."""
+        nomes = list(grafo.keys())
+        ids = {nome: i for i, nome in enumerate(nomes)}
+        offsets = array('q', [0])
+        alvos = array('i')
+        pesos = array('d')
+        for nome in nomes:
+            for vizinho, distancia in grafo[nome]:
+                alvos.append(ids[vizinho])
+                pesos.append(distancia)
+            offsets.append(len(alvos))
+        return cls(nomes, offsets, alvos, pesos, *cls._colunas_cidades(nomes, dados_cidades))
+
+    @classmethod
+    def a_partir_das_arestas(cls, nomes, origens, destinos, pesos_arestas, dados_cidades, colunas=None):
+        """
+        Monta o CSR a partir de arestas não direcionadas (ex.: saída de
+        `construir_arestas_numpy`), sem passar pelo dicionário de adjacências.
+        As arestas devem estar ordenadas por (origem, destino), com origem < destino.
+
+        `colunas` (populacao, latitudes, longitudes), na ordem de `nomes`, substitui
+        a leitura de `dados_cidades` (ex.: colunas de uma TabelaCidades).
+        """
+        n = len(nomes)
+        origens = list(origens); destinos = list(destinos); pesos_arestas = list(pesos_arestas)
+        graus = [0] * n
+        for i, j in zip(origens, destinos):
+            graus[i] += 1; graus[j] += 1
+        offsets = array('q', [0] * (n + 1))
+        for i in range(n):
+            offsets[i + 1] = offsets[i] + graus[i]
+        proxima = list(offsets[:n])
+        alvos = array('i', [0] * offsets[n])
+        pesos = array('d', [0.0] * offsets[n])
+        # Mesma ordem de inserção do laço original: cada par (i, j) em ordem crescente
+        for i, j, distancia in zip(origens, destinos, pesos_arestas):
+            alvos[proxima[i]] = j; pesos[proxima[i]] = distancia; proxima[i] += 1
+            alvos[proxima[j]] = i; pesos[proxima[j]] = distancia; proxima[j] += 1
+        if colunas is None:
+            colunas = cls._colunas_cidades(nomes, dados_cidades)
+        return cls(list(nomes), offsets, alvos, pesos, *colunas)
+
+    @staticmethod
+    def _colunas_cidades(nomes, dados_cidades):
+        populacao = array('q', (converter_populacao(dados_cidades[nome]['population']) for nome in nomes))
+        latitudes = array('d', (dados_cidades[nome]['coords'][0] for nome in nomes))
+        longitudes = array('d', (dados_cidades[nome]['coords'][1] for nome in nomes))
+        return populacao, latitudes, longitudes
+
+    def __len__(self):
+        return len(self.nomes)
+
+    def __contains__(self, nome):
+        return nome in self.ids
+
+    @property
+    def num_arestas(self):
+        return len(self.alvos) // 2
+
+    def grau(self, i):
+        return self.offsets[i + 1] - self.offsets[i]
+
+    def vizinhos(self, i):
+        """Itera (id_vizinho, distancia) do nó i."""
+        inicio, fim = self.offsets[i], self.offsets[i + 1]
+        return zip(self.alvos[inicio:fim], self.pesos[inicio:fim])
+
+    def peso(self, i, j):
+        """Peso da aresta i-j, ou None se não existir."""
+        for vizinho, distancia in self.vizinhos(i):
+            if vizinho == j:
+                return distancia
+        return None
+
+    def coords(self, i):
+        return (self.latitudes[i], self.longitudes[i])
+
+    def para_grafo(self):
+        """Converte de volta para a lista de adjacências por nome."""
+        nomes = self.nomes
+        return {nome: [(nomes[j], d) for j, d in self.vizinhos(i)] for i, nome in enumerate(nomes)}
+
+    def formatar_caminho(self, caminho_ids):
+        """Gera a string 'A -> B (Dist: x.xx) -> ...' do caminho (mesmo formato de `caminho_detalhado`)."""
+        nomes = self.nomes
+        partes_caminho_str = [nomes[caminho_ids[0]]]
+        for atual, proximo in zip(caminho_ids, caminho_ids[1:]):
+            dist_seg = self.peso(atual, proximo)
+            if dist_seg is not None:
+                partes_caminho_str.append(f"-> {nomes[proximo]} (Dist: {dist_seg:.2f})")
+            else:
+                partes_caminho_str.append(f"-> {nomes[proximo]} (Dist: ??)")
+        return " ".join(partes_caminho_str)
@@ -0,0 +1,276 @@
+import sys
+import time
+from collections import deque
+
+from Buscauniforme import carregar_dados_cidades, construir_grafo, busca_custo_uniforme_pais
+from componentes import IndiceComponentes, UniaoBusca
+from grafo_csr import GrafoCSR
+from indice_espacial import construir_grafo_espacial, criar_indice_cidades
+
+# --- Grafo Dinâmico (Inserção/Remoção de Cidades e Fechamento de Arestas) ---
+#
+# Mantém o grafo de adjacências por nome (o mesmo dicionário que as buscas
+# recebem), o dicionário de cidades e o índice espacial vivos, e aplica cada
+# mudança só na vizinhança afetada:
+#   - inserir uma cidade consulta o índice espacial (cidades a distância <= r) e
+#     liga a cidade só a elas;
+#   - remover uma cidade percorre só as listas dos seus vizinhos;
+#   - fechar uma aresta a tira das duas listas (o peso fica guardado para a
+#     reabertura).
+#
+# Estruturas derivadas:
+#   - componentes (IndiceComponentes): corrigidas no lugar. Junções reetiquetam a
+#     componente menor; em remoções, duas buscas em largura alternadas a partir
+#     das pontas param no encontro (nada mudou) ou quando um lado se esgota (esse
+#     lado, o menor, vira uma componente nova).
+#   - caches registrados (CacheRotas): fechar aresta ou remover cidade só
+#     aumenta distâncias, então só saem as rotas que passavam por elas; inserir
+#     cidade ou reabrir aresta pode encurtar qualquer rota e limpa o cache.
+#   - GrafoCSR e snapshot: `para_csr` guarda a versão compacta até a próxima
+#     mudança; `salvar_snapshot` grava o grafo atual com a assinatura do próprio
+#     grafo no lugar do hash do JSON, então `carregar_ou_compilar` nunca o
+#     confunde com o snapshot do arquivo de origem.
+
+
+def _chave_aresta(a, b):
+    return (a, b) if a <= b else (b, a)
+
+
+class GrafoDinamico:
+    """
+    Grafo de raio r que aceita mudanças sem reconstrução.
+
+    Atributos:
+        grafo (dict): Lista de adjacências {cidade: [(vizinho, distancia), ...]},
+            sem as arestas fechadas; pode ser passado direto às buscas.
+        dados_cidades (dict): nome -> {'coords', 'population'}.
+        componentes (IndiceComponentes): Sempre atualizado.
+        fechadas (dict): (a, b) com a <= b -> distância das arestas fechadas.
+        versao (int): Incrementada a cada mudança.
+
+    Args:
+        dados_cidades (dict): Cidades iniciais (o dicionário passa a ser mantido aqui).
+        r (float): Raio de conexão.
+    """
+
+    def __init__(self, dados_cidades, r):
+        self.r = r
+        self.dados_cidades = dados_cidades
+        self.indice = criar_indice_cidades(dados_cidades, r)
+        uniao = UniaoBusca()
+        self.grafo = construir_grafo_espacial(dados_cidades, r, uniao, self.indice)
+        self.componentes = IndiceComponentes.a_partir_da_uniao(uniao)
+        self.fechadas = {}
+        self.versao = 0
+        self._caches = []
+        self._csr = None
+
+    def registrar_cache(self, cache):
+        """Passa a invalidar o CacheRotas `cache` a cada mudança."""
+        self._caches.append(cache)
+
+    def _alterado(self, condicao=None):
+        # condicao(origem, destino, caminho) -> True se a rota em cache deixou de valer; None limpa tudo
+        self.versao += 1
+        self._csr = None
+        for cache in self._caches:
+            if condicao is None:
+                cache.limpar()
+            else:
+                cache.descartar_se(condicao)
+
+    # --- Mudanças ---
+
+    def inserir_cidade(self, nome, coords, populacao=0):
+        """Insere uma cidade ligada às cidades a distância <= r. Retorna o número de arestas criadas."""
+        if nome in self.dados_cidades:
+            raise ValueError(f"Cidade '{nome}' já existe no grafo")
+        vizinhos = self.indice.cities_within(coords, self.r) # Antes de inserir: sem a própria cidade
+        self.dados_cidades[nome] = {'coords': coords, 'population': populacao}
+        self.indice.inserir(nome, coords)
+        self.grafo[nome] = list(vizinhos)
+        for vizinho, distancia in vizinhos:
+            self.grafo[vizinho].append((nome, distancia))
+        self.componentes.adicionar(nome)
+        for vizinho, _ in vizinhos:
+            self._juntar(nome, vizinho)
+        self._alterado()
+        return len(vizinhos)
+
+    def remover_cidade(self, nome):
+        """Remove a cidade, suas arestas (abertas e fechadas) e divide a componente se preciso."""
+        if nome not in self.dados_cidades:
+            raise KeyError(f"Cidade '{nome}' não existe no grafo")
+        vizinhos = [vizinho for vizinho, _ in self.grafo.pop(nome)]
+        for vizinho in vizinhos:
+            self.grafo[vizinho] = [item for item in self.grafo[vizinho] if item[0] != nome]
+        for vizinho, _ in self.arestas_fechadas(nome):
+            del self.fechadas[_chave_aresta(nome, vizinho)]
+        del self.dados_cidades[nome]
+        self.indice.remover(nome)
+        self.componentes.remover(nome)
+        self._separar_vizinhos(vizinhos)
+        self._alterado(lambda origem, destino, caminho: nome in (origem, destino) or (caminho is not None and nome in caminho))
+
+    def fechar_aresta(self, a, b):
+        """Desativa a aresta a-b (ex.: estrada interditada) até `reabrir_aresta`."""
+        distancia = next((d for vizinho, d in self.grafo.get(a, []) if vizinho == b), None)
+        if distancia is None:
+            raise KeyError(f"Não há aresta aberta entre '{a}' e '{b}'")
+        self.grafo[a] = [item for item in self.grafo[a] if item[0] != b]
+        self.grafo[b] = [item for item in self.grafo[b] if item[0] != a]
+        self.fechadas[_chave_aresta(a, b)] = distancia
+        self._separar_vizinhos([a, b])
+        self._alterado(lambda origem, destino, caminho: caminho is not None and _usa_aresta(caminho, a, b))
+
+    def reabrir_aresta(self, a, b):
+        distancia = self.fechadas.pop(_chave_aresta(a, b), None)
+        if distancia is None:
+            raise KeyError(f"Não há aresta fechada entre '{a}' e '{b}'")
+        self.grafo[a].append((b, distancia))
+        self.grafo[b].append((a, distancia))
+        self._juntar(a, b)
+        self._alterado()
+
+    def arestas_fechadas(self, nome):
+        """Arestas fechadas da cidade: lista de (vizinho, distancia)."""
+        return [(b if a == nome else a, distancia) for (a, b), distancia in self.fechadas.items() if nome in (a, b)]
+
+    # --- Componentes ---
+
+    def _juntar(self, a, b):
+        # Nova aresta a-b: a componente menor recebe o rótulo da maior
+        componentes = self.componentes
+        rotulo_a = componentes.rotulos[a]; rotulo_b = componentes.rotulos[b]
+        if rotulo_a == rotulo_b:
+            return
+        if componentes.tamanhos[rotulo_a] < componentes.tamanhos[rotulo_b]:
+            a, b, rotulo_a, rotulo_b = b, a, rotulo_b, rotulo_a
+        componentes.mover(self._cidades_no_rotulo(b, rotulo_b), rotulo_a)
+
+    def _cidades_no_rotulo(self, inicio, rotulo):
+        # Busca em largura restrita a um rótulo: percorre só a componente menor numa junção
+        rotulos = self.componentes.rotulos
+        visitados = {inicio}
+        fila = deque([inicio])
+        while fila:
+            for vizinho, _ in self.grafo[fila.popleft()]:
+                if vizinho not in visitados and rotulos[vizinho] == rotulo:
+                    visitados.add(vizinho)
+                    fila.append(vizinho)
+        return visitados
+
+    def _lado_desconectado(self, a, b):
+        """
+        Buscas em largura alternadas a partir de a e b. Retorna None se elas se
+        encontram (mesma componente) ou as cidades do lado que se esgotou
+        primeiro (componente separada, a menor das duas).
+        """
+        grafo = self.grafo
+        lado = {a: 0, b: 1}
+        filas = (deque([a]), deque([b]))
+        visitados = ({a}, {b})
+        while True:
+            for i in (0, 1):
+                fila = filas[i]
+                if not fila:
+                    return visitados[i]
+                for vizinho, _ in grafo[fila.popleft()]:
+                    outro = lado.get(vizinho)
+                    if outro is None:
+                        lado[vizinho] = i
+                        visitados[i].add(vizinho)
+                        fila.append(vizinho)
+                    elif outro != i:
+                        return None
+
+    def _separar_vizinhos(self, cidades):
+        # Depois de tirar arestas: cidades que tinham o mesmo rótulo podem ter ficado
+        # em pedaços diferentes. Compara cada uma com uma referência do rótulo antigo;
+        # o lado desconectado (o menor) ganha um rótulo novo
+        rotulos = self.componentes.rotulos
+        pendentes = list(dict.fromkeys(cidades))
+        while pendentes:
+            referencia = pendentes.pop(0)
+            rotulo = rotulos[referencia]
+            restantes = []
+            for cidade in pendentes:
+                if rotulos[cidade] != rotulo:
+                    restantes.append(cidade)
+                    continue
+                lado = self._lado_desconectado(referencia, cidade)
+                if lado is None:
+                    continue # Mesma componente que a referência: resolvida
+                self.componentes.mover(lado)
+                if referencia in lado:
+                    referencia = cidade # A referência saiu do rótulo antigo; segue com a outra ponta
+            pendentes = restantes
+
+    # --- Derivados ---
+
+    def para_csr(self):
+        """GrafoCSR do estado atual (guardado até a próxima mudança)."""
+        if self._csr is None:
+            self._csr = GrafoCSR.a_partir_do_grafo(self.grafo, self.dados_cidades)
+        return self._csr
+
+    def salvar_snapshot(self, caminho_snapshot):
+        """Grava o estado atual como snapshot (assinatura do grafo no lugar do hash do JSON)."""
+        from landmarks_alt import assinatura_grafo
+        from snapshot_grafo import salvar_snapshot
+        salvar_snapshot(self.para_csr(), caminho_snapshot, self.r, assinatura_grafo(self.grafo))
+
+
+def _usa_aresta(caminho, a, b):
+    return any((x == a and y == b) or (x == b and y == a) for x, y in zip(caminho, caminho[1:]))
+
+
+def _particao(componentes):
+    grupos = {}
+    for cidade, rotulo in componentes.rotulos.items():
+        grupos.setdefault(rotulo, set()).add(cidade)
+    return sorted(sorted(grupo) for grupo in grupos.values())
+
+
+# --- Bloco Principal de Execução (Mudanças Locais x Reconstrução) ---
+if __name__ == "__main__":
+    ARQUIVO_JSON = sys.argv[1] if len(sys.argv) > 1 else 'cities.json'
+    RAIO_DISTANCIA = 3.5
+    ORIGEM, DESTINO = "Miami", "Seattle"
+
+    inicio_tempo = time.perf_counter()
+    dados_cidades = carregar_dados_cidades(ARQUIVO_JSON)
+    if not dados_cidades:
+        print("Não foi possível carregar os dados das cidades. Abortando.")
+        sys.exit(1)
+    construir_grafo(dados_cidades, RAIO_DISTANCIA)
+    print(f"Reconstrução completa (carregar + construir_grafo): {time.perf_counter() - inicio_tempo:.4f} s")
+
+    dinamico = GrafoDinamico(dados_cidades, RAIO_DISTANCIA)
+    print(dinamico.componentes.resumo())
+
+    def rota():
+        caminho, custo, _ = busca_custo_uniforme_pais(dinamico.grafo, dinamico.dados_cidades, ORIGEM, DESTINO)
+        return caminho, custo
+
+    def medir(descricao, funcao, *args):
+        inicio = time.perf_counter()
+        funcao(*args)
+        print(f"{descricao}: {(time.perf_counter() - inicio) * 1000:.3f} ms")
+
+    caminho, custo = rota()
+    print(f"\n{ORIGEM} -> {DESTINO}: {custo:.2f} ({len(caminho)} cidades)")
+    medir(f"Fechar aresta {caminho[1]} - {caminho[2]}", dinamico.fechar_aresta, caminho[1], caminho[2])
+    caminho_fechado, custo = rota()
+    print(f"  Nova rota: {custo:.2f}")
+    medir(f"Remover cidade {caminho_fechado[3]}", dinamico.remover_cidade, caminho_fechado[3])
+    print(f"  Nova rota: {rota()[1]:.2f}")
+    medir(f"Reabrir aresta {caminho[1]} - {caminho[2]}", dinamico.reabrir_aresta, caminho[1], caminho[2])
+    coords = dinamico.dados_cidades[ORIGEM]['coords']
+    medir("Inserir cidade nova perto da origem", dinamico.inserir_cidade, "Cidade Nova", (coords[0] + 0.5, coords[1] + 0.5), 1000)
+    print(f"  Nova rota: {rota()[1]:.2f}; vizinhos da cidade nova: {len(dinamico.grafo['Cidade Nova'])}")
+
+    # Conferência: componentes corrigidas x recalculadas do zero
+    recalculadas = IndiceComponentes.a_partir_do_grafo(dinamico.grafo)
+    print(f"\n{dinamico.componentes.resumo()}")
+    print(f"Componentes iguais às recalculadas: {_particao(dinamico.componentes) == _particao(recalculadas)}")
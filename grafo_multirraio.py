@@ -0,0 +1,132 @@
+import time
+from bisect import bisect_right
+
+from Buscauniforme import carregar_dados_cidades, construir_grafo, busca_custo_uniforme_pais
+from Buscabidirecional import busca_bidirecional_final_verbose
+
+# --- Grafo Multi-Raio ---
+
+class GrafoMultiRaio:
+    """
+    Grafo construído uma única vez no raio máximo, com a lista de adjacências
+    de cada cidade ordenada por distância. O grafo de qualquer raio r <= raio_max
+    é obtido cortando cada lista no primeiro vizinho com distância > r (busca
+    binária), sem chamar `construir_grafo` de novo.
+
+    Args:
+        dados_cidades (dict): Dados das cidades.
+        raio_max (float): Maior raio que será consultado.
+        grafo (dict, opcional): Grafo já construído com raio_max (evita reconstruir).
+    """
+
+    def __init__(self, dados_cidades, raio_max, grafo=None):
+        self.raio_max = raio_max
+        if grafo is None:
+            grafo = construir_grafo(dados_cidades, raio_max)
+        self.adjacencias = {}
+        self.distancias = {} # Só as distâncias, para a busca binária do corte
+        for cidade, adj in grafo.items():
+            ordenada = sorted(adj, key=lambda item: item[1])
+            self.adjacencias[cidade] = ordenada
+            self.distancias[cidade] = [distancia for _, distancia in ordenada]
+
+    def _validar_raio(self, r):
+        if r > self.raio_max:
+            raise ValueError(f"Raio {r} maior que o raio máximo do grafo ({self.raio_max})")
+
+    def vizinhos(self, cidade, r):
+        """Vizinhos de `cidade` a distância <= r, do mais próximo ao mais distante."""
+        corte = bisect_right(self.distancias[cidade], r)
+        return self.adjacencias[cidade][:corte]
+
+    def visao(self, r):
+        """Visão do grafo no raio r, utilizável no lugar do dicionário `grafo` nas buscas."""
+        self._validar_raio(r)
+        return VisaoRaio(self, r)
+
+    def num_arestas(self, r):
+        self._validar_raio(r)
+        return sum(bisect_right(dists, r) for dists in self.distancias.values()) // 2
+
+    def nos_conectados(self, r):
+        self._validar_raio(r)
+        return sum(1 for dists in self.distancias.values() if dists and dists[0] <= r)
+
+
+class VisaoRaio:
+    """Interface de dicionário (get, [], in, iteração) sobre um GrafoMultiRaio em um raio fixo."""
+
+    def __init__(self, grafo_multirraio, r):
+        self.grafo_multirraio = grafo_multirraio
+        self.r = r
+
+    def get(self, cidade, padrao=None):
+        if cidade not in self.grafo_multirraio.adjacencias:
+            return padrao
+        return self.grafo_multirraio.vizinhos(cidade, self.r)
+
+    def __getitem__(self, cidade):
+        return self.grafo_multirraio.vizinhos(cidade, self.r)
+
+    def __contains__(self, cidade):
+        return cidade in self.grafo_multirraio.adjacencias
+
+    def __iter__(self):
+        return iter(self.grafo_multirraio.adjacencias)
+
+    def __len__(self):
+        return len(self.grafo_multirraio.adjacencias)
+
+    def keys(self):
+        return self.grafo_multirraio.adjacencias.keys()
+
+    def values(self):
+        return (self[cidade] for cidade in self)
+
+    def items(self):
+        return ((cidade, self[cidade]) for cidade in self)
+
+
+def varrer_raios(grafo_multirraio, dados_cidades, raios, cenarios):
+    """
+    Executa os cenários em cada raio (UCS e bidirecional, silenciosas).
+
+    Returns:
+        list: Um dicionário por raio com arestas, nós conectados e os resultados dos cenários.
+    """
+    relatorio = []
+    for r in raios:
+        grafo = grafo_multirraio.visao(r)
+        linha = {"raio": r, "arestas": grafo_multirraio.num_arestas(r),
+                 "nos_conectados": grafo_multirraio.nos_conectados(r), "cenarios": []}
+        for inicio, fim in cenarios:
+            _, custo_ucs, est_ucs = busca_custo_uniforme_pais(grafo, dados_cidades, inicio, fim)
+            _, custo_bi, est_bi = busca_bidirecional_final_verbose(grafo, dados_cidades, inicio, fim)
+            linha["cenarios"].append({"inicio": inicio, "fim": fim, "custo": custo_ucs,
+                                      "expansoes_ucs": est_ucs["total_expansoes"],
+                                      "expansoes_bidirecional": est_bi["total_expansoes"],
+                                      "cidades_no_caminho": len(est_ucs["caminho"]) if est_ucs["caminho"] else 0})
+        relatorio.append(linha)
+    return relatorio
+
+
+# --- Bloco Principal de Execução (Varredura de Raios) ---
+if __name__ == "__main__":
+    ARQUIVO_JSON = 'cities.json'
+    RAIOS = [2.0, 2.5, 3.0, 3.5, 4.0, 5.0]
+    cenarios = [("New York", "Jacksonville"), ("Miami", "Seattle"), ("Los Angeles", "Detroit")]
+
+    dados_cidades = carregar_dados_cidades(ARQUIVO_JSON)
+    if dados_cidades:
+        inicio_tempo = time.perf_counter()
+        grafo_multirraio = GrafoMultiRaio(dados_cidades, max(RAIOS))
+        print(f"Grafo construído uma vez com raio máximo {max(RAIOS)} em {time.perf_counter() - inicio_tempo:.4f} segundos")
+
+        for linha in varrer_raios(grafo_multirraio, dados_cidades, RAIOS, cenarios):
+            print(f"\n=== Raio {linha['raio']}: {linha['arestas']} arestas, {linha['nos_conectados']} / {len(dados_cidades)} nós com conexões ===")
+            for c in linha["cenarios"]:
+                custo = f"{c['custo']:.2f}" if c["custo"] != float('inf') else "sem caminho"
+                print(f"  {c['inicio']} -> {c['fim']}: {custo} | cidades: {c['cidades_no_caminho']} "
+                      f"| expansões UCS: {c['expansoes_ucs']} | bidirecional: {c['expansoes_bidirecional']}")
+    else:
+        print("Não foi possível carregar os dados das cidades. Abortando.")
@@ -0,0 +1,111 @@
+import sys
+import time
+import tracemalloc
+from collections import OrderedDict
+from collections.abc import Mapping
+
+from Buscauniforme import carregar_dados_cidades, construir_grafo, busca_custo_uniforme_pais
+from Buscabidirecional import busca_bidirecional_final_verbose
+from indice_espacial import criar_indice_cidades
+
+# --- Grafo Preguiçoso (Vizinhos Calculados Sob Demanda) ---
+#
+# `construir_grafo` calcula as vizinhanças de todas as cidades antes da primeira
+# busca, mas uma consulta só expande parte delas. Aqui só o índice espacial é
+# montado no início; a lista de um nó é calculada na primeira vez em que uma
+# busca pede por ela (cities_within no raio r) e guardada em um cache LRU de
+# tamanho limitado. A memória fica proporcional à região explorada.
+#
+# As listas saem na ordem de inserção das cidades, a mesma de
+# `construir_grafo_espacial`: as buscas expandem os mesmos nós, na mesma ordem.
+
+
+MAX_NOS_PADRAO = 4096 # Listas de adjacência mantidas no cache
+
+
+class GrafoPreguicoso(Mapping):
+    """
+    Lista de adjacências somente leitura, com a interface do dicionário de
+    `construir_grafo` (get, [], in, len, iteração). `in` e `len` não calculam
+    vizinhos; `items()` e `values()` calculam todos (materializam o grafo).
+
+    Args:
+        dados_cidades (dict): Dados das cidades (nome -> {'coords', 'population'}).
+        r (float): Raio de conexão.
+        max_nos (int, opcional): Listas guardadas no cache LRU (None = sem limite).
+    """
+
+    def __init__(self, dados_cidades, r, max_nos=MAX_NOS_PADRAO):
+        self.dados_cidades = dados_cidades
+        self.r = r
+        self.max_nos = max_nos
+        self.indice = criar_indice_cidades(dados_cidades, r)
+        self.vizinhancas = OrderedDict() # cidade -> [(vizinho, distancia), ...]
+        self.acertos = 0
+        self.calculos = 0
+        self.remocoes = 0
+
+    def __getitem__(self, cidade):
+        adj = self.vizinhancas.get(cidade)
+        if adj is not None:
+            self.vizinhancas.move_to_end(cidade)
+            self.acertos += 1
+            return adj
+        dados = self.dados_cidades.get(cidade)
+        if dados is None:
+            raise KeyError(cidade)
+        adj = [(vizinho, distancia) for vizinho, distancia in self.indice.cities_within(dados['coords'], self.r)
+               if vizinho != cidade]
+        self.calculos += 1
+        self.vizinhancas[cidade] = adj
+        if self.max_nos is not None and len(self.vizinhancas) > self.max_nos:
+            self.vizinhancas.popitem(last=False)
+            self.remocoes += 1
+        return adj
+
+    def __contains__(self, cidade):
+        return cidade in self.dados_cidades
+
+    def __iter__(self):
+        return iter(self.dados_cidades)
+
+    def __len__(self):
+        return len(self.dados_cidades)
+
+    def estatisticas_cache(self):
+        total = self.acertos + self.calculos
+        return {"listas": len(self.vizinhancas), "acertos": self.acertos, "calculos": self.calculos,
+                "remocoes": self.remocoes, "taxa_acerto": self.acertos / total if total else 0.0}
+
+
+# --- Bloco Principal de Execução (Grafo Completo x Preguiçoso) ---
+if __name__ == "__main__":
+    ARQUIVO_JSON = sys.argv[1] if len(sys.argv) > 1 else 'cities.json'
+    RAIO_DISTANCIA = 3.5
+    cenarios = [("New York", "Jacksonville"), ("Miami", "Seattle"), ("Los Angeles", "Detroit")]
+
+    dados_cidades = carregar_dados_cidades(ARQUIVO_JSON)
+    if not dados_cidades:
+        print("Não foi possível carregar os dados das cidades. Abortando.")
+        sys.exit(1)
+
+    for nome, criar in (("Completo", lambda: construir_grafo(dados_cidades, RAIO_DISTANCIA)),
+                        ("Preguiçoso", lambda: GrafoPreguicoso(dados_cidades, RAIO_DISTANCIA))):
+        tracemalloc.start()
+        inicio_tempo = time.perf_counter()
+        grafo = criar()
+        preparo = time.perf_counter() - inicio_tempo
+        memoria_preparo = tracemalloc.get_traced_memory()[0]
+        print(f"\n{nome}: pronto em {preparo * 1000:.2f} ms ({memoria_preparo / 1024:.1f} KB)")
+        for inicio, fim in cenarios:
+            inicio_tempo = time.perf_counter()
+            _, custo, est_ucs = busca_custo_uniforme_pais(grafo, dados_cidades, inicio, fim)
+            _, _, est_bi = busca_bidirecional_final_verbose(grafo, dados_cidades, inicio, fim)
+            duracao = time.perf_counter() - inicio_tempo
+            print(f"  {inicio} -> {fim}: {custo:.2f} | expansões UCS {est_ucs['total_expansoes']}, "
+                  f"bidirecional {est_bi['total_expansoes']} | {duracao * 1000:.2f} ms")
+        memoria_final = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print(f"  Memória do grafo após as buscas: {memoria_final / 1024:.1f} KB")
+        if isinstance(grafo, GrafoPreguicoso):
+            print(f"  Cache de vizinhanças: {grafo.estatisticas_cache()}")
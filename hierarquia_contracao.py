@@ -0,0 +1,278 @@
+import heapq
+import time
+
+from Buscabidirecional import (carregar_dados_cidades, construir_grafo, reconstruir_caminho,
+                               formatar_caminho_detalhado, imprimir_resumo_bidirecional)
+from ganchos_busca import resolver_ganchos, SILENCIOSO, RESUMO
+from preparacao_busca import novas_estatisticas, iniciar_busca, AUSENTE_GRAFO
+
+# --- Hierarquia de Contração (Contraction Hierarchies) ---
+#
+# Pré-processamento: os nós são contraídos um a um, do "menos importante" ao
+# "mais importante". A importância é a diferença de arestas (atalhos criados
+# menos arestas removidas, contando as testemunhas) mais o número de vizinhos já
+# contraídos. Ao contrair v, cada par de vizinhos (u, w) ainda não contraídos
+# ganha um atalho u-w de peso w(u,v) + w(v,w), a não ser que exista um caminho
+# testemunha de custo menor ou igual que não passe por v. Cada nó recebe o seu
+# nível (ordem de contração).
+#
+# Consulta: busca bidirecional em que os dois lados só sobem de nível, com
+# stall-on-demand (nós alcançados por um custo não ótimo não são expandidos). O
+# encontro e a reconstrução seguem `reconstruir_caminho`; os atalhos são então
+# desempacotados no caminho real de cidades.
+
+LIMITE_TESTEMUNHA = 60 # Nós fixados por busca de testemunha (limita o pré-processamento)
+
+
+class HierarquiaContracao:
+    """
+    Hierarquia de contração sobre o grafo de `construir_grafo`.
+
+    Args:
+        grafo (dict): Lista de adjacências {cidade: [(vizinho, distancia), ...]}.
+        limite_testemunha (int): Máximo de nós fixados em cada busca de testemunha.
+            Limites menores pré-processam mais rápido, mas criam mais atalhos.
+    """
+
+    def __init__(self, grafo, limite_testemunha=LIMITE_TESTEMUNHA):
+        inicio_tempo = time.perf_counter()
+        self.grafo = grafo
+        self.limite_testemunha = limite_testemunha
+        self.nomes = list(grafo.keys())
+        self.ids = {nome: i for i, nome in enumerate(self.nomes)}
+        n = len(self.nomes)
+
+        # Grafo de trabalho (nós ainda não contraídos) e o nó "do meio" de cada atalho
+        self._adj = [dict() for _ in range(n)]
+        for nome, adj in grafo.items():
+            u = self.ids[nome]
+            for vizinho, distancia in adj:
+                v = self.ids[vizinho]
+                if distancia < self._adj[u].get(v, float('inf')):
+                    self._adj[u][v] = distancia
+        self.meio = {}
+        self.num_atalhos = 0
+        self.nivel = [0] * n
+        self._contrair_todos()
+
+        # Grafo de subida: de cada nó só para vizinhos de nível maior (arestas + atalhos)
+        self.subida = [[(v, w) for v, w in self._arestas_finais[u].items() if self.nivel[v] > self.nivel[u]]
+                       for u in range(n)]
+        del self._adj, self._arestas_finais
+        self.tempo_preprocessamento = time.perf_counter() - inicio_tempo
+
+    # --- Pré-processamento ---
+
+    def _buscar_testemunhas(self, origem, ignorar, alvos, limite_custo):
+        # Dijkstra local a partir de `origem`, sem passar por `ignorar` (o nó sendo contraído).
+        # Para quando todos os `alvos` forem fixados, quando o custo passar de `limite_custo`
+        # ou no limite de nós fixados
+        adj = self._adj
+        custos = {origem: 0}
+        fila = [(0, origem)]
+        restantes = len(alvos)
+        fixados = 0
+        while fila:
+            custo, u = heapq.heappop(fila)
+            if custo > custos[u]:
+                continue
+            if custo > limite_custo:
+                break
+            if u in alvos:
+                restantes -= 1
+                if not restantes:
+                    break
+            fixados += 1
+            if fixados > self.limite_testemunha:
+                break
+            for x, w in adj[u].items():
+                if x == ignorar:
+                    continue
+                novo_custo = custo + w
+                if novo_custo < custos.get(x, float('inf')):
+                    custos[x] = novo_custo
+                    heapq.heappush(fila, (novo_custo, x))
+        return custos
+
+    def _atalhos_necessarios(self, v, busca_completa=True):
+        # Lista (u, w, peso) dos atalhos que a contração de v exigiria. Testemunhas de um e
+        # de dois saltos (u-x, u-y-x) são testadas direto; só os pares que sobram vão para a
+        # busca de testemunhas. Sem `busca_completa` (estimativa da prioridade) esses pares
+        # contam como atalhos: a estimativa fica um pouco acima, nunca abaixo
+        adj = self._adj
+        infinito = float('inf')
+        vizinhos = list(adj[v].items())
+        atalhos = []
+        for indice, (u, peso_uv) in enumerate(vizinhos):
+            adj_u = adj[u]
+            pendentes = []
+            for x, peso_vx in vizinhos[indice + 1:]:
+                peso = peso_uv + peso_vx
+                if adj_u.get(x, infinito) <= peso:
+                    continue
+                if any(y != v and peso_xy + adj_u.get(y, infinito) <= peso for y, peso_xy in adj[x].items()):
+                    continue
+                pendentes.append((x, peso))
+            if pendentes and busca_completa:
+                custos = self._buscar_testemunhas(u, v, {x for x, _ in pendentes}, max(p for _, p in pendentes))
+                pendentes = [(x, peso) for x, peso in pendentes if custos.get(x, infinito) > peso]
+            atalhos.extend((u, x, peso) for x, peso in pendentes)
+        return atalhos
+
+    def _prioridade(self, v, contraidos_vizinhos):
+        # Diferença de arestas (atalhos que a contração criaria menos as arestas removidas)
+        # + vizinhos já contraídos, que espalha a contração pelo grafo
+        return len(self._atalhos_necessarios(v, busca_completa=False)) - len(self._adj[v]) + contraidos_vizinhos[v]
+
+    def _contrair_todos(self):
+        n = len(self.nomes)
+        adj = self._adj
+        self._arestas_finais = [dict(a) for a in adj]
+        contraidos_vizinhos = [0] * n
+        fila = [(self._prioridade(v, contraidos_vizinhos), v) for v in range(n)]
+        heapq.heapify(fila)
+        nivel = 0
+        contraido = [False] * n
+        while fila:
+            _, v = heapq.heappop(fila)
+            if contraido[v]:
+                continue
+            # Atualização preguiçosa: recalcula e devolve à fila se não for mais o mínimo
+            prioridade = self._prioridade(v, contraidos_vizinhos)
+            if fila and prioridade > fila[0][0]:
+                heapq.heappush(fila, (prioridade, v))
+                continue
+
+            for u, x, peso in self._atalhos_necessarios(v):
+                if peso < adj[u].get(x, float('inf')):
+                    adj[u][x] = adj[x][u] = peso
+                    self._arestas_finais[u][x] = self._arestas_finais[x][u] = peso
+                    self.meio[(u, x)] = self.meio[(x, u)] = v
+                    self.num_atalhos += 1
+            for u in adj[v]:
+                del adj[u][v]
+                contraidos_vizinhos[u] += 1
+            adj[v] = {}
+            contraido[v] = True
+            self.nivel[v] = nivel
+            nivel += 1
+
+    # --- Consulta ---
+
+    def _desempacotar(self, caminho_ids):
+        # Substitui cada atalho (a, b) pelo caminho a -> meio -> b, recursivamente
+        caminho = [caminho_ids[0]]
+        for a, b in zip(caminho_ids, caminho_ids[1:]):
+            pilha = [(a, b)]
+            while pilha:
+                x, y = pilha.pop()
+                meio = self.meio.get((x, y))
+                if meio is None:
+                    caminho.append(y)
+                else:
+                    pilha.append((meio, y))
+                    pilha.append((x, meio))
+        return caminho
+
+    def consultar(self, no_inicial, no_final, componentes=None, verbosidade=SILENCIOSO, ganchos=None):
+        """
+        Consulta ponto a ponto na hierarquia. `componentes`, `verbosidade` e
+        `ganchos` seguem busca_bidirecional_final_verbose (as expansões e
+        inserções são as do grafo de subida).
+
+        Returns:
+            tuple: (caminho, custo, estatisticas) no formato da busca bidirecional,
+            com "nos_parados" (retirados da fila sem expansão pelo stall-on-demand),
+            "atalhos" e "tempo_preprocessamento" adicionais.
+        """
+        ao_expandir, ao_inserir, ao_encontrar, ao_finalizar, _ = resolver_ganchos(ganchos, verbosidade, imprimir_resumo_bidirecional)
+        inicio_tempo = time.time()
+        estatisticas = novas_estatisticas(bidirecional=True)
+        estatisticas.update({"nos_parados": 0, "atalhos": self.num_atalhos, "tempo_preprocessamento": self.tempo_preprocessamento})
+        resultado = iniciar_busca(no_inicial, no_final, self.ids, estatisticas, inicio_tempo, componentes, verbosidade, ao_finalizar, ausente=AUSENTE_GRAFO)
+        if resultado is not None:
+            return resultado
+
+        subida = self.subida
+        id_inicial = self.ids[no_inicial]; id_final = self.ids[no_final]
+        custos = ({id_inicial: 0}, {id_final: 0})
+        pais = ({id_inicial: None}, {id_final: None})
+        filas = ([(0, id_inicial)], [(0, id_final)])
+        fixados = (set(), set())
+        chaves = ("expansoes_avanco", "expansoes_retrocesso")
+        sentidos = ("avanco", "retrocesso")
+        nomes = self.nomes
+        infinito = float('inf')
+        melhor_custo = infinito; no_encontro = None
+
+        insercoes = descartes = 0
+        # Cada lado para quando o seu mínimo não pode mais melhorar o melhor custo
+        while True:
+            lados = [l for l in (0, 1) if filas[l] and filas[l][0][0] < melhor_custo]
+            if not lados:
+                break
+            lado = min(lados, key=lambda l: filas[l][0][0])
+            custo, u = heapq.heappop(filas[lado])
+            if u in fixados[lado]:
+                descartes += 1
+                continue
+            fixados[lado].add(u)
+            # Stall-on-demand: um vizinho de nível maior já alcançado por este lado dá um
+            # caminho mais curto até u (descendo a aresta), então o custo de u não é ótimo
+            # e nada que passe por u pode melhorar o resultado: u não é expandido
+            custos_lado = custos[lado]
+            if any(custos_lado.get(v, infinito) + w < custo for v, w in subida[u]):
+                estatisticas["nos_parados"] += 1
+                continue
+            estatisticas["total_expansoes"] += 1; estatisticas[chaves[lado]] += 1
+            if ao_expandir is not None: ao_expandir(nomes[u], custo, custo, sentidos[lado], estatisticas["total_expansoes"])
+            outro = custos[1 - lado].get(u)
+            if outro is not None and custo + outro < melhor_custo:
+                if ao_encontrar is not None: ao_encontrar(nomes[u], custo + outro, melhor_custo)
+                melhor_custo = custo + outro; no_encontro = u
+            for v, w in subida[u]:
+                novo_custo = custo + w
+                if novo_custo < custos[lado].get(v, infinito):
+                    custos[lado][v] = novo_custo
+                    pais[lado][v] = u
+                    heapq.heappush(filas[lado], (novo_custo, v))
+                    insercoes += 1
+                    if ao_inserir is not None: ao_inserir(nomes[v], novo_custo, novo_custo, sentidos[lado])
+
+        estatisticas.update({"insercoes_fila": insercoes, "descartes_fila": descartes})
+
+        if no_encontro is None:
+            estatisticas.update({"status": "Nenhum caminho encontrado (Espaço de busca esgotado)",
+                                 "tempo_execucao": time.time() - inicio_tempo})
+            if ao_finalizar is not None: ao_finalizar(estatisticas, no_inicial, no_final)
+            return None, float('inf'), estatisticas
+
+        caminho_ids = reconstruir_caminho(id_inicial, id_final, no_encontro, pais[0], pais[1])
+        caminho = [nomes[i] for i in self._desempacotar(caminho_ids)]
+        estatisticas.update({"status": "Caminho ótimo encontrado", "custo_final": melhor_custo,
+                             "no_encontro": nomes[no_encontro], "caminho": caminho,
+                             "caminho_detalhado": formatar_caminho_detalhado(self.grafo, caminho),
+                             "tempo_execucao": time.time() - inicio_tempo})
+        if ao_finalizar is not None: ao_finalizar(estatisticas, no_inicial, no_final)
+        return caminho, melhor_custo, estatisticas
+
+
+# --- Bloco Principal de Execução ---
+if __name__ == "__main__":
+    ARQUIVO_JSON = 'cities.json'
+    RAIO_DISTANCIA = 3.5
+    cenarios = [("New York", "Jacksonville"), ("Miami", "Seattle"), ("Los Angeles", "Detroit")]
+
+    dados_cidades = carregar_dados_cidades(ARQUIVO_JSON)
+    if dados_cidades:
+        grafo = construir_grafo(dados_cidades, RAIO_DISTANCIA)
+        print(f"Pré-processando hierarquia de contração (r = {RAIO_DISTANCIA})...")
+        hierarquia = HierarquiaContracao(grafo)
+        print(f"Pré-processamento: {hierarquia.tempo_preprocessamento:.4f} segundos | Atalhos: {hierarquia.num_atalhos}")
+        for inicio, fim in cenarios:
+            print(f"\n=============================================")
+            print(f"          {inicio} -> {fim} (Hierarquia de Contração)")
+            print(f"=============================================")
+            hierarquia.consultar(inicio, fim, verbosidade=RESUMO)
+    else:
+        print("Não foi possível carregar os dados das cidades. Abortando.")
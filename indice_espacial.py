@@ -0,0 +1,144 @@
+import math
+
+# --- Índice Espacial em Grade Uniforme ---
+
+class IndiceEspacial:
+    """
+    Índice espacial em grade uniforme sobre coordenadas (latitude, longitude).
+
+    Cada ponto é colocado em uma célula quadrada de lado `tamanho_celula`.
+    Uma consulta de raio r só precisa olhar as células que cobrem o quadrado
+    [x - r, x + r] x [y - r, y + r], então a construção do grafo deixa de
+    comparar todos os pares de cidades.
+
+    Args:
+        tamanho_celula (float): Lado de cada célula da grade (normalmente o raio r).
+    """
+
+    def __init__(self, tamanho_celula):
+        # Raio zero (ou negativo) só liga pontos idênticos; qualquer célula serve
+        self.tamanho_celula = tamanho_celula if tamanho_celula > 0 else 1.0
+        self.celulas = {}   # (cx, cy) -> lista de chaves
+        self.coords = {}    # chave -> (lat, lon)
+        self.ordem = {}     # chave -> ordem de inserção (mantém resultados determinísticos)
+        self._proxima_ordem = 0
+
+    def _celula(self, coords):
+        return (math.floor(coords[0] / self.tamanho_celula), math.floor(coords[1] / self.tamanho_celula))
+
+    def inserir(self, chave, coords):
+        """Insere (ou reposiciona) um ponto no índice."""
+        if chave in self.coords:
+            self.remover(chave)
+        self.coords[chave] = coords
+        self.ordem[chave] = self._proxima_ordem
+        self._proxima_ordem += 1
+        self.celulas.setdefault(self._celula(coords), []).append(chave)
+
+    def remover(self, chave):
+        """Remove um ponto do índice. Chaves inexistentes são ignoradas."""
+        coords = self.coords.pop(chave, None)
+        if coords is None:
+            return
+        del self.ordem[chave]
+        celula = self._celula(coords)
+        ocupantes = self.celulas[celula]
+        ocupantes.remove(chave)
+        if not ocupantes:
+            del self.celulas[celula]
+
+    def __len__(self):
+        return len(self.coords)
+
+    def __contains__(self, chave):
+        return chave in self.coords
+
+    def cities_within(self, coords, r):
+        """
+        Retorna todos os pontos a distância euclidiana <= r de `coords`.
+
+        Args:
+            coords (tuple): Coordenadas (lat, lon) do centro da consulta.
+            r (float): Raio da consulta.
+
+        Returns:
+            list: Lista de (chave, distancia), na ordem de inserção das chaves.
+        """
+        if r < 0:
+            return []
+        cx0, cy0 = self._celula((coords[0] - r, coords[1] - r))
+        cx1, cy1 = self._celula((coords[0] + r, coords[1] + r))
+        resultado = []
+        # Raios muito maiores que a célula viram uma varredura das células ocupadas
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > len(self.celulas):
+            celulas = [ocupantes for (cx, cy), ocupantes in self.celulas.items()
+                       if cx0 <= cx <= cx1 and cy0 <= cy <= cy1]
+        else:
+            celulas = [self.celulas[(cx, cy)]
+                       for cx in range(cx0, cx1 + 1)
+                       for cy in range(cy0, cy1 + 1)
+                       if (cx, cy) in self.celulas]
+        for ocupantes in celulas:
+            for chave in ocupantes:
+                distancia = math.dist(coords, self.coords[chave])
+                if distancia <= r:
+                    resultado.append((chave, distancia))
+        resultado.sort(key=lambda item: self.ordem[item[0]])
+        return resultado
+
+
+def criar_indice_cidades(dados_cidades, r):
+    """Cria um IndiceEspacial com todas as cidades, usando células de lado r."""
+    indice = IndiceEspacial(r)
+    for nome, dados in dados_cidades.items():
+        indice.inserir(nome, dados['coords'])
+    return indice
+
+
+def cities_within(dados_cidades, coords, r, indice=None):
+    """
+    Consulta de raio avulsa: cidades a distância <= r de `coords`.
+
+    Se `indice` não for passado, cria um temporário (custo O(n)); para
+    consultas repetidas, crie o índice uma vez com `criar_indice_cidades`.
+    """
+    if indice is None:
+        indice = criar_indice_cidades(dados_cidades, r)
+    return indice.cities_within(coords, r)
+
+
+def construir_grafo_espacial(dados_cidades, r, uniao=None, indice=None):
+    """
+    Constrói o mesmo grafo de `construir_grafo` (mesmas arestas, mesmos pesos
+    e mesma ordem nas listas de adjacência), comparando apenas cidades em
+    células vizinhas da grade.
+
+    Args:
+        dados_cidades (dict): Dados das cidades (nome -> {'coords', 'population'}).
+        r (float): Raio máximo de conexão.
+        uniao (UniaoBusca, opcional): Recebe a união das pontas de cada aresta
+            criada (componentes conexas calculadas junto com o grafo).
+        indice (IndiceEspacial, opcional): Índice já preenchido com as cidades
+            (ex.: mantido depois pelo grafo dinâmico); padrão: criado aqui.
+
+    Returns:
+        dict: Lista de adjacências {cidade: [(vizinho, distancia), ...]}.
+    """
+    grafo = {cidade: [] for cidade in dados_cidades}
+    if uniao is not None:
+        for cidade in dados_cidades:
+            uniao.adicionar(cidade)
+    if indice is None:
+        indice = criar_indice_cidades(dados_cidades, r)
+    ordem = indice.ordem
+    for nome_cidade1, dados_cidade1 in dados_cidades.items():
+        ordem1 = ordem[nome_cidade1]
+        # Cada par é tratado uma única vez, a partir da cidade de menor ordem,
+        # reproduzindo a ordem das listas de adjacência do laço original
+        for nome_cidade2, distancia in indice.cities_within(dados_cidade1['coords'], r):
+            if ordem[nome_cidade2] > ordem1:
+                grafo[nome_cidade1].append((nome_cidade2, distancia))
+                grafo[nome_cidade2].append((nome_cidade1, distancia))
+                if uniao is not None:
+                    uniao.unir(nome_cidade1, nome_cidade2)
+    return grafo
@@ -0,0 +1,291 @@
+import argparse
+import heapq
+import sys
+import time
+
+from Buscauniforme import carregar_dados_cidades, construir_grafo
+from componentes import IndiceComponentes
+from espaco_busca import VistaGeracao, espaco_da_thread
+from grafo_csr import GrafoCSR
+from preparacao_busca import novas_estatisticas, iniciar_busca, AUSENTE_GRAFO
+from snapshot_grafo import carregar_ou_compilar
+
+# --- Instalação Mais Próxima (Dijkstra com Várias Origens) e Um-para-Muitos ---
+#
+# "Qual dos 40 depósitos é o mais próximo de cada um dos 10.000 clientes" não
+# precisa de uma busca por par: um único Dijkstra com todas as instalações na
+# fila com custo 0 fixa cada nó pela instalação mais próxima (é o Dijkstra a
+# partir de um super-nó ligado a todas elas com peso 0). Cada nó guarda, além
+# de custo e pai, a origem da qual foi alcançado.
+#
+# Com uma única origem a mesma busca é a consulta um-para-muitos: para assim
+# que todos os destinos pedidos forem fixados.
+
+
+def dijkstra_multiplas_origens(grafo_csr, ids_origens, ids_alvos=None, espaco=None, estatisticas=None):
+    """
+    Dijkstra sobre o GrafoCSR com todas as `ids_origens` na fila com custo 0.
+    Cada nó é fixado pela origem mais próxima (empates seguem o desempate da
+    fila: custo, população, id).
+
+    Args:
+        ids_alvos (iterável, opcional): Para assim que todos forem fixados
+            (padrão: rotula todos os nós alcançáveis).
+        espaco (EspacoBusca, opcional): Listas reutilizadas entre buscas (padrão:
+            o espaço da thread atual, ver espaco_busca.py).
+        estatisticas (dict, opcional): Recebe insercoes_fila e descartes_fila.
+
+    Returns:
+        tuple: (custos, pais, origens, expansoes) — vistas por id (VistaGeracao),
+        válidas até a próxima busca no mesmo espaço. O pai de cada origem é -1;
+        `origens[v]` é o id da origem mais próxima de v e `expansoes[v]` o número
+        de nós expandidos até v ser fixado.
+    """
+    offsets = grafo_csr.offsets; alvos = grafo_csr.alvos
+    pesos = grafo_csr.pesos; populacao = grafo_csr.populacao
+    if espaco is None:
+        espaco = espaco_da_thread(len(grafo_csr))
+    geracao = espaco.nova_busca()
+    custos = espaco.custos; pais = espaco.pais; marcas = espaco.marcas
+    fixados = espaco.fixados; ordem = espaco.ordem; origens = espaco.origens()
+    fila_prio = []
+    for id_origem in ids_origens:
+        if marcas[id_origem] != geracao:
+            custos[id_origem] = 0; pais[id_origem] = -1; origens[id_origem] = id_origem; marcas[id_origem] = geracao
+            fila_prio.append((0, populacao[id_origem], id_origem))
+    heapq.heapify(fila_prio)
+    pendentes = set(ids_alvos) if ids_alvos is not None else None
+    if pendentes is not None and not pendentes:
+        fila_prio = [] # Nenhum alvo: nada a expandir
+    total_expansoes = 0; alcancados = insercoes = len(fila_prio); descartes = 0
+
+    while fila_prio:
+        custo_atual, _, no_atual = heapq.heappop(fila_prio)
+        if fixados[no_atual] == geracao:
+            descartes += 1
+            continue
+        fixados[no_atual] = geracao
+        total_expansoes += 1
+        ordem[no_atual] = total_expansoes
+        if pendentes is not None:
+            pendentes.discard(no_atual)
+            if not pendentes:
+                break
+        origem_atual = origens[no_atual]
+        inicio, fim = offsets[no_atual], offsets[no_atual + 1]
+        for vizinho, peso in zip(alvos[inicio:fim], pesos[inicio:fim]):
+            if fixados[vizinho] == geracao:
+                continue
+            novo_custo = custo_atual + peso
+            if marcas[vizinho] != geracao:
+                marcas[vizinho] = geracao; alcancados += 1
+            elif novo_custo >= custos[vizinho]:
+                continue
+            custos[vizinho] = novo_custo; pais[vizinho] = no_atual; origens[vizinho] = origem_atual
+            heapq.heappush(fila_prio, (novo_custo, populacao[vizinho], vizinho))
+            insercoes += 1
+    if estatisticas is not None:
+        estatisticas.update({"insercoes_fila": insercoes, "descartes_fila": descartes})
+    return (VistaGeracao(custos, marcas, geracao, alcancados), VistaGeracao(pais, marcas, geracao, alcancados),
+            VistaGeracao(origens, marcas, geracao, alcancados), VistaGeracao(ordem, fixados, geracao, total_expansoes))
+
+
+def _resultado(grafo_csr, id_destino, custos, pais, expansoes, inicio_tempo):
+    # (caminho, custo, estatisticas) da origem que fixou `id_destino` até ele
+    estatisticas = novas_estatisticas()
+    if id_destino not in expansoes:
+        estatisticas.update({"status": "Nenhum caminho encontrado (Espaço de busca esgotado)",
+                             "total_expansoes": len(expansoes), "tempo_execucao": time.time() - inicio_tempo})
+        return None, float('inf'), estatisticas
+    caminho_ids = []
+    atual = id_destino
+    while atual != -1:
+        caminho_ids.append(atual)
+        atual = pais[atual]
+    caminho_ids.reverse()
+    caminho = [grafo_csr.nomes[i] for i in caminho_ids]
+    estatisticas.update({"status": "Caminho ótimo encontrado" if len(caminho_ids) > 1 else "Inicial igual ao Final",
+                         "custo_final": custos[id_destino], "caminho": caminho,
+                         "caminho_detalhado": grafo_csr.formatar_caminho(caminho_ids),
+                         "total_expansoes": expansoes[id_destino], "tempo_execucao": time.time() - inicio_tempo})
+    return caminho, custos[id_destino], estatisticas
+
+
+def _estatisticas_gerais(resultados):
+    estatisticas = novas_estatisticas()
+    encontrados = sum(1 for caminho, _, _ in resultados.values() if caminho is not None)
+    estatisticas.update({"destinos_alcancados": encontrados, "destinos_sem_caminho": len(resultados) - encontrados,
+                         "status": "Caminhos ótimos encontrados" if encontrados == len(resultados) else "Caminhos parciais"})
+    return estatisticas
+
+
+def um_para_muitos(grafo_csr, no_inicial, nos_finais, componentes=None, espaco=None):
+    """
+    Caminhos mínimos de `no_inicial` a cada cidade de `nos_finais` com uma única
+    busca, que para assim que todos os destinos alcançáveis forem fixados.
+
+    Args:
+        grafo_csr (GrafoCSR): Grafo compacto (ver grafo_csr.py).
+        componentes (IndiceComponentes, opcional): Destinos sem caminho retornam
+            sem entrar na busca (sem ele, um destino inalcançável faz a busca
+            esgotar a componente da origem).
+        espaco (EspacoBusca, opcional): Padrão: o espaço da thread atual.
+
+    Returns:
+        tuple: (resultados, estatisticas). `resultados[destino]` é o
+        (caminho, custo, estatisticas) que a UCS retornaria para o par, com
+        total_expansoes = nós expandidos até o destino ser fixado. As
+        estatísticas gerais têm o trabalho da busca inteira, destinos_alcancados
+        e destinos_sem_caminho.
+    """
+    inicio_tempo = time.time()
+    resultados = dict.fromkeys(nos_finais) # Na ordem dos destinos pedidos
+    pendentes = {}
+    for no_final in resultados:
+        estatisticas = novas_estatisticas()
+        resultado = iniciar_busca(no_inicial, no_final, grafo_csr, estatisticas, inicio_tempo, componentes, ausente=AUSENTE_GRAFO)
+        if resultado is not None:
+            resultados[no_final] = resultado
+        else:
+            pendentes[no_final] = grafo_csr.ids[no_final]
+
+    gerais = novas_estatisticas()
+    if pendentes:
+        custos, pais, _, expansoes = dijkstra_multiplas_origens(grafo_csr, [grafo_csr.ids[no_inicial]], pendentes.values(),
+                                                                espaco, gerais)
+        for no_final, id_final in pendentes.items():
+            resultados[no_final] = _resultado(grafo_csr, id_final, custos, pais, expansoes, inicio_tempo)
+        gerais["total_expansoes"] = len(expansoes)
+    estatisticas = _estatisticas_gerais(resultados)
+    estatisticas.update({"total_expansoes": gerais["total_expansoes"], "insercoes_fila": gerais["insercoes_fila"],
+                         "descartes_fila": gerais["descartes_fila"], "tempo_execucao": time.time() - inicio_tempo})
+    return resultados, estatisticas
+
+
+def instalacao_mais_proxima(grafo_csr, instalacoes, clientes=None, componentes=None, espaco=None):
+    """
+    Instalação mais próxima de cada cliente, com uma única busca a partir de
+    todas as instalações (para assim que todos os clientes alcançáveis forem
+    fixados).
+
+    Args:
+        grafo_csr (GrafoCSR): Grafo compacto (ver grafo_csr.py).
+        instalacoes (iterável): Cidades de origem (ex.: depósitos).
+        clientes (iterável, opcional): Cidades a atender (padrão: todas, ou seja,
+            rotula o grafo inteiro).
+        componentes (IndiceComponentes, opcional): Clientes em componentes sem
+            instalação retornam sem entrar na busca.
+        espaco (EspacoBusca, opcional): Padrão: o espaço da thread atual.
+
+    Returns:
+        tuple: (resultados, estatisticas). `resultados[cliente]` é o
+        (caminho, custo, estatisticas) da instalação mais próxima até o
+        cliente; as estatísticas do cliente trazem também `instalacao`. As
+        estatísticas gerais seguem as de `um_para_muitos`.
+
+    Raises:
+        KeyError: Se alguma instalação não estiver no grafo.
+        ValueError: Se não houver nenhuma instalação.
+    """
+    inicio_tempo = time.time()
+    ids = grafo_csr.ids; nomes = grafo_csr.nomes
+    ids_instalacoes = [ids[instalacao] for instalacao in instalacoes]
+    if not ids_instalacoes:
+        raise ValueError("Nenhuma instalação informada.")
+    if clientes is None:
+        clientes = nomes
+    rotulos_instalacoes = None
+    if componentes is not None:
+        rotulos_instalacoes = {componentes.rotulos.get(nomes[i]) for i in ids_instalacoes}
+
+    resultados = dict.fromkeys(clientes) # Na ordem dos clientes pedidos
+    pendentes = {}
+    for cliente in resultados:
+        if cliente not in grafo_csr:
+            status, mensagem = AUSENTE_GRAFO
+            estatisticas = novas_estatisticas()
+            estatisticas.update({"status": status, "instalacao": None, "tempo_execucao": time.time() - inicio_tempo})
+            resultados[cliente] = (None, float('inf'), estatisticas)
+        elif rotulos_instalacoes is not None and componentes.rotulos.get(cliente) not in rotulos_instalacoes:
+            estatisticas = novas_estatisticas()
+            estatisticas.update({"status": "Nenhum caminho encontrado (Componentes diferentes)", "instalacao": None,
+                                 "tempo_execucao": time.time() - inicio_tempo})
+            resultados[cliente] = (None, float('inf'), estatisticas)
+        else:
+            pendentes[cliente] = ids[cliente]
+
+    gerais = novas_estatisticas()
+    if pendentes:
+        # Sem lista de clientes a busca rotula todos os nós alcançáveis
+        alvos = pendentes.values() if clientes is not nomes else None
+        custos, pais, origens, expansoes = dijkstra_multiplas_origens(grafo_csr, ids_instalacoes, alvos, espaco, gerais)
+        for cliente, id_cliente in pendentes.items():
+            resultado = _resultado(grafo_csr, id_cliente, custos, pais, expansoes, inicio_tempo)
+            resultado[2]["instalacao"] = nomes[origens[id_cliente]] if id_cliente in expansoes else None
+            resultados[cliente] = resultado
+        gerais["total_expansoes"] = len(expansoes)
+    estatisticas = _estatisticas_gerais(resultados)
+    estatisticas.update({"total_expansoes": gerais["total_expansoes"], "insercoes_fila": gerais["insercoes_fila"],
+                         "descartes_fila": gerais["descartes_fila"], "tempo_execucao": time.time() - inicio_tempo})
+    return resultados, estatisticas
+
+
+# --- Bloco Principal de Execução ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Instalação mais próxima de cada cidade (Dijkstra com várias origens) "
+                                                 "ou caminhos de uma origem a vários destinos.")
+    parser.add_argument("--instalacoes", nargs="+", default=["New York", "Chicago", "Los Angeles", "Houston", "Seattle"],
+                        help="Cidades de origem (depósitos)")
+    parser.add_argument("--clientes", nargs="+", default=None, help="Cidades a atender (padrão: todas)")
+    parser.add_argument("--origem", default=None, help="Consulta um-para-muitos: origem (os destinos vêm de --clientes)")
+    parser.add_argument("--cidades", default="cities.json", help="Arquivo JSON das cidades")
+    parser.add_argument("--raio", type=float, default=3.5, help="Raio de conexão r")
+    parser.add_argument("--snapshot", action="store_true", help="Usa (e compila se preciso) o snapshot binário do grafo")
+    args = parser.parse_args()
+
+    if args.snapshot:
+        grafo_csr, _ = carregar_ou_compilar(args.cidades, args.raio)
+    else:
+        dados_cidades = carregar_dados_cidades(args.cidades)
+        if not dados_cidades:
+            print("Não foi possível carregar os dados das cidades. Abortando.", file=sys.stderr)
+            sys.exit(1)
+        grafo_csr = GrafoCSR.a_partir_do_grafo(construir_grafo(dados_cidades, args.raio), dados_cidades)
+    componentes = IndiceComponentes.a_partir_do_csr(grafo_csr)
+
+    if args.origem is not None:
+        destinos = args.clientes or grafo_csr.nomes
+        resultados, estatisticas = um_para_muitos(grafo_csr, args.origem, destinos, componentes)
+        print(f"\n--- Caminhos a partir de {args.origem} ({len(resultados)} destinos) ---")
+        for destino, (caminho, custo, est) in resultados.items():
+            if args.clientes:
+                print(f"\n{destino}: {est['status']}")
+                if caminho is not None:
+                    print(f"  Distância Total: {custo:.2f} | Expansões até o destino: {est['total_expansoes']}")
+                    print(f"  {est['caminho_detalhado']}")
+    else:
+        instalacoes = [nome for nome in args.instalacoes if nome in grafo_csr]
+        ausentes = sorted(set(args.instalacoes) - set(instalacoes))
+        if ausentes:
+            print(f"Instalações fora do grafo (ignoradas): {', '.join(ausentes)}")
+        if not instalacoes:
+            print("Nenhuma instalação válida. Abortando.", file=sys.stderr)
+            sys.exit(1)
+        resultados, estatisticas = instalacao_mais_proxima(grafo_csr, instalacoes, args.clientes, componentes)
+        print(f"\n--- Instalação Mais Próxima ({len(instalacoes)} instalações, {len(resultados)} clientes) ---")
+        atendidos = {}
+        for cliente, (caminho, custo, est) in resultados.items():
+            if caminho is not None:
+                atendidos.setdefault(est["instalacao"], []).append(custo)
+            if args.clientes:
+                print(f"\n{cliente}: {est['status']}")
+                if caminho is not None:
+                    print(f"  {est['instalacao']} a {custo:.2f} | {est['caminho_detalhado']}")
+        for instalacao in instalacoes:
+            custos = atendidos.get(instalacao, [])
+            maior = f", mais distante a {max(custos):.2f}" if custos else ""
+            print(f"  {instalacao}: {len(custos)} clientes{maior}")
+    print(f"\nStatus: {estatisticas['status']} ({estatisticas['destinos_alcancados']} alcançados, "
+          f"{estatisticas['destinos_sem_caminho']} sem caminho)")
+    print(f"Total de Expansões de Nós: {estatisticas['total_expansoes']}")
+    print(f"Tempo de Execução: {estatisticas['tempo_execucao']:.4f} segundos")
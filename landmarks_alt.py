@@ -0,0 +1,238 @@
+import hashlib
+import heapq
+import os
+import struct
+import time
+from array import array
+
+from Buscauniforme import (carregar_dados_cidades, construir_grafo, calcular_distancia_euclidiana,
+                           busca_custo_uniforme_pais, busca_a_estrela)
+from Buscabidirecional import busca_bidirecional_final_verbose, busca_bidirecional_a_estrela
+
+# --- ALT: A*, Landmarks e Desigualdade Triangular ---
+#
+# Para cada landmark L guardamos d(L, v) para todas as cidades. Pela desigualdade
+# triangular, |d(L, u) - d(L, v)| <= d(u, v), então o máximo sobre os landmarks
+# é um limite inferior consistente para a distância no grafo. Ao contrário da
+# distância em linha reta, ele "enxerga" os desvios que o grafo de raio obriga.
+
+NUM_LANDMARKS_PADRAO = 8
+MAGIC_ALT = b"ALTLAND1"
+FORMATO_CABECALHO_ALT = "<8sIIQ32s"
+
+
+def dijkstra_um_para_todos(grafo, origem):
+    """Distâncias mínimas de `origem` para todas as cidades alcançáveis (dict cidade -> custo)."""
+    custos = {origem: 0}
+    fixados = set()
+    fila_prio = [(0, origem)]
+    while fila_prio:
+        custo_atual, no_atual = heapq.heappop(fila_prio)
+        if no_atual in fixados:
+            continue
+        fixados.add(no_atual)
+        for vizinho, distancia in grafo.get(no_atual, []):
+            novo_custo = custo_atual + distancia
+            if novo_custo < custos.get(vizinho, float('inf')):
+                custos[vizinho] = novo_custo
+                heapq.heappush(fila_prio, (novo_custo, vizinho))
+    return custos
+
+
+def assinatura_grafo(grafo):
+    """SHA-256 das cidades (em ordem) e das arestas; identifica o grafo das tabelas salvas."""
+    h = hashlib.sha256()
+    for cidade, adj in grafo.items():
+        h.update(cidade.encode('utf-8') + b"\0")
+        for vizinho, distancia in adj:
+            h.update(vizinho.encode('utf-8') + b"\0" + struct.pack("<d", distancia))
+        h.update(b"\1")
+    return h.digest()
+
+
+class LandmarksALT:
+    """
+    Tabelas de distâncias de K landmarks, escolhidos por ponto mais distante
+    no grafo (cada novo landmark é a cidade mais longe dos já escolhidos),
+    repartidos entre as componentes conexas conforme o tamanho.
+
+    As distâncias ficam em um único array('d') de K x n posições (a tabela
+    do landmark j em distancias[j*n:(j+1)*n]).
+    """
+
+    def __init__(self, grafo, landmarks, distancias, num_pedidos=None):
+        self.grafo = grafo
+        self.num_pedidos = len(landmarks) if num_pedidos is None else num_pedidos
+        self.nomes = list(grafo.keys())
+        self.ids = {nome: i for i, nome in enumerate(self.nomes)}
+        self.landmarks = landmarks
+        self.distancias = distancias
+        self._montar_tabelas()
+
+    @classmethod
+    def construir(cls, grafo, num_landmarks=NUM_LANDMARKS_PADRAO):
+        nomes = list(grafo.keys())
+        landmarks = []
+        distancias = array('d')
+
+        # O grafo de raio costuma ter várias componentes: os landmarks são repartidos
+        # entre as componentes com mais de uma cidade, proporcionalmente ao tamanho
+        componentes = [c for c in cls._componentes(grafo) if len(c) > 1]
+        cotas = [0] * len(componentes)
+        for _ in range(min(num_landmarks, sum(len(c) for c in componentes))):
+            escolhida = max(range(len(componentes)), key=lambda i: len(componentes[i]) / (cotas[i] + 1))
+            cotas[escolhida] += 1
+
+        for componente, cota in zip(componentes, cotas):
+            if cota == 0:
+                continue
+            # Ponto mais distante: começa pela cidade mais longe da de maior grau
+            inicial = max(componente, key=lambda nome: len(grafo[nome]))
+            custos = dijkstra_um_para_todos(grafo, inicial)
+            proximo = max(custos, key=custos.get)
+            menor_distancia = {}
+            for _ in range(cota):
+                landmarks.append(proximo)
+                custos = dijkstra_um_para_todos(grafo, proximo)
+                distancias.extend(custos.get(nome, float('inf')) for nome in nomes)
+                for nome, custo in custos.items():
+                    if custo < menor_distancia.get(nome, float('inf')):
+                        menor_distancia[nome] = custo
+                proximo = max(menor_distancia, key=menor_distancia.get)
+        return cls(grafo, landmarks, distancias, num_landmarks)
+
+    @staticmethod
+    def _componentes(grafo):
+        # Componentes conexas (listas de cidades), da maior para a menor
+        vistos = set()
+        componentes = []
+        for cidade in grafo:
+            if cidade in vistos:
+                continue
+            vistos.add(cidade)
+            componente = [cidade]
+            pilha = [cidade]
+            while pilha:
+                for vizinho, _ in grafo[pilha.pop()]:
+                    if vizinho not in vistos:
+                        vistos.add(vizinho)
+                        componente.append(vizinho)
+                        pilha.append(vizinho)
+            componentes.append(componente)
+        componentes.sort(key=len, reverse=True)
+        return componentes
+
+    def _montar_tabelas(self):
+        # Uma visão (memoryview, sem cópia) de `distancias` por landmark. `grupo[i]`
+        # identifica o conjunto de landmarks que alcançam a cidade i (os da sua
+        # componente; None = nenhum) e `tabelas_grupo[g]` guarda as tabelas desse conjunto
+        n = len(self.nomes)
+        visao = memoryview(self.distancias)
+        tabelas = [visao[j * n:(j + 1) * n] for j in range(len(self.landmarks))]
+        infinito = float('inf')
+        grupos = {}
+        self.grupo = []
+        for i in range(n):
+            alcancaveis = tuple(j for j, tabela in enumerate(tabelas) if tabela[i] != infinito)
+            self.grupo.append(grupos.setdefault(alcancaveis, len(grupos)) if alcancaveis else None)
+        self.tabelas_grupo = [None] * len(grupos)
+        for alcancaveis, g in grupos.items():
+            self.tabelas_grupo[g] = [tabelas[j] for j in alcancaveis]
+
+    def limite_inferior(self, no, alvo):
+        """max_L |d(L, no) - d(L, alvo)| (0 se as cidades não tiverem landmarks em comum)."""
+        i = self.ids[no]; j = self.ids[alvo]
+        g = self.grupo[i]
+        if g is None or g != self.grupo[j]:
+            return 0.0
+        return max(abs(tabela[i] - tabela[j]) for tabela in self.tabelas_grupo[g])
+
+    def criar_heuristica(self, dados_cidades=None):
+        """
+        Heurística h(no, alvo) para busca_a_estrela / busca_bidirecional_a_estrela.
+        Com `dados_cidades`, usa também a distância em linha reta (o máximo de
+        duas heurísticas consistentes continua consistente).
+        """
+        ids = self.ids
+        grupo = self.grupo
+        tabelas_grupo = self.tabelas_grupo
+        def heuristica(no, alvo):
+            i = ids[no]; j = ids[alvo]
+            g = grupo[i]
+            if g is not None and g == grupo[j]:
+                limite = max(abs(tabela[i] - tabela[j]) for tabela in tabelas_grupo[g])
+            else:
+                limite = 0.0
+            if dados_cidades is not None:
+                limite = max(limite, calcular_distancia_euclidiana(dados_cidades[no]['coords'], dados_cidades[alvo]['coords']))
+            return limite
+        return heuristica
+
+    # --- Persistência ---
+
+    def salvar(self, caminho_arquivo):
+        """Salva as tabelas (binário compacto), associadas à assinatura do grafo."""
+        cabecalho = struct.pack(FORMATO_CABECALHO_ALT, MAGIC_ALT, len(self.landmarks), self.num_pedidos,
+                                len(self.nomes), assinatura_grafo(self.grafo))
+        indices = array('i', (self.ids[nome] for nome in self.landmarks))
+        temporario = caminho_arquivo + ".tmp"
+        with open(temporario, 'wb') as f:
+            f.write(cabecalho)
+            f.write(indices.tobytes())
+            f.write(array('d', self.distancias).tobytes())
+        os.replace(temporario, caminho_arquivo)
+
+    @classmethod
+    def carregar(cls, grafo, caminho_arquivo):
+        """Carrega tabelas salvas; retorna None se o arquivo não existir ou for de outro grafo."""
+        try:
+            with open(caminho_arquivo, 'rb') as f:
+                cabecalho = f.read(struct.calcsize(FORMATO_CABECALHO_ALT))
+                magic, k, num_pedidos, n, assinatura = struct.unpack(FORMATO_CABECALHO_ALT, cabecalho)
+                if magic != MAGIC_ALT or n != len(grafo) or assinatura != assinatura_grafo(grafo):
+                    return None
+                indices = array('i'); indices.fromfile(f, k)
+                distancias = array('d'); distancias.fromfile(f, k * n)
+        except (OSError, struct.error, EOFError):
+            return None
+        nomes = list(grafo.keys())
+        return cls(grafo, [nomes[i] for i in indices], distancias, num_pedidos)
+
+    @classmethod
+    def carregar_ou_construir(cls, grafo, caminho_arquivo, num_landmarks=NUM_LANDMARKS_PADRAO):
+        """Reaproveita as tabelas salvas quando forem do mesmo grafo; senão constrói e salva."""
+        alt = cls.carregar(grafo, caminho_arquivo)
+        if alt is None or alt.num_pedidos != num_landmarks:
+            alt = cls.construir(grafo, num_landmarks)
+            alt.salvar(caminho_arquivo)
+        return alt
+
+
+# --- Bloco Principal de Execução ---
+if __name__ == "__main__":
+    ARQUIVO_JSON = 'cities.json'
+    RAIO_DISTANCIA = 3.5
+    ARQUIVO_LANDMARKS = f"landmarks_r{RAIO_DISTANCIA:g}.alt"
+    cenarios = [("New York", "Jacksonville"), ("Miami", "Seattle"), ("Los Angeles", "Detroit")]
+
+    dados_cidades = carregar_dados_cidades(ARQUIVO_JSON)
+    if dados_cidades:
+        grafo = construir_grafo(dados_cidades, RAIO_DISTANCIA)
+        inicio_tempo = time.perf_counter()
+        alt = LandmarksALT.carregar_ou_construir(grafo, ARQUIVO_LANDMARKS)
+        print(f"Landmarks ({len(alt.landmarks)}): {', '.join(alt.landmarks)}")
+        print(f"Tabelas prontas em {time.perf_counter() - inicio_tempo:.4f} segundos ('{ARQUIVO_LANDMARKS}')")
+        heuristica = alt.criar_heuristica(dados_cidades)
+
+        for inicio, fim in cenarios:
+            _, custo, est_ucs = busca_custo_uniforme_pais(grafo, dados_cidades, inicio, fim)
+            _, _, est_a = busca_a_estrela(grafo, dados_cidades, inicio, fim)
+            _, _, est_alt = busca_a_estrela(grafo, dados_cidades, inicio, fim, heuristica=heuristica)
+            _, _, est_bi = busca_bidirecional_final_verbose(grafo, dados_cidades, inicio, fim)
+            _, _, est_bi_alt = busca_bidirecional_a_estrela(grafo, dados_cidades, inicio, fim, heuristica=heuristica)
+            custo_str = f"{custo:.2f}" if custo != float('inf') else "sem caminho"
+            print(f"\n{inicio} -> {fim}: {custo_str}")
+            print(f"  Expansões UCS: {est_ucs['total_expansoes']} | A* (linha reta): {est_a['total_expansoes']} | A* (ALT): {est_alt['total_expansoes']}")
+            print(f"  Expansões Bidirecional: {est_bi['total_expansoes']} | Bidirecional A* (ALT): {est_bi_alt['total_expansoes']}")
+    else:
+        print("Não foi possível carregar os dados das cidades. Abortando.")
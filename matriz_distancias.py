@@ -0,0 +1,273 @@
+import argparse
+import hashlib
+import heapq
+import mmap
+import os
+import random
+import struct
+import sys
+import time
+from array import array
+
+from Buscauniforme import carregar_dados_cidades, construir_grafo
+from execucao_paralela import criar_executor, obter_compartilhado
+from grafo_csr import GrafoCSR
+from preparacao_busca import novas_estatisticas, iniciar_busca, AUSENTE_GRAFO
+from snapshot_grafo import carregar_ou_compilar, ORDEM_BYTES
+
+# --- Matriz de Distâncias e Próximos Passos (Todos os Pares, mmap) ---
+#
+# Para ~1000 cidades, guardar a resposta de todos os pares sai mais barato que
+# buscar: 1000 x 1000 x (4 + 4) bytes = 8 MB. Um Dijkstra um-para-todos a partir
+# de cada cidade (em paralelo) preenche a linha dela:
+#   distancias[j][i] : float32, distância de i até j (inf sem caminho)
+#   proximos[j][i]   : int32, próximo nó de i no caminho mínimo até j (-1 em j
+#                      ou sem caminho) — o pai de i na árvore de Dijkstra de j,
+#                      já que o grafo é não direcionado.
+# Uma consulta i -> j lê a linha j: a distância é uma leitura e o caminho é a
+# caminhada pelos próximos passos, toda dentro da mesma linha.
+#
+# Layout do arquivo: cabeçalho (FORMATO_CABECALHO_MATRIZ, com a assinatura do
+# GrafoCSR), preenchimento até 8 bytes, distancias float32[n*n], proximos int32[n*n].
+
+MAGIC_MATRIZ = b"MATRIZDP"
+VERSAO_MATRIZ = 1
+FORMATO_CABECALHO_MATRIZ = "<8sIIQ32s" # magic, versão, ordem de bytes, n, assinatura do grafo
+TAMANHO_CABECALHO_MATRIZ = struct.calcsize(FORMATO_CABECALHO_MATRIZ)
+INICIO_DADOS = TAMANHO_CABECALHO_MATRIZ + (-TAMANHO_CABECALHO_MATRIZ % 8)
+LIMITE_PADRAO_BYTES = 512 * 2**20
+
+
+def assinatura_csr(grafo_csr):
+    """SHA-256 dos nomes e das arestas do GrafoCSR; identifica o grafo da matriz salva."""
+    h = hashlib.sha256()
+    for nome in grafo_csr.nomes:
+        h.update(nome.encode('utf-8') + b"\0")
+    h.update(array('q', grafo_csr.offsets).tobytes())
+    h.update(array('i', grafo_csr.alvos).tobytes())
+    h.update(array('d', grafo_csr.pesos).tobytes())
+    return h.digest()
+
+
+def tamanho_arquivo(n):
+    """Bytes do arquivo da matriz para n cidades."""
+    return INICIO_DADOS + 8 * n * n
+
+
+def _linha(grafo_csr, id_destino):
+    # Dijkstra a partir de id_destino: distância de cada nó até ele e o pai (próximo passo)
+    offsets = grafo_csr.offsets; alvos = grafo_csr.alvos
+    pesos = grafo_csr.pesos; populacao = grafo_csr.populacao
+    n = len(grafo_csr)
+    distancias = array('f', [float('inf')]) * n
+    proximos = array('i', [-1]) * n
+    custos = [float('inf')] * n
+    fixados = bytearray(n)
+    custos[id_destino] = 0
+    fila_prio = [(0, populacao[id_destino], id_destino)]
+    while fila_prio:
+        custo_atual, _, no_atual = heapq.heappop(fila_prio)
+        if fixados[no_atual]:
+            continue
+        fixados[no_atual] = 1
+        distancias[no_atual] = custo_atual
+        inicio, fim = offsets[no_atual], offsets[no_atual + 1]
+        for vizinho, peso in zip(alvos[inicio:fim], pesos[inicio:fim]):
+            novo_custo = custo_atual + peso
+            if novo_custo < custos[vizinho]:
+                custos[vizinho] = novo_custo
+                proximos[vizinho] = no_atual
+                heapq.heappush(fila_prio, (novo_custo, populacao[vizinho], vizinho))
+    return distancias, proximos
+
+
+def _calcular_bloco(ids_destinos, grafo_csr=None):
+    # Nos workers o grafo vem do estado herdado do processo pai (execucao_paralela)
+    if grafo_csr is None:
+        grafo_csr = obter_compartilhado("grafo_csr")
+    return [(j, *(linha.tobytes() for linha in _linha(grafo_csr, j))) for j in ids_destinos]
+
+
+def construir_matriz(grafo_csr, caminho_arquivo, processos=None, limite_bytes=LIMITE_PADRAO_BYTES):
+    """
+    Calcula todas as linhas (um Dijkstra por cidade, em `processos` processos) e
+    grava o arquivo da matriz (via arquivo temporário + rename).
+
+    Raises:
+        ValueError: Se o arquivo passar de `limite_bytes`.
+    """
+    n = len(grafo_csr)
+    tamanho = tamanho_arquivo(n)
+    if tamanho > limite_bytes:
+        raise ValueError(f"Matriz de {n} x {n} ocuparia {tamanho / 2**20:.1f} MB, acima do limite de "
+                         f"{limite_bytes / 2**20:.1f} MB: use as buscas (ou aumente o limite)")
+    processos = processos or os.cpu_count() or 1
+    tamanho_bloco = max(1, n // (4 * processos))
+    blocos = [range(i, min(n, i + tamanho_bloco)) for i in range(0, n, tamanho_bloco)]
+
+    temporario = caminho_arquivo + ".tmp"
+    with open(temporario, 'w+b') as f:
+        f.write(struct.pack(FORMATO_CABECALHO_MATRIZ, MAGIC_MATRIZ, VERSAO_MATRIZ, ORDEM_BYTES, n, assinatura_csr(grafo_csr)))
+        f.truncate(tamanho)
+        with mmap.mmap(f.fileno(), tamanho) as mapa:
+            inicio_proximos = INICIO_DADOS + 4 * n * n
+            executor = criar_executor(processos, grafo_csr=grafo_csr) if processos > 1 else None
+            try:
+                resolvidos = (_calcular_bloco(bloco, grafo_csr) for bloco in blocos) if executor is None \
+                    else executor.map(_calcular_bloco, blocos)
+                for linhas in resolvidos:
+                    for j, distancias, proximos in linhas:
+                        mapa[INICIO_DADOS + 4 * n * j:INICIO_DADOS + 4 * n * (j + 1)] = distancias
+                        mapa[inicio_proximos + 4 * n * j:inicio_proximos + 4 * n * (j + 1)] = proximos
+            finally:
+                if executor is not None:
+                    executor.shutdown()
+            mapa.flush()
+    os.replace(temporario, caminho_arquivo)
+
+
+class MatrizDistancias:
+    """
+    Matriz de todos os pares mapeada em memória, associada a um GrafoCSR.
+    `consultar` devolve (caminho, custo, estatisticas) no formato das buscas.
+    """
+
+    def __init__(self, grafo_csr, mapa):
+        n = len(grafo_csr)
+        self.grafo_csr = grafo_csr
+        self.n = n
+        self.mapa = mapa # Mantém o mmap vivo enquanto a matriz existir
+        visao = memoryview(mapa)
+        self.distancias = visao[INICIO_DADOS:INICIO_DADOS + 4 * n * n].cast('f')
+        self.proximos = visao[INICIO_DADOS + 4 * n * n:INICIO_DADOS + 8 * n * n].cast('i')
+
+    @classmethod
+    def abrir(cls, grafo_csr, caminho_arquivo):
+        """Mapeia uma matriz salva; retorna None se o arquivo não existir ou for de outro grafo."""
+        try:
+            with open(caminho_arquivo, 'rb') as f:
+                magic, versao, ordem, n, assinatura = struct.unpack(FORMATO_CABECALHO_MATRIZ, f.read(TAMANHO_CABECALHO_MATRIZ))
+                if (magic != MAGIC_MATRIZ or versao != VERSAO_MATRIZ or ordem != ORDEM_BYTES or n != len(grafo_csr)
+                        or os.fstat(f.fileno()).st_size != tamanho_arquivo(n) or assinatura != assinatura_csr(grafo_csr)):
+                    return None
+                mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, struct.error):
+            return None
+        return cls(grafo_csr, mapa)
+
+    @classmethod
+    def abrir_ou_construir(cls, grafo_csr, caminho_arquivo, processos=None, limite_bytes=LIMITE_PADRAO_BYTES):
+        """
+        Reaproveita a matriz salva quando for do mesmo grafo; senão constrói e salva.
+
+        Returns:
+            tuple: (matriz, construida)
+        """
+        matriz = cls.abrir(grafo_csr, caminho_arquivo)
+        if matriz is not None:
+            return matriz, False
+        construir_matriz(grafo_csr, caminho_arquivo, processos, limite_bytes)
+        return cls.abrir(grafo_csr, caminho_arquivo), True
+
+    def distancia(self, no_inicial, no_final):
+        """Distância mínima (float32) em O(1); inf se não houver caminho."""
+        ids = self.grafo_csr.ids
+        return self.distancias[ids[no_final] * self.n + ids[no_inicial]]
+
+    def caminho_ids(self, id_inicial, id_final):
+        """Caminho mínimo pelos próximos passos (None se não houver caminho)."""
+        if id_inicial == id_final:
+            return [id_inicial]
+        base = id_final * self.n
+        proximos = self.proximos
+        atual = proximos[base + id_inicial]
+        if atual == -1:
+            return None
+        caminho = [id_inicial]
+        while atual != -1:
+            caminho.append(atual)
+            atual = proximos[base + atual]
+        return caminho
+
+    def consultar(self, no_inicial, no_final, componentes=None):
+        """
+        Consulta no formato das buscas: o custo é somado em float64 pelas arestas
+        do caminho (o float32 da matriz só serve de distância aproximada), e
+        total_expansoes é 0 (nenhum nó expandido).
+        """
+        inicio_tempo = time.time()
+        estatisticas = novas_estatisticas()
+        resultado = iniciar_busca(no_inicial, no_final, self.grafo_csr, estatisticas, inicio_tempo, componentes, ausente=AUSENTE_GRAFO)
+        if resultado is not None:
+            return resultado
+        grafo_csr = self.grafo_csr
+        caminho_ids = self.caminho_ids(grafo_csr.ids[no_inicial], grafo_csr.ids[no_final])
+        if caminho_ids is None:
+            estatisticas.update({"status": "Nenhum caminho encontrado (Espaço de busca esgotado)", "tempo_execucao": time.time() - inicio_tempo})
+            return None, float('inf'), estatisticas
+        custo = 0
+        for atual, proximo in zip(caminho_ids, caminho_ids[1:]):
+            custo += grafo_csr.peso(atual, proximo)
+        caminho = [grafo_csr.nomes[i] for i in caminho_ids]
+        estatisticas.update({"custo_final": custo, "caminho": caminho, "status": "Caminho ótimo encontrado",
+                             "caminho_detalhado": grafo_csr.formatar_caminho(caminho_ids),
+                             "tempo_execucao": time.time() - inicio_tempo})
+        return caminho, custo, estatisticas
+
+
+# --- Bloco Principal de Execução ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Matriz de distâncias e próximos passos de todos os pares (mmap).")
+    parser.add_argument("--cidades", default="cities.json", help="Arquivo JSON das cidades")
+    parser.add_argument("--raio", type=float, default=3.5, help="Raio de conexão r")
+    parser.add_argument("--snapshot", action="store_true", help="Usa (e compila se preciso) o snapshot binário do grafo")
+    parser.add_argument("--arquivo", default=None, help="Arquivo da matriz (padrão: <cidades>.r<raio>.matriz)")
+    parser.add_argument("--processos", type=int, default=None, help="Processos da construção (padrão: número de CPUs)")
+    parser.add_argument("--limite-mb", type=float, default=LIMITE_PADRAO_BYTES / 2**20, help="Tamanho máximo da matriz (MB)")
+    parser.add_argument("--reconstruir", action="store_true", help="Reconstrói mesmo que a matriz salva seja válida")
+    parser.add_argument("--consulta", nargs=2, metavar=("ORIGEM", "DESTINO"), default=("Miami", "Seattle"))
+    args = parser.parse_args()
+    arquivo = args.arquivo or f"{args.cidades}.r{args.raio:g}.matriz"
+
+    if args.snapshot:
+        grafo_csr, _ = carregar_ou_compilar(args.cidades, args.raio)
+    else:
+        dados_cidades = carregar_dados_cidades(args.cidades)
+        if not dados_cidades:
+            print("Não foi possível carregar os dados das cidades. Abortando.", file=sys.stderr)
+            sys.exit(1)
+        grafo_csr = GrafoCSR.a_partir_do_grafo(construir_grafo(dados_cidades, args.raio), dados_cidades)
+
+    inicio_tempo = time.perf_counter()
+    try:
+        if args.reconstruir:
+            construir_matriz(grafo_csr, arquivo, args.processos, int(args.limite_mb * 2**20))
+            matriz, construida = MatrizDistancias.abrir(grafo_csr, arquivo), True
+        else:
+            matriz, construida = MatrizDistancias.abrir_ou_construir(grafo_csr, arquivo, args.processos, int(args.limite_mb * 2**20))
+    except ValueError as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        sys.exit(1)
+    duracao = time.perf_counter() - inicio_tempo
+    print(f"Matriz '{arquivo}' {'construída' if construida else 'reutilizada'} em {duracao:.4f} segundos "
+          f"({len(grafo_csr)} cidades, {os.path.getsize(arquivo) / 2**20:.2f} MB)")
+
+    # Latência das consultas: distância (uma leitura) e caminho completo (caminhada + formatação)
+    aleatorio = random.Random(1)
+    pares = [(aleatorio.choice(grafo_csr.nomes), aleatorio.choice(grafo_csr.nomes)) for _ in range(10000)]
+    inicio_tempo = time.perf_counter()
+    for a, b in pares:
+        matriz.distancia(a, b)
+    latencia_distancia = (time.perf_counter() - inicio_tempo) / len(pares)
+    inicio_tempo = time.perf_counter()
+    for a, b in pares:
+        matriz.consultar(a, b)
+    latencia_caminho = (time.perf_counter() - inicio_tempo) / len(pares)
+    print(f"Latência média: distância {latencia_distancia * 1e6:.2f} µs | caminho detalhado {latencia_caminho * 1e6:.2f} µs")
+
+    origem, destino = args.consulta
+    caminho, custo, estatisticas = matriz.consultar(origem, destino)
+    print(f"\n{origem} -> {destino}: {estatisticas['status']}")
+    if caminho:
+        print(f"Distância Total: {custo:.2f}")
+        print(f"Caminho: {estatisticas['caminho_detalhado']}")
@@ -0,0 +1,74 @@
+import math
+import time
+
+from ganchos_busca import SILENCIOSO
+
+# --- Preparação Comum das Buscas ---
+#
+# Todas as buscas começam do mesmo jeito: dicionário de estatísticas, caso
+# inicial == final, cidades ausentes e teste de componentes conexas.
+# `iniciar_busca` trata esses casos e devolve o retorno pronto; a busca só
+# segue para o laço principal quando ele devolve None.
+
+# (status, trecho da mensagem) para cidade ausente: as buscas por dados das
+# cidades (UCS, A*) e as buscas sobre a conectividade do grafo (bidirecionais)
+AUSENTE_DADOS = ("Nó Inicial ou Final não existe", "não encontrado nos dados das cidades")
+AUSENTE_GRAFO = ("Nó Inicial ou Final fora do grafo", "não está na conectividade do grafo")
+
+
+def criar_heuristica_euclidiana(dados_cidades):
+    # As arestas pesam exatamente a distância euclidiana entre as cidades, então a
+    # distância em linha reta até o alvo é admissível e consistente
+    def heuristica(no, alvo):
+        return math.dist(dados_cidades[no]['coords'], dados_cidades[alvo]['coords'])
+    return heuristica
+
+
+def novas_estatisticas(bidirecional=False):
+    """Dicionário de estatísticas inicial (com os contadores por sentido nas buscas bidirecionais)."""
+    estatisticas = {"total_expansoes": 0}
+    if bidirecional:
+        estatisticas.update({"expansoes_avanco": 0, "expansoes_retrocesso": 0, "no_encontro": None})
+    estatisticas.update({
+        "custo_final": float('inf'),
+        "caminho": None,
+        "caminho_detalhado": "", # String do caminho com distâncias
+        "tempo_execucao": 0,
+        "status": "Não Iniciado",
+        "insercoes_fila": 0, "descartes_fila": 0 # Inserções na fila e retiradas obsoletas (já expandidas)
+    })
+    return estatisticas
+
+
+def iniciar_busca(no_inicial, no_final, nos, estatisticas, inicio_tempo, componentes=None,
+                  verbosidade=SILENCIOSO, ao_finalizar=None, ausente=AUSENTE_DADOS):
+    """
+    Trata os casos que dispensam o laço principal da busca.
+
+    Args:
+        nos: Contêiner das cidades válidas (dados_cidades, grafo ou GrafoCSR).
+        estatisticas (dict): De `novas_estatisticas`; atualizado no lugar.
+        inicio_tempo (float): time.time() do início da busca.
+        componentes (IndiceComponentes, opcional): Cidades em componentes
+            diferentes retornam sem buscar (não há caminho).
+        ao_finalizar (callable, opcional): Gancho on_finish resolvido.
+        ausente (tuple): AUSENTE_DADOS ou AUSENTE_GRAFO.
+
+    Returns:
+        tuple ou None: (caminho, custo, estatisticas) a retornar, ou None se a
+        busca deve prosseguir.
+    """
+    if no_inicial == no_final:
+        if verbosidade: print("Nó inicial é o mesmo que o nó final.")
+        estatisticas.update({"status": "Inicial igual ao Final", "caminho": [no_inicial], "custo_final": 0, "tempo_execucao": time.time() - inicio_tempo, "caminho_detalhado": no_inicial})
+        return [no_inicial], 0, estatisticas
+    if no_inicial not in nos or no_final not in nos:
+        status, mensagem = ausente
+        if verbosidade: print(f"Erro: Nó inicial '{no_inicial}' ou Nó final '{no_final}' {mensagem}.")
+        estatisticas.update({"status": status, "tempo_execucao": time.time() - inicio_tempo})
+        return None, float('inf'), estatisticas
+    if componentes is not None and not componentes.conectados(no_inicial, no_final):
+        estatisticas.update({"status": "Nenhum caminho encontrado (Componentes diferentes)", "tempo_execucao": time.time() - inicio_tempo})
+        if ao_finalizar is not None: ao_finalizar(estatisticas, no_inicial, no_final)
+        return None, float('inf'), estatisticas
+    return None
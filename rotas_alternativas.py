@@ -0,0 +1,243 @@
+import argparse
+import heapq
+import sys
+import time
+
+from Buscauniforme import carregar_dados_cidades, construir_grafo
+from componentes import IndiceComponentes
+from espaco_busca import espaco_da_thread
+from grafo_csr import GrafoCSR
+from preparacao_busca import novas_estatisticas, iniciar_busca, AUSENTE_GRAFO
+from snapshot_grafo import carregar_ou_compilar
+
+# --- Rotas Alternativas (k Caminhos Mínimos sem Ciclos, Yen) ---
+#
+# Yen: a rota k+1 é a melhor entre as candidatas geradas a partir das rotas já
+# aceitas. Para cada nó de desvio i da última rota, a raiz (nós 0..i) é mantida,
+# os nós da raiz saem do grafo e as arestas i -> i+1 das rotas aceitas com a
+# mesma raiz são bloqueadas; uma busca do nó de desvio até o destino completa a
+# candidata.
+#
+# Reaproveitamento entre iterações:
+#   - Uma única árvore de caminhos mínimos ao destino (Dijkstra reverso; o grafo
+#     é não direcionado) dá a primeira rota e, em todos os desvios, a distância
+#     exata de cada nó ao destino no grafo original. Remover nós e arestas só
+#     aumenta distâncias, então ela é a heurística (consistente) do A* de desvio.
+#   - Quando o nó retirado da fila tem o seu caminho da árvore livre (sem nós da
+#     raiz nem o nó de desvio), custo + distância da árvore é o ótimo do desvio:
+#     a busca para ali e completa a rota pela árvore, em vez de seguir até o
+#     destino.
+#   - Desvios só a partir do ponto em que cada rota se separou da rota que a
+#     gerou (melhoria de Lawler): os anteriores já foram buscados.
+#   - As buscas de desvio usam o espaço de busca da thread (espaco_busca.py).
+
+
+def _arvore_ao_destino(grafo_csr, id_final):
+    # Dijkstra a partir do destino: distância de cada nó ao destino e o próximo passo até ele
+    offsets = grafo_csr.offsets; alvos = grafo_csr.alvos
+    pesos = grafo_csr.pesos; populacao = grafo_csr.populacao
+    n = len(grafo_csr)
+    distancias = [float('inf')] * n
+    proximo = [-1] * n
+    fixados = bytearray(n)
+    distancias[id_final] = 0
+    fila_prio = [(0, populacao[id_final], id_final)]
+    expansoes = 0
+    while fila_prio:
+        custo_atual, _, no_atual = heapq.heappop(fila_prio)
+        if fixados[no_atual]:
+            continue
+        fixados[no_atual] = 1
+        expansoes += 1
+        inicio, fim = offsets[no_atual], offsets[no_atual + 1]
+        for vizinho, peso in zip(alvos[inicio:fim], pesos[inicio:fim]):
+            novo_custo = custo_atual + peso
+            if novo_custo < distancias[vizinho]:
+                distancias[vizinho] = novo_custo
+                proximo[vizinho] = no_atual
+                heapq.heappush(fila_prio, (novo_custo, populacao[vizinho], vizinho))
+    return distancias, proximo, expansoes
+
+
+def _caminho_pela_arvore(proximo, no):
+    caminho_ids = [no]
+    while proximo[no] != -1:
+        no = proximo[no]
+        caminho_ids.append(no)
+    return caminho_ids
+
+
+def _desvio(grafo_csr, distancias, proximo, no_desvio, id_final, removidos, bloqueados, espaco):
+    """
+    A* do nó de desvio ao destino sem os nós `removidos` e sem as arestas
+    no_desvio -> `bloqueados`, com a árvore ao destino como heurística.
+
+    Returns:
+        tuple: (caminho_ids ou None, custo, expansoes).
+    """
+    offsets = grafo_csr.offsets; alvos = grafo_csr.alvos
+    pesos = grafo_csr.pesos; populacao = grafo_csr.populacao
+    geracao = espaco.nova_busca()
+    custos = espaco.custos; pais = espaco.pais; marcas = espaco.marcas; fixados = espaco.fixados
+    for no in removidos:
+        fixados[no] = geracao # Fora do grafo nesta busca
+    custos[no_desvio] = 0; pais[no_desvio] = -1; marcas[no_desvio] = geracao
+    fila_prio = [(distancias[no_desvio], populacao[no_desvio], no_desvio)]
+    expansoes = 0
+
+    while fila_prio:
+        f_atual, _, no_atual = heapq.heappop(fila_prio)
+        if fixados[no_atual] == geracao:
+            continue
+        fixados[no_atual] = geracao
+        expansoes += 1
+
+        # Caminho da árvore livre a partir daqui: f_atual é o custo ótimo do desvio
+        restante = _caminho_pela_arvore(proximo, no_atual)
+        if (no_atual != no_desvio or len(restante) == 1 or restante[1] not in bloqueados) and \
+                not any(no in removidos or no == no_desvio for no in restante[1:]):
+            caminho_ids = []
+            atual = pais[no_atual]
+            while atual != -1:
+                caminho_ids.append(atual); atual = pais[atual]
+            caminho_ids.reverse()
+            return caminho_ids + restante, f_atual, expansoes
+
+        custo_atual = custos[no_atual]
+        inicio, fim = offsets[no_atual], offsets[no_atual + 1]
+        for vizinho, peso in zip(alvos[inicio:fim], pesos[inicio:fim]):
+            if fixados[vizinho] == geracao or (no_atual == no_desvio and vizinho in bloqueados):
+                continue
+            novo_custo = custo_atual + peso
+            if marcas[vizinho] != geracao or novo_custo < custos[vizinho]:
+                custos[vizinho] = novo_custo; pais[vizinho] = no_atual; marcas[vizinho] = geracao
+                heapq.heappush(fila_prio, (novo_custo + distancias[vizinho], populacao[vizinho], vizinho))
+    return None, float('inf'), expansoes
+
+
+def _custos_acumulados(grafo_csr, caminho_ids):
+    acumulados = [0]
+    for atual, proximo in zip(caminho_ids, caminho_ids[1:]):
+        acumulados.append(acumulados[-1] + grafo_csr.peso(atual, proximo))
+    return acumulados
+
+
+def k_caminhos_minimos(grafo_csr, no_inicial, no_final, k, componentes=None, espaco=None):
+    """
+    As k rotas mais curtas sem ciclos de `no_inicial` a `no_final` (Yen), em
+    ordem de custo.
+
+    Args:
+        grafo_csr (GrafoCSR): Grafo compacto (ver grafo_csr.py).
+        k (int): Número máximo de rotas.
+        componentes (IndiceComponentes, opcional): Pares sem caminho retornam sem busca.
+        espaco (EspacoBusca, opcional): Listas das buscas de desvio (padrão: o
+            espaço da thread atual).
+
+    Returns:
+        tuple: (rotas, estatisticas). Cada rota é um dict com posicao, caminho,
+        custo_final, caminho_detalhado e o trabalho que custou: total_expansoes
+        (a árvore ao destino na rota 1; as buscas de desvio da iteração que a
+        escolheu nas demais) e buscas_desvio. As estatísticas seguem o formato
+        das buscas (caminho e custo da rota 1), com rotas_encontradas e
+        expansoes_arvore.
+    """
+    inicio_tempo = time.time()
+    estatisticas = novas_estatisticas()
+    estatisticas.update({"rotas_encontradas": 0, "expansoes_arvore": 0})
+    resultado = iniciar_busca(no_inicial, no_final, grafo_csr, estatisticas, inicio_tempo, componentes, ausente=AUSENTE_GRAFO)
+    if resultado is not None:
+        caminho, custo, estatisticas = resultado
+        rotas = []
+        if caminho is not None:
+            rotas.append({"posicao": 1, "caminho": caminho, "custo_final": custo,
+                          "caminho_detalhado": estatisticas["caminho_detalhado"],
+                          "total_expansoes": 0, "buscas_desvio": 0})
+            estatisticas["rotas_encontradas"] = 1
+        return rotas, estatisticas
+
+    nomes = grafo_csr.nomes
+    id_inicial = grafo_csr.ids[no_inicial]; id_final = grafo_csr.ids[no_final]
+    if espaco is None:
+        espaco = espaco_da_thread(len(nomes))
+
+    distancias, proximo, expansoes_arvore = _arvore_ao_destino(grafo_csr, id_final)
+    estatisticas.update({"expansoes_arvore": expansoes_arvore, "total_expansoes": expansoes_arvore})
+    if distancias[id_inicial] == float('inf'):
+        estatisticas.update({"status": "Nenhum caminho encontrado (Espaço de busca esgotado)", "tempo_execucao": time.time() - inicio_tempo})
+        return [], estatisticas
+
+    # Rotas aceitas: (caminho_ids, custos acumulados, índice de desvio)
+    primeira = _caminho_pela_arvore(proximo, id_inicial)
+    aceitas = [(primeira, _custos_acumulados(grafo_csr, primeira), 0)]
+    trabalho = [(expansoes_arvore, 0)]
+    candidatas = [] # Heap: (custo, populacao do nó de desvio, caminho_ids, índice de desvio)
+    vistas = {tuple(primeira)}
+
+    while len(aceitas) < k:
+        caminho_ids, acumulados, desvio_rota = aceitas[-1]
+        expansoes = buscas = 0
+        for i in range(desvio_rota, len(caminho_ids) - 1):
+            no_desvio = caminho_ids[i]
+            raiz = caminho_ids[:i + 1]
+            bloqueados = {rota[i + 1] for rota, _, _ in aceitas if len(rota) > i + 1 and rota[:i + 1] == raiz}
+            trecho, custo_trecho, exp = _desvio(grafo_csr, distancias, proximo, no_desvio, id_final,
+                                                 set(raiz[:-1]), bloqueados, espaco)
+            expansoes += exp; buscas += 1
+            if trecho is None:
+                continue
+            candidata = raiz[:-1] + trecho
+            chave = tuple(candidata)
+            if chave not in vistas:
+                vistas.add(chave)
+                heapq.heappush(candidatas, (acumulados[i] + custo_trecho, grafo_csr.populacao[no_desvio], candidata, i))
+        estatisticas["total_expansoes"] += expansoes
+        if not candidatas:
+            break
+        _, _, candidata, desvio = heapq.heappop(candidatas)
+        aceitas.append((candidata, _custos_acumulados(grafo_csr, candidata), desvio))
+        trabalho.append((expansoes, buscas))
+
+    rotas = []
+    for posicao, ((caminho_ids, acumulados, _), (expansoes, buscas)) in enumerate(zip(aceitas, trabalho), 1):
+        rotas.append({"posicao": posicao, "caminho": [nomes[i] for i in caminho_ids], "custo_final": acumulados[-1],
+                      "caminho_detalhado": grafo_csr.formatar_caminho(caminho_ids),
+                      "total_expansoes": expansoes, "buscas_desvio": buscas})
+    estatisticas.update({"status": "Caminho ótimo encontrado", "rotas_encontradas": len(rotas),
+                         "caminho": rotas[0]["caminho"], "custo_final": rotas[0]["custo_final"],
+                         "caminho_detalhado": rotas[0]["caminho_detalhado"],
+                         "tempo_execucao": time.time() - inicio_tempo})
+    return rotas, estatisticas
+
+
+# --- Bloco Principal de Execução ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="k rotas mais curtas sem ciclos entre duas cidades (Yen).")
+    parser.add_argument("origem", help="Cidade de origem")
+    parser.add_argument("destino", help="Cidade de destino")
+    parser.add_argument("-k", type=int, default=3, help="Número de rotas")
+    parser.add_argument("--cidades", default="cities.json", help="Arquivo JSON das cidades")
+    parser.add_argument("--raio", type=float, default=3.5, help="Raio de conexão r")
+    parser.add_argument("--snapshot", action="store_true", help="Usa (e compila se preciso) o snapshot binário do grafo")
+    args = parser.parse_args()
+
+    if args.snapshot:
+        grafo_csr, _ = carregar_ou_compilar(args.cidades, args.raio)
+    else:
+        dados_cidades = carregar_dados_cidades(args.cidades)
+        if not dados_cidades:
+            print("Não foi possível carregar os dados das cidades. Abortando.", file=sys.stderr)
+            sys.exit(1)
+        grafo_csr = GrafoCSR.a_partir_do_grafo(construir_grafo(dados_cidades, args.raio), dados_cidades)
+    componentes = IndiceComponentes.a_partir_do_csr(grafo_csr)
+
+    rotas, estatisticas = k_caminhos_minimos(grafo_csr, args.origem, args.destino, args.k, componentes)
+    print(f"\n--- {args.k} Rotas Mais Curtas: {args.origem} -> {args.destino} ---")
+    print(f"Status: {estatisticas['status']} ({estatisticas['rotas_encontradas']} rotas)")
+    for rota in rotas:
+        print(f"\nRota {rota['posicao']}: Distância Total: {rota['custo_final']:.2f}")
+        print(f"  {rota['caminho_detalhado']}")
+        print(f"  Trabalho: {rota['total_expansoes']} expansões em {rota['buscas_desvio']} buscas de desvio")
+    print(f"\nTotal de Expansões de Nós: {estatisticas['total_expansoes']} "
+          f"(árvore ao destino: {estatisticas['expansoes_arvore']})")
+    print(f"Tempo de Execução: {estatisticas['tempo_execucao']:.4f} segundos")
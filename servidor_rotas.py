@@ -0,0 +1,298 @@
+import argparse
+import asyncio
+import json
+import os
+import signal
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from Buscauniforme import carregar_dados_cidades, construir_grafo, busca_custo_uniforme_csr
+from Buscabidirecional import busca_bidirecional_csr
+from componentes import IndiceComponentes
+from execucao_paralela import criar_executor, obter_compartilhado
+from grafo_csr import GrafoCSR
+from snapshot_grafo import carregar_ou_compilar
+
+# --- Servidor de Rotas (asyncio, JSON por linha) ---
+#
+# Processo residente: o grafo é carregado uma única vez e as consultas chegam
+# por socket TCP ou Unix, um objeto JSON por linha. Cada linha recebe uma linha
+# de resposta, na mesma ordem dos pedidos da conexão (pipelining: o cliente pode
+# enviar várias linhas sem esperar as respostas). As buscas rodam em um pool de
+# processos (execucao_paralela), então o laço de eventos só lê, despacha e escreve.
+# Cada worker reutiliza entre as consultas o espaço de busca da sua thread
+# (espaco_busca.py), sem alocar listas de n posições por consulta.
+#
+# Pedidos:
+#   {"id": 1, "origem": "Miami", "destino": "Seattle"}           rota (bidirecional)
+#   {"id": 2, "origem": "Miami", "destino": "Seattle", "algoritmo": "ucs"}
+#   {"id": 3, "tipo": "estatisticas"}                            latências e fila
+#   {"id": 4, "tipo": "ping"}
+
+ALGORITMOS = {"bidirecional": busca_bidirecional_csr, "ucs": busca_custo_uniforme_csr}
+ALGORITMO_PADRAO = "bidirecional"
+JANELA_LATENCIAS = 10000  # Latências mais recentes usadas nos percentis
+MAX_PIPELINE_PADRAO = 64  # Respostas pendentes por conexão antes de parar de ler o socket
+LIMITE_LINHA = 1 << 16    # Tamanho máximo de uma linha de pedido (bytes)
+
+
+def resolver_rota(consulta, grafo_csr=None, componentes=None):
+    """
+    Resolve uma consulta de rota e devolve o resultado no formato das
+    consultas em lote (consultas_lote.py). Nos workers do pool o grafo e as
+    componentes vêm do estado herdado do processo pai.
+    """
+    if grafo_csr is None:
+        grafo_csr = obter_compartilhado("grafo_csr")
+        componentes = obter_compartilhado("componentes")
+    funcao_busca = ALGORITMOS[consulta.get("algoritmo") or ALGORITMO_PADRAO]
+    caminho, custo, estatisticas = funcao_busca(grafo_csr, consulta["origem"], consulta["destino"], componentes=componentes)
+    return {"id": consulta.get("id"), "origem": consulta["origem"], "destino": consulta["destino"],
+            "status": estatisticas["status"], "custo_final": custo if caminho else None,
+            "caminho": caminho, "caminho_detalhado": estatisticas["caminho_detalhado"],
+            "total_expansoes": estatisticas["total_expansoes"]}
+
+
+def _percentil(valores_ordenados, p):
+    # Percentil por posto mais próximo (valores já ordenados)
+    if not valores_ordenados:
+        return None
+    indice = min(len(valores_ordenados) - 1, max(0, int(round(p / 100 * len(valores_ordenados))) - 1))
+    return valores_ordenados[indice]
+
+
+class ServidorRotas:
+    """
+    Servidor de rotas sobre um GrafoCSR já carregado.
+
+    Args:
+        grafo_csr (GrafoCSR): Grafo compartilhado por todas as conexões.
+        componentes (IndiceComponentes, opcional): Pares sem caminho retornam sem busca.
+        processos (int): Processos do pool de buscas; 0 executa em uma thread do
+            próprio processo (sem paralelismo, mas o laço continua livre).
+        max_concorrentes (int, opcional): Buscas em execução ao mesmo tempo, somando
+            todas as conexões; as demais esperam na fila (padrão: 2 x processos).
+        max_pipeline (int): Pedidos pendentes por conexão; acima disso o servidor
+            para de ler o socket até alguma resposta sair.
+    """
+
+    def __init__(self, grafo_csr, componentes=None, processos=None, max_concorrentes=None,
+                 max_pipeline=MAX_PIPELINE_PADRAO):
+        self.grafo_csr = grafo_csr
+        self.componentes = componentes
+        self.processos = (os.cpu_count() or 1) if processos is None else processos
+        self.max_concorrentes = max_concorrentes or 2 * max(1, self.processos)
+        self.max_pipeline = max_pipeline
+        self.latencias = deque(maxlen=JANELA_LATENCIAS)
+        self.contadores = {"pedidos": 0, "rotas": 0, "erros": 0, "conexoes": 0}
+        self.conexoes_ativas = 0
+        self.em_fila = 0     # Buscas esperando uma vaga (limite de concorrência)
+        self.em_execucao = 0 # Buscas no pool
+        self.inicio = time.time()
+        self.executor = None
+        self._semaforo = None
+
+    # --- Ciclo de vida ---
+
+    def abrir(self):
+        if self.processos > 0:
+            self.executor = criar_executor(self.processos, grafo_csr=self.grafo_csr, componentes=self.componentes)
+            self._tarefa = resolver_rota
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=1)
+            self._tarefa = partial(resolver_rota, grafo_csr=self.grafo_csr, componentes=self.componentes)
+        self._semaforo = asyncio.Semaphore(self.max_concorrentes)
+
+    def fechar(self):
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
+
+    # --- Conexões ---
+
+    async def atender(self, leitor, escritor):
+        """Atende uma conexão: lê pedidos, despacha cada um e escreve as respostas em ordem."""
+        self.contadores["conexoes"] += 1
+        self.conexoes_ativas += 1
+        pendentes = asyncio.Queue(maxsize=self.max_pipeline)
+        escrita = asyncio.ensure_future(self._escrever_respostas(pendentes, escritor))
+        numero = 0
+        try:
+            while not escrita.done():
+                try:
+                    linha = await leitor.readline()
+                except ValueError: # Linha maior que LIMITE_LINHA: responde e encerra a conexão
+                    await pendentes.put(self._concluido({"linha": numero + 1, "status": "Erro de Entrada",
+                                                         "mensagem": f"Linha maior que {LIMITE_LINHA} bytes"}))
+                    self.contadores["erros"] += 1
+                    break
+                if not linha:
+                    break
+                numero += 1
+                if linha.strip():
+                    await pendentes.put(asyncio.ensure_future(self._responder(linha, numero)))
+        except ConnectionError:
+            pass
+        finally:
+            if not escrita.done():
+                await pendentes.put(None)
+            await asyncio.gather(escrita, return_exceptions=True)
+            self.conexoes_ativas -= 1
+            escritor.close()
+
+    async def _escrever_respostas(self, pendentes, escritor):
+        # Respostas na ordem dos pedidos, mesmo que as buscas terminem fora de ordem
+        try:
+            while True:
+                futuro = await pendentes.get()
+                if futuro is None:
+                    return
+                try:
+                    resposta = await futuro
+                except Exception as e:
+                    # Falha inesperada em um pedido: responde com erro e segue com os próximos
+                    self.contadores["erros"] += 1
+                    resposta = {"status": "Erro Interno", "mensagem": f"{type(e).__name__}: {e}"}
+                escritor.write((json.dumps(resposta, ensure_ascii=False) + "\n").encode('utf-8'))
+                await escritor.drain()
+        except ConnectionError:
+            # Cliente desconectou: descarta o que ainda estiver pendente
+            while not pendentes.empty():
+                futuro = pendentes.get_nowait()
+                if futuro is not None:
+                    futuro.cancel()
+
+    @staticmethod
+    def _concluido(resposta):
+        futuro = asyncio.get_running_loop().create_future()
+        futuro.set_result(resposta)
+        return futuro
+
+    async def _responder(self, linha, numero):
+        self.contadores["pedidos"] += 1
+        try:
+            pedido = json.loads(linha)
+            if not isinstance(pedido, dict):
+                raise TypeError("o pedido deve ser um objeto JSON")
+        except (json.JSONDecodeError, UnicodeDecodeError, TypeError) as e:
+            self.contadores["erros"] += 1
+            return {"linha": numero, "status": "Erro de Entrada", "mensagem": f"JSON inválido: {e}"}
+
+        tipo = pedido.get("tipo", "rota")
+        algoritmo = pedido.get("algoritmo") or ALGORITMO_PADRAO
+        if tipo == "estatisticas":
+            return dict(self.estatisticas(), id=pedido.get("id"))
+        if tipo == "ping":
+            return {"id": pedido.get("id"), "status": "ok"}
+        if tipo != "rota":
+            mensagem = f"Tipo de pedido desconhecido: {tipo!r}"
+        elif "origem" not in pedido or "destino" not in pedido:
+            mensagem = "Consulta sem 'origem' ou 'destino'"
+        elif not isinstance(pedido["origem"], str) or not isinstance(pedido["destino"], str):
+            mensagem = "'origem' e 'destino' devem ser nomes de cidade (texto)"
+        elif not isinstance(algoritmo, str) or algoritmo not in ALGORITMOS:
+            mensagem = f"Algoritmo desconhecido: {algoritmo!r} (use {', '.join(ALGORITMOS)})"
+        else:
+            return await self._resolver(pedido)
+        self.contadores["erros"] += 1
+        return {"id": pedido.get("id"), "linha": numero, "status": "Erro de Entrada", "mensagem": mensagem}
+
+    async def _resolver(self, pedido):
+        inicio_tempo = time.perf_counter()
+        self.em_fila += 1
+        na_fila = True
+        try:
+            async with self._semaforo:
+                self.em_fila -= 1; na_fila = False
+                self.em_execucao += 1
+                try:
+                    resultado = await asyncio.get_running_loop().run_in_executor(self.executor, self._tarefa, pedido)
+                finally:
+                    self.em_execucao -= 1
+        finally:
+            if na_fila:
+                self.em_fila -= 1
+        latencia = time.perf_counter() - inicio_tempo
+        self.latencias.append(latencia)
+        self.contadores["rotas"] += 1
+        resultado["latencia_ms"] = round(latencia * 1000, 3)
+        return resultado
+
+    # --- Estatísticas ---
+
+    def estatisticas(self):
+        """Contadores, profundidade da fila e percentis das latências recentes (ms)."""
+        ordenadas = sorted(self.latencias)
+        percentis = {f"p{p}": (round(_percentil(ordenadas, p) * 1000, 3) if ordenadas else None) for p in (50, 90, 95, 99)}
+        percentis["max"] = round(ordenadas[-1] * 1000, 3) if ordenadas else None
+        return {
+            "tipo": "estatisticas", "status": "ok",
+            "tempo_ativo_s": round(time.time() - self.inicio, 3),
+            **self.contadores,
+            "conexoes_ativas": self.conexoes_ativas,
+            "profundidade_fila": self.em_fila, "em_execucao": self.em_execucao,
+            "processos": self.processos, "max_concorrentes": self.max_concorrentes,
+            "latencia_ms": percentis, "amostras_latencia": len(ordenadas),
+        }
+
+
+async def servir(servidor, host="127.0.0.1", porta=8765, caminho_unix=None):
+    """Abre o socket (TCP ou Unix) e atende até SIGINT/SIGTERM."""
+    servidor.abrir()
+    try:
+        if caminho_unix:
+            servico = await asyncio.start_unix_server(servidor.atender, caminho_unix, limit=LIMITE_LINHA)
+            endereco = caminho_unix
+        else:
+            servico = await asyncio.start_server(servidor.atender, host, porta, limit=LIMITE_LINHA)
+            endereco = ", ".join(f"{s.getsockname()[0]}:{s.getsockname()[1]}" for s in servico.sockets)
+        print(f"Servidor de rotas ouvindo em {endereco} ({servidor.processos} processos, "
+              f"até {servidor.max_concorrentes} buscas simultâneas)", file=sys.stderr)
+
+        parar = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sinal in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sinal, parar.set)
+            except (NotImplementedError, RuntimeError): # Ex.: Windows
+                pass
+        async with servico:
+            await parar.wait()
+    finally:
+        servidor.fechar()
+        if caminho_unix and os.path.exists(caminho_unix):
+            os.unlink(caminho_unix)
+
+
+# --- Bloco Principal de Execução ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor de rotas residente (JSON por linha, TCP ou Unix).")
+    parser.add_argument("--cidades", default="cities.json", help="Arquivo JSON das cidades")
+    parser.add_argument("--raio", type=float, default=3.5, help="Raio de conexão r")
+    parser.add_argument("--snapshot", action="store_true", help="Usa (e compila se preciso) o snapshot binário do grafo")
+    parser.add_argument("--host", default="127.0.0.1", help="Endereço TCP")
+    parser.add_argument("--porta", type=int, default=8765, help="Porta TCP")
+    parser.add_argument("--unix", default=None, help="Caminho de um socket Unix (substitui --host/--porta)")
+    parser.add_argument("--processos", type=int, default=None, help="Processos do pool de buscas (0 = thread local)")
+    parser.add_argument("--max-concorrentes", type=int, default=None, help="Buscas simultâneas (padrão: 2 x processos)")
+    parser.add_argument("--max-pipeline", type=int, default=MAX_PIPELINE_PADRAO, help="Pedidos pendentes por conexão")
+    args = parser.parse_args()
+
+    inicio_tempo = time.perf_counter()
+    if args.snapshot:
+        grafo_csr, _ = carregar_ou_compilar(args.cidades, args.raio)
+    else:
+        dados_cidades = carregar_dados_cidades(args.cidades)
+        if not dados_cidades:
+            print("Não foi possível carregar os dados das cidades. Abortando.", file=sys.stderr)
+            sys.exit(1)
+        grafo_csr = GrafoCSR.a_partir_do_grafo(construir_grafo(dados_cidades, args.raio), dados_cidades)
+    componentes = IndiceComponentes.a_partir_do_csr(grafo_csr)
+    print(f"Grafo carregado em {time.perf_counter() - inicio_tempo:.4f} segundos: {len(grafo_csr)} cidades, "
+          f"{grafo_csr.num_arestas} arestas (r = {args.raio}). {componentes.resumo()}", file=sys.stderr)
+
+    servidor = ServidorRotas(grafo_csr, componentes, args.processos, args.max_concorrentes, args.max_pipeline)
+    asyncio.run(servir(servidor, args.host, args.porta, args.unix))
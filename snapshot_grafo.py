@@ -0,0 +1,160 @@
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+
+from Buscauniforme import carregar_dados_cidades, construir_grafo
+from grafo_csr import GrafoCSR
+
+# --- Snapshot Binário do Grafo (CSR mapeado em memória) ---
+#
+# Layout do arquivo (ordem de bytes nativa, registrada no cabeçalho):
+#   cabeçalho  : FORMATO_CABECALHO (magic, versão, ordem de bytes, raio, n, m,
+#                sha256 do JSON de origem, tamanho do bloco de nomes)
+#   nós        : offsets dos nomes int64[n+1], nomes UTF-8, latitudes float64[n],
+#                longitudes float64[n], população int64[n]
+#   arestas    : offsets int64[n+1], alvos int32[m], pesos float64[m]
+# Cada seção começa alinhada em 8 bytes, para que memoryview.cast funcione direto
+# sobre o mmap sem copiar.
+
+MAGIC = b"GRAFOSNP"
+VERSAO_SNAPSHOT = 2 # 2: nomes desambiguados (carregador_cidades), população int
+FORMATO_CABECALHO = "<8sIIdQQ32sQ"
+TAMANHO_CABECALHO = struct.calcsize(FORMATO_CABECALHO)
+ORDEM_BYTES = {"little": 1, "big": 2}[sys.byteorder]
+
+
+def hash_arquivo(caminho_arquivo):
+    """SHA-256 do conteúdo do arquivo (identifica a versão do JSON de origem)."""
+    h = hashlib.sha256()
+    with open(caminho_arquivo, 'rb') as f:
+        for bloco in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloco)
+    return h.digest()
+
+
+def _preenchimento(tamanho):
+    return b"\0" * (-tamanho % 8)
+
+
+def salvar_snapshot(grafo_csr, caminho_snapshot, raio, hash_origem):
+    """Escreve o GrafoCSR no formato de snapshot (via arquivo temporário + rename)."""
+    nomes_codificados = [nome.encode('utf-8') for nome in grafo_csr.nomes]
+    offsets_nomes = array('q', [0])
+    for nome in nomes_codificados:
+        offsets_nomes.append(offsets_nomes[-1] + len(nome))
+    blob_nomes = b"".join(nomes_codificados)
+
+    cabecalho = struct.pack(FORMATO_CABECALHO, MAGIC, VERSAO_SNAPSHOT, ORDEM_BYTES, float(raio),
+                            len(grafo_csr), len(grafo_csr.alvos), hash_origem, len(blob_nomes))
+    secoes = [
+        offsets_nomes.tobytes(), blob_nomes,
+        array('d', grafo_csr.latitudes).tobytes(), array('d', grafo_csr.longitudes).tobytes(),
+        array('q', grafo_csr.populacao).tobytes(),
+        array('q', grafo_csr.offsets).tobytes(), array('i', grafo_csr.alvos).tobytes(),
+        array('d', grafo_csr.pesos).tobytes(),
+    ]
+    temporario = caminho_snapshot + ".tmp"
+    with open(temporario, 'wb') as f:
+        f.write(cabecalho + _preenchimento(len(cabecalho)))
+        for secao in secoes:
+            f.write(secao)
+            f.write(_preenchimento(len(secao)))
+    os.replace(temporario, caminho_snapshot)
+
+
+def ler_cabecalho(caminho_snapshot):
+    """Lê o cabeçalho do snapshot. Retorna None se o arquivo não existir ou não for um snapshot."""
+    try:
+        with open(caminho_snapshot, 'rb') as f:
+            dados = f.read(TAMANHO_CABECALHO)
+    except OSError:
+        return None
+    if len(dados) < TAMANHO_CABECALHO:
+        return None
+    magic, versao, ordem, raio, n, m, hash_origem, tamanho_nomes = struct.unpack(FORMATO_CABECALHO, dados)
+    if magic != MAGIC:
+        return None
+    return {"versao": versao, "ordem_bytes": ordem, "raio": raio, "n": n, "m": m,
+            "hash_origem": hash_origem, "tamanho_nomes": tamanho_nomes}
+
+
+def carregar_snapshot(caminho_snapshot):
+    """
+    Mapeia o snapshot em memória e devolve um GrafoCSR cujos arrays numéricos
+    são memoryviews sobre o mmap (sem cópia e sem reconstruir o grafo).
+    """
+    cabecalho = ler_cabecalho(caminho_snapshot)
+    if cabecalho is None or cabecalho["versao"] != VERSAO_SNAPSHOT or cabecalho["ordem_bytes"] != ORDEM_BYTES:
+        raise ValueError(f"Snapshot inválido ou incompatível: {caminho_snapshot}")
+    n, m = cabecalho["n"], cabecalho["m"]
+
+    with open(caminho_snapshot, 'rb') as f:
+        mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    visao = memoryview(mapa)
+    posicao = TAMANHO_CABECALHO + (-TAMANHO_CABECALHO % 8)
+
+    def secao(tamanho_bytes, formato=None):
+        nonlocal posicao
+        fatia = visao[posicao:posicao + tamanho_bytes]
+        posicao += tamanho_bytes + (-tamanho_bytes % 8)
+        return fatia.cast(formato) if formato else fatia
+
+    offsets_nomes = secao(8 * (n + 1), 'q')
+    blob_nomes = secao(cabecalho["tamanho_nomes"])
+    nomes = [str(blob_nomes[offsets_nomes[i]:offsets_nomes[i + 1]], 'utf-8') for i in range(n)]
+    latitudes = secao(8 * n, 'd')
+    longitudes = secao(8 * n, 'd')
+    populacao = secao(8 * n, 'q')
+    offsets = secao(8 * (n + 1), 'q')
+    alvos = secao(4 * m, 'i')
+    pesos = secao(8 * m, 'd')
+
+    grafo_csr = GrafoCSR(nomes, offsets, alvos, pesos, populacao, latitudes, longitudes)
+    grafo_csr.mapa = mapa # Mantém o mmap vivo enquanto o grafo existir
+    return grafo_csr
+
+
+def caminho_snapshot_padrao(caminho_json, raio):
+    return f"{caminho_json}.r{raio:g}.grafo"
+
+
+def carregar_ou_compilar(caminho_json, raio, caminho_snapshot=None):
+    """
+    Devolve o GrafoCSR do snapshot de (caminho_json, raio), compilando-o antes
+    se ele não existir ou estiver desatualizado (JSON alterado, outro raio ou
+    versão de formato diferente).
+
+    Returns:
+        tuple: (grafo_csr, compilado) — `compilado` indica se o snapshot foi (re)gerado.
+    """
+    if caminho_snapshot is None:
+        caminho_snapshot = caminho_snapshot_padrao(caminho_json, raio)
+    hash_origem = hash_arquivo(caminho_json)
+    cabecalho = ler_cabecalho(caminho_snapshot)
+    valido = (cabecalho is not None and cabecalho["versao"] == VERSAO_SNAPSHOT
+              and cabecalho["ordem_bytes"] == ORDEM_BYTES
+              and cabecalho["raio"] == float(raio) and cabecalho["hash_origem"] == hash_origem)
+    if not valido:
+        dados_cidades = carregar_dados_cidades(caminho_json)
+        if not dados_cidades:
+            raise ValueError(f"Não foi possível carregar os dados das cidades de {caminho_json}")
+        grafo_csr = GrafoCSR.a_partir_do_grafo(construir_grafo(dados_cidades, raio), dados_cidades)
+        salvar_snapshot(grafo_csr, caminho_snapshot, raio, hash_origem)
+    return carregar_snapshot(caminho_snapshot), not valido
+
+
+# --- Bloco Principal de Execução ---
+if __name__ == "__main__":
+    ARQUIVO_JSON = sys.argv[1] if len(sys.argv) > 1 else 'cities.json'
+    RAIO_DISTANCIA = float(sys.argv[2]) if len(sys.argv) > 2 else 3.5
+    ARQUIVO_SNAPSHOT = sys.argv[3] if len(sys.argv) > 3 else caminho_snapshot_padrao(ARQUIVO_JSON, RAIO_DISTANCIA)
+
+    inicio_tempo = time.perf_counter()
+    grafo_csr, compilado = carregar_ou_compilar(ARQUIVO_JSON, RAIO_DISTANCIA, ARQUIVO_SNAPSHOT)
+    duracao = time.perf_counter() - inicio_tempo
+    print(f"Snapshot '{ARQUIVO_SNAPSHOT}' {'compilado' if compilado else 'reutilizado'} em {duracao:.4f} segundos")
+    print(f"Cidades: {len(grafo_csr)} | Arestas: {grafo_csr.num_arestas} | Tamanho: {os.path.getsize(ARQUIVO_SNAPSHOT)} bytes")